@@ -12,7 +12,11 @@ This module provides:
 
 import re
 import json
-from typing import Dict, List, Any
+import random
+from typing import Dict, List, Any, Union
+from keyword_matcher import KeywordMatcher
+from prompt_tokenizer import TokenizedPrompt, normalize_token, phrase_ids
+from prompt_pipeline import StagedPrompt, prompt_pipeline
 
 class AdvancedPromptAnalyzer:
     """Advanced AI system for analyzing user prompts and extracting game mechanics"""
@@ -134,30 +138,40 @@ class AdvancedPromptAnalyzer:
             'creation': ['build', 'craft', 'make', 'create', 'construct', 'assemble'],
             'solving': ['solve', 'figure', 'decode', 'unlock', 'discover', 'reveal']
         }
+        
+        # All keyword tables compiled into one token-level automaton
+        self.matcher = KeywordMatcher({
+            'game_type': self.game_type_patterns,
+            'theme': self.theme_patterns,
+            'entities': self.entity_patterns,
+            'actions': self.action_patterns
+        }, encode=phrase_ids)
     
-    def deep_analyze_prompt(self, prompt: str) -> Dict[str, Any]:
+    def deep_analyze_prompt(self, prompt: Union[str, StagedPrompt]) -> Dict[str, Any]:
         """
         Perform deep analysis of user prompt to extract all game-relevant information
         
         Args:
-            prompt: User's game description
+            prompt: User's game description, or a prompt already staged by the shared pipeline
             
         Returns:
             Comprehensive analysis including game type, theme, entities, mechanics, etc.
         """
-        prompt_lower = prompt.lower()
-        
+        return prompt_pipeline.run(prompt).stage('analyzer.analysis', self._analyze_stage)
+    
+    def _analyze_stage(self, prompt: StagedPrompt) -> Dict[str, Any]:
+        """Assemble the analysis from the individual stages, each computed once"""
         analysis = {
-            'original_prompt': prompt,
-            'game_type': self._detect_game_type(prompt_lower),
-            'theme': self._detect_theme(prompt_lower),
-            'entities': self._extract_entities(prompt_lower),
-            'actions': self._extract_actions(prompt_lower),
-            'mechanics': self._determine_mechanics(prompt_lower),
-            'complexity_score': self._calculate_complexity(prompt_lower),
-            'visual_style': self._determine_visual_style(prompt_lower),
-            'win_condition': self._extract_win_condition(prompt_lower),
-            'challenge_type': self._determine_challenge_type(prompt_lower)
+            'original_prompt': prompt.text,
+            'game_type': prompt.stage('analyzer.game_type', self._detect_game_type),
+            'theme': prompt.stage('analyzer.theme', self._detect_theme),
+            'entities': prompt.stage('analyzer.entities', self._extract_entities),
+            'actions': prompt.stage('analyzer.actions', self._extract_actions),
+            'mechanics': prompt.stage('analyzer.mechanics', self._determine_mechanics),
+            'complexity_score': prompt.stage('analyzer.complexity', self._calculate_complexity),
+            'visual_style': self._determine_visual_style(prompt.stage('analyzer.theme', self._detect_theme)),
+            'win_condition': self._extract_win_condition(prompt.tokens),
+            'challenge_type': self._determine_challenge_type(prompt.tokens)
         }
         
         # Generate enhanced description based on analysis
@@ -166,32 +180,30 @@ class AdvancedPromptAnalyzer:
         
         return analysis
     
-    def _detect_game_type(self, prompt: str) -> str:
+    def _detect_game_type(self, prompt: StagedPrompt) -> str:
         """Detect the primary game type from the prompt"""
-        type_scores = {}
-        
-        for game_type, keywords in self.game_type_patterns.items():
-            score = 0
-            for keyword in keywords:
-                # Count occurrences with different weights
-                if keyword in prompt:
-                    score += prompt.count(keyword)
-                    # Bonus for exact word matches
-                    if f' {keyword} ' in f' {prompt} ':
-                        score += 2
-            type_scores[game_type] = score
+        tokens = prompt.tokens
+        hits = tokens.match(self.matcher)
+        occurrences = hits.occurrences('game_type')
+        matched = hits.scores('game_type')
+        
+        # Count occurrences, plus the exact word match bonus for every matched keyword
+        type_scores = {
+            game_type: occurrences.get(game_type, 0) + 2 * matched.get(game_type, 0)
+            for game_type in self.game_type_patterns
+        }
         
         # Special logic for better detection
-        if any(word in prompt for word in ['race', 'racing', 'car', 'speed', 'track']):
+        if tokens.has_any(['race', 'racing', 'car', 'speed', 'track']):
             type_scores['racing'] = type_scores.get('racing', 0) + 10
         
-        if any(word in prompt for word in ['puzzle', 'solve', 'mystery', 'clue']):
+        if tokens.has_any(['puzzle', 'solve', 'mystery', 'clue']):
             type_scores['puzzle'] = type_scores.get('puzzle', 0) + 10
         
-        if any(word in prompt for word in ['fight', 'battle', 'combat', 'weapon']):
+        if tokens.has_any(['fight', 'battle', 'combat', 'weapon']):
             type_scores['combat'] = type_scores.get('combat', 0) + 10
         
-        if any(word in prompt for word in ['cook', 'chef', 'recipe', 'kitchen']):
+        if tokens.has_any(['cook', 'chef', 'recipe', 'kitchen']):
             type_scores['cooking'] = type_scores.get('cooking', 0) + 10
         
         # Return the highest scoring type, default to collection
@@ -202,19 +214,17 @@ class AdvancedPromptAnalyzer:
         
         return 'collection'  # Default fallback
     
-    def _detect_theme(self, prompt: str) -> str:
+    def _detect_theme(self, prompt: StagedPrompt) -> str:
         """Detect the visual/narrative theme from the prompt"""
-        theme_scores = {}
-        
-        for theme, keywords in self.theme_patterns.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in prompt:
-                    score += prompt.count(keyword) * 2
-                    # Bonus for exact matches
-                    if f' {keyword} ' in f' {prompt} ':
-                        score += 3
-            theme_scores[theme] = score
+        hits = prompt.tokens.match(self.matcher)
+        occurrences = hits.occurrences('theme')
+        matched = hits.scores('theme')
+        
+        # Occurrences weigh double, plus the exact match bonus for every matched keyword
+        theme_scores = {
+            theme: occurrences.get(theme, 0) * 2 + 3 * matched.get(theme, 0)
+            for theme in self.theme_patterns
+        }
         
         # Return highest scoring theme, default to modern
         if theme_scores:
@@ -224,8 +234,9 @@ class AdvancedPromptAnalyzer:
         
         return 'modern'
     
-    def _extract_entities(self, prompt: str) -> Dict[str, List[str]]:
+    def _extract_entities(self, prompt: StagedPrompt) -> Dict[str, List[str]]:
         """Extract different types of entities mentioned in the prompt"""
+        tokens = prompt.tokens
         entities = {
             'characters': [],
             'enemies': [],
@@ -233,97 +244,96 @@ class AdvancedPromptAnalyzer:
             'environments': []
         }
         
-        for entity_type, keywords in self.entity_patterns.items():
-            for keyword in keywords:
-                if keyword in prompt:
-                    entities[entity_type].append(keyword)
+        hits = tokens.match(self.matcher)
+        for entity_type in self.entity_patterns:
+            entities[entity_type].extend(hits.matches('entities', entity_type))
         
         # Custom entity extraction based on context
-        words = prompt.split()
-        for i, word in enumerate(words):
+        character_tokens = {normalize_token(word) for word in ['hero', 'player', 'character']}
+        object_tokens = {normalize_token(word) for word in ['crystal', 'gem', 'treasure']}
+        words = tokens.words
+        for i, token in enumerate(tokens.tokens):
             # Look for character descriptions
-            if word in ['hero', 'player', 'character'] and i > 0:
-                entities['characters'].append(f"{words[i-1]} {word}")
+            if token in character_tokens and i > 0:
+                entities['characters'].append(f"{words[i-1]} {words[i]}")
             
             # Look for object descriptions
-            if word in ['crystal', 'gem', 'treasure'] and i > 0:
-                entities['objects'].append(f"{words[i-1]} {word}")
+            if token in object_tokens and i > 0:
+                entities['objects'].append(f"{words[i-1]} {words[i]}")
         
         return entities
     
-    def _extract_actions(self, prompt: str) -> List[str]:
+    def _extract_actions(self, prompt: StagedPrompt) -> List[str]:
         """Extract action verbs that indicate game mechanics"""
+        hits = prompt.tokens.match(self.matcher)
         actions = []
         
-        for action_type, keywords in self.action_patterns.items():
-            for keyword in keywords:
-                if keyword in prompt:
-                    actions.append(keyword)
+        for action_type in self.action_patterns:
+            actions.extend(hits.matches('actions', action_type))
         
-        return list(set(actions))  # Remove duplicates
+        return list(dict.fromkeys(actions))  # Remove duplicates
     
-    def _determine_mechanics(self, prompt: str) -> List[str]:
+    def _determine_mechanics(self, prompt: StagedPrompt) -> List[str]:
         """Determine specific game mechanics based on prompt analysis"""
+        tokens = prompt.tokens
         mechanics = []
         
         # Movement mechanics
-        if any(word in prompt for word in ['run', 'walk', 'move', 'navigate']):
+        if tokens.has_any(['run', 'walk', 'move', 'navigate']):
             mechanics.append('movement')
         
         # Collection mechanics
-        if any(word in prompt for word in ['collect', 'gather', 'find', 'pick']):
+        if tokens.has_any(['collect', 'gather', 'find', 'pick']):
             mechanics.append('collection')
         
         # Combat mechanics
-        if any(word in prompt for word in ['fight', 'battle', 'attack', 'defend']):
+        if tokens.has_any(['fight', 'battle', 'attack', 'defend']):
             mechanics.append('combat')
         
         # Puzzle mechanics
-        if any(word in prompt for word in ['solve', 'puzzle', 'mystery', 'clue']):
+        if tokens.has_any(['solve', 'puzzle', 'mystery', 'clue']):
             mechanics.append('puzzle_solving')
         
         # Racing mechanics
-        if any(word in prompt for word in ['race', 'speed', 'fast', 'track']):
+        if tokens.has_any(['race', 'speed', 'fast', 'track']):
             mechanics.append('racing')
         
         # Timing mechanics
-        if any(word in prompt for word in ['time', 'timer', 'quick', 'fast']):
+        if tokens.has_any(['time', 'timer', 'quick', 'fast']):
             mechanics.append('timing')
         
         # Stealth mechanics
-        if any(word in prompt for word in ['sneak', 'hide', 'stealth', 'avoid']):
+        if tokens.has_any(['sneak', 'hide', 'stealth', 'avoid']):
             mechanics.append('stealth')
         
         return mechanics
     
-    def _calculate_complexity(self, prompt: str) -> int:
+    def _calculate_complexity(self, prompt: StagedPrompt) -> int:
         """Calculate complexity score (1-10) based on prompt analysis"""
         score = 1
         
         # Length bonus
-        word_count = len(prompt.split())
+        word_count = len(prompt.tokens)
         score += min(word_count // 10, 3)
         
-        # Multiple mechanics bonus
-        mechanics = self._determine_mechanics(prompt)
+        # Multiple mechanics bonus (stages shared with the rest of the analysis)
+        mechanics = prompt.stage('analyzer.mechanics', self._determine_mechanics)
         score += len(mechanics)
         
         # Multiple entities bonus
-        entities = self._extract_entities(prompt)
+        entities = prompt.stage('analyzer.entities', self._extract_entities)
         total_entities = sum(len(entity_list) for entity_list in entities.values())
         score += min(total_entities // 3, 2)
         
         # Complex themes bonus
-        theme = self._detect_theme(prompt)
+        theme = prompt.stage('analyzer.theme', self._detect_theme)
         if theme in ['cyberpunk', 'steampunk', 'space']:
             score += 2
         
         return min(score, 10)
     
-    def _determine_visual_style(self, prompt: str) -> Dict[str, str]:
+    def _determine_visual_style(self, theme: str) -> Dict[str, str]:
         """Determine visual styling based on theme and content"""
-        theme = self._detect_theme(prompt)
-        
         style_mappings = {
             'fantasy': {
                 'color_scheme': 'magical',
@@ -353,30 +363,30 @@ class AdvancedPromptAnalyzer:
             'lighting': 'natural'
         })
     
-    def _extract_win_condition(self, prompt: str) -> str:
+    def _extract_win_condition(self, tokens: TokenizedPrompt) -> str:
         """Extract or infer the win condition from the prompt"""
-        if any(word in prompt for word in ['complete', 'finish', 'win', 'victory']):
+        if tokens.has_any(['complete', 'finish', 'win', 'victory']):
             return 'completion'
-        elif any(word in prompt for word in ['collect', 'gather', 'find']):
+        elif tokens.has_any(['collect', 'gather', 'find']):
             return 'collection'
-        elif any(word in prompt for word in ['defeat', 'destroy', 'eliminate']):
+        elif tokens.has_any(['defeat', 'destroy', 'eliminate']):
             return 'elimination'
-        elif any(word in prompt for word in ['reach', 'arrive', 'destination']):
+        elif tokens.has_any(['reach', 'arrive', 'destination']):
             return 'destination'
-        elif any(word in prompt for word in ['solve', 'figure', 'decode']):
+        elif tokens.has_any(['solve', 'figure', 'decode']):
             return 'puzzle_solution'
         else:
             return 'score_based'
     
-    def _determine_challenge_type(self, prompt: str) -> str:
+    def _determine_challenge_type(self, tokens: TokenizedPrompt) -> str:
         """Determine the primary type of challenge"""
-        if any(word in prompt for word in ['fast', 'quick', 'speed', 'time']):
+        if tokens.has_any(['fast', 'quick', 'speed', 'time']):
             return 'speed'
-        elif any(word in prompt for word in ['difficult', 'hard', 'challenge']):
+        elif tokens.has_any(['difficult', 'hard', 'challenge']):
             return 'skill'
-        elif any(word in prompt for word in ['think', 'solve', 'logic']):
+        elif tokens.has_any(['think', 'solve', 'logic']):
             return 'mental'
-        elif any(word in prompt for word in ['precise', 'accurate', 'careful']):
+        elif tokens.has_any(['precise', 'accurate', 'careful']):
             return 'precision'
         else:
             return 'balanced'
@@ -452,96 +462,97 @@ class AdvancedPromptAnalyzer:
         else:
             return f"{prefix} {suffix}"
 
-    def extract_game_mechanics(self, prompt: str) -> Dict[str, Any]:
+    def extract_game_mechanics(self, prompt: Union[str, StagedPrompt]) -> Dict[str, Any]:
         """
         Extract specific game mechanics that should be implemented
         
         Args:
-            prompt: User's game description
+            prompt: User's game description, or a prompt already staged by the shared pipeline
             
         Returns:
             Dictionary of specific mechanics to implement
         """
-        analysis = self.deep_analyze_prompt(prompt)
+        staged = prompt_pipeline.run(prompt)
+        tokens = staged.tokens
         
         mechanics = {
-            'primary_mechanic': analysis['game_type'],
-            'movement_type': self._determine_movement_type(prompt),
-            'interaction_type': self._determine_interaction_type(prompt),
-            'progression_type': self._determine_progression_type(prompt),
-            'challenge_mechanics': self._extract_challenge_mechanics(prompt),
-            'reward_system': self._determine_reward_system(prompt)
+            'primary_mechanic': staged.stage('analyzer.game_type', self._detect_game_type),
+            'movement_type': self._determine_movement_type(tokens),
+            'interaction_type': self._determine_interaction_type(tokens),
+            'progression_type': self._determine_progression_type(tokens),
+            'challenge_mechanics': self._extract_challenge_mechanics(tokens),
+            'reward_system': self._determine_reward_system(tokens)
         }
         
         return mechanics
     
-    def _determine_movement_type(self, prompt: str) -> str:
+    def _determine_movement_type(self, tokens: TokenizedPrompt) -> str:
         """Determine how the player moves in the game"""
-        if any(word in prompt for word in ['drive', 'car', 'vehicle', 'racing']):
+        if tokens.has_any(['drive', 'car', 'vehicle', 'racing']):
             return 'vehicle_control'
-        elif any(word in prompt for word in ['jump', 'platform', 'climb']):
+        elif tokens.has_any(['jump', 'platform', 'climb']):
             return 'platformer_movement'
-        elif any(word in prompt for word in ['fly', 'flying', 'air', 'wings']):
+        elif tokens.has_any(['fly', 'flying', 'air', 'wings']):
             return 'flight_control'
-        elif any(word in prompt for word in ['swim', 'underwater', 'dive']):
+        elif tokens.has_any(['swim', 'underwater', 'dive']):
             return 'swimming_control'
         else:
             return 'standard_movement'
     
-    def _determine_interaction_type(self, prompt: str) -> str:
+    def _determine_interaction_type(self, tokens: TokenizedPrompt) -> str:
         """Determine how the player interacts with the game world"""
-        if any(word in prompt for word in ['click', 'tap', 'touch']):
+        if tokens.has_any(['click', 'tap', 'touch']):
             return 'click_interaction'
-        elif any(word in prompt for word in ['drag', 'swipe', 'gesture']):
+        elif tokens.has_any(['drag', 'swipe', 'gesture']):
             return 'gesture_interaction'
-        elif any(word in prompt for word in ['type', 'input', 'text']):
+        elif tokens.has_any(['type', 'input', 'text']):
             return 'text_interaction'
         else:
             return 'key_interaction'
     
-    def _determine_progression_type(self, prompt: str) -> str:
+    def _determine_progression_type(self, tokens: TokenizedPrompt) -> str:
         """Determine how the player progresses through the game"""
-        if any(word in prompt for word in ['level', 'stage', 'world']):
+        if tokens.has_any(['level', 'stage', 'world']):
             return 'level_progression'
-        elif any(word in prompt for word in ['score', 'points', 'high score']):
+        elif tokens.has_any(['score', 'points', 'high score']):
             return 'score_progression'
-        elif any(word in prompt for word in ['time', 'timer', 'countdown']):
+        elif tokens.has_any(['time', 'timer', 'countdown']):
             return 'time_progression'
-        elif any(word in prompt for word in ['unlock', 'upgrade', 'improve']):
+        elif tokens.has_any(['unlock', 'upgrade', 'improve']):
             return 'unlock_progression'
         else:
             return 'continuous_progression'
     
-    def _extract_challenge_mechanics(self, prompt: str) -> List[str]:
+    def _extract_challenge_mechanics(self, tokens: TokenizedPrompt) -> List[str]:
         """Extract specific challenge mechanics from the prompt"""
         challenges = []
         
-        if any(word in prompt for word in ['avoid', 'dodge', 'escape']):
+        if tokens.has_any(['avoid', 'dodge', 'escape']):
             challenges.append('avoidance')
         
-        if any(word in prompt for word in ['time', 'timer', 'quick', 'fast']):
+        if tokens.has_any(['time', 'timer', 'quick', 'fast']):
             challenges.append('time_pressure')
         
-        if any(word in prompt for word in ['accurate', 'precise', 'aim']):
+        if tokens.has_any(['accurate', 'precise', 'aim']):
             challenges.append('precision')
         
-        if any(word in prompt for word in ['memory', 'remember', 'recall']):
+        if tokens.has_any(['memory', 'remember', 'recall']):
             challenges.append('memory')
         
-        if any(word in prompt for word in ['pattern', 'sequence', 'order']):
+        if tokens.has_any(['pattern', 'sequence', 'order']):
             challenges.append('pattern_recognition')
         
         return challenges
     
-    def _determine_reward_system(self, prompt: str) -> str:
+    def _determine_reward_system(self, tokens: TokenizedPrompt) -> str:
         """Determine what rewards the player gets"""
-        if any(word in prompt for word in ['coin', 'money', 'gold', 'currency']):
+        if tokens.has_any(['coin', 'money', 'gold', 'currency']):
             return 'currency_rewards'
-        elif any(word in prompt for word in ['power', 'upgrade', 'ability']):
+        elif tokens.has_any(['power', 'upgrade', 'ability']):
             return 'power_rewards'
-        elif any(word in prompt for word in ['unlock', 'new', 'access']):
+        elif tokens.has_any(['unlock', 'new', 'access']):
             return 'unlock_rewards'
-        elif any(word in prompt for word in ['score', 'points', 'rating']):
+        elif tokens.has_any(['score', 'points', 'rating']):
             return 'score_rewards'
         else:
             return 'completion_rewards'
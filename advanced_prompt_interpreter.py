@@ -14,27 +14,36 @@ This module provides:
 import re
 import json
 import random
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
+from keyword_matcher import KeywordMatcher, KeywordHits
+from prompt_tokenizer import TokenizedPrompt, phrase_ids, normalize_token, vocabulary, TOKEN_PATTERN
+from prompt_pipeline import StagedPrompt, prompt_pipeline
+from fuzzy_matcher import TrigramIndex, FuzzyMatch, MIN_FUZZY_LENGTH, MAX_FUZZY_LENGTH
+from input_limits import MAX_PROMPT_CHARS, clamp_text
 
-@dataclass
+@dataclass(frozen=True)
 class GameConfig:
-    """Structured configuration object for game generation"""
+    """
+    Structured configuration object for game generation.
+    Immutable (sequence fields are tuples) so it can be cached, shared and hashed.
+    """
     genre: str
     subgenre: Optional[str]
     theme: str
     setting: str
     protagonist: str
     antagonist: Optional[str]
-    mechanics: List[str]
+    mechanics: Tuple[str, ...]
     visual_style: str
     mood: str
     difficulty: str
     complexity: int
-    special_features: List[str]
+    special_features: Tuple[str, ...]
     color_palette: str
     audio_style: str
-    narrative_elements: List[str]
+    narrative_elements: Tuple[str, ...]
     target_audience: str
     estimated_playtime: str
 
@@ -185,36 +194,238 @@ class AdvancedPromptInterpreter:
             'hard': ['hard', 'difficult', 'challenging', 'tough', 'demanding', 'intense'],
             'extreme': ['extreme', 'brutal', 'punishing', 'hardcore', 'unforgiving', 'insane']
         }
+        
+        self.subgenre_keywords = {
+            'platformer': {
+                'metroidvania': ['explore', 'backtrack', 'ability', 'unlock'],
+                'endless runner': ['endless', 'infinite', 'runner', 'continuous'],
+                'puzzle platformer': ['puzzle', 'solve', 'brain', 'logic']
+            },
+            'shooter': {
+                'bullet hell': ['bullet', 'hell', 'intense', 'overwhelming'],
+                'twin stick': ['twin', 'stick', 'dual', 'control'],
+                'space shooter': ['space', 'alien', 'spaceship', 'galaxy']
+            },
+            'puzzle': {
+                'match-3': ['match', 'three', 'connect', 'line'],
+                'sliding puzzle': ['slide', 'sliding', 'tile', 'arrange'],
+                'logic puzzle': ['logic', 'deduction', 'reasoning', 'brain']
+            }
+        }
+        
+        self.antagonist_keywords = {
+            'monsters': ['monster', 'beast', 'creature', 'demon'],
+            'robots': ['robot', 'machine', 'android', 'cyborg'],
+            'aliens': ['alien', 'extraterrestrial', 'invader'],
+            'pirates': ['pirate', 'bandit', 'raider', 'thief'],
+            'ghosts': ['ghost', 'spirit', 'phantom', 'specter'],
+            'dragons': ['dragon', 'wyrm', 'serpent', 'drake']
+        }
+        
+        self.complexity_indicators = [
+            'multiple levels', 'story', 'characters', 'inventory', 'upgrades',
+            'multiplayer', 'achievements', 'customization', 'progression',
+            'dialogue', 'quests', 'crafting', 'economy', 'factions'
+        ]
+        
+        self.feature_keywords = {
+            'multiplayer': ['multiplayer', 'coop', 'versus', 'online'],
+            'procedural': ['procedural', 'random', 'generated', 'infinite'],
+            'physics': ['physics', 'realistic', 'gravity', 'momentum'],
+            'day_night': ['day', 'night', 'time', 'cycle'],
+            'weather': ['weather', 'rain', 'snow', 'storm'],
+            'achievements': ['achievement', 'trophy', 'reward', 'unlock'],
+            'customization': ['customize', 'personalize', 'modify', 'edit'],
+            'voice_acting': ['voice', 'narration', 'spoken', 'audio']
+        }
+        
+        self.narrative_keywords = {
+            'quest': ['quest', 'mission', 'journey', 'adventure'],
+            'rescue': ['rescue', 'save', 'help', 'protect'],
+            'discovery': ['discover', 'find', 'uncover', 'reveal'],
+            'revenge': ['revenge', 'vengeance', 'payback', 'retribution'],
+            'survival': ['survive', 'escape', 'endure', 'overcome'],
+            'mystery': ['mystery', 'secret', 'hidden', 'unknown'],
+            'romance': ['love', 'romance', 'relationship', 'heart'],
+            'friendship': ['friend', 'companion', 'ally', 'team']
+        }
+        
+        # Contextual fallbacks used when no primary keyword matched
+        self.fallback_keywords = {
+            'genre': {
+                'platformer': ['jump', 'platform', 'side'],
+                'shooter': ['shoot', 'gun', 'enemy'],
+                'puzzle': ['puzzle', 'solve', 'brain'],
+                'racing': ['race', 'car', 'speed']
+            },
+            'theme': {
+                'fantasy': ['dream', 'sleep', 'night'],
+                'urban': ['city', 'street', 'building']
+            },
+            'protagonist': {
+                'hero': ['player', 'character', 'hero'],
+                'creature': ['animal', 'creature']
+            },
+            'antagonist': {
+                'enemies': ['enemy', 'villain', 'bad', 'evil']
+            },
+            'difficulty': {
+                'easy': ['child', 'kid', 'family'],
+                'hard': ['expert', 'master', 'pro']
+            },
+            'audience': {
+                'children': ['child', 'kid', 'family', 'young'],
+                'adults': ['adult', 'mature', 'complex']
+            }
+        }
+        
+        # Every table above compiled into one token-level automaton, scanned once per prompt
+        self.matcher = self._build_matcher()
+        
+        # Typo-tolerant lookup for prompt words that no keyword uses
+        self.fuzzy_index = TrigramIndex.from_matcher(self.matcher)
+
+    def _build_matcher(self) -> KeywordMatcher:
+        """Compile all keyword tables into a single multi-keyword matcher"""
+        tables = {
+            'genre': self.genre_keywords,
+            'theme': self.theme_keywords,
+            'protagonist': self.protagonist_keywords,
+            'antagonist': self.antagonist_keywords,
+            'mechanics': self.mechanics_keywords,
+            'visual_style': self.visual_styles,
+            'mood': self.mood_keywords,
+            'difficulty': self.difficulty_keywords,
+            'complexity': {'indicators': self.complexity_indicators},
+            'special_features': self.feature_keywords,
+            'narrative': self.narrative_keywords
+        }
+        
+        for genre, subgenres in self.subgenre_keywords.items():
+            tables[f'subgenre:{genre}'] = subgenres
+        
+        for name, fallbacks in self.fallback_keywords.items():
+            tables[f'fallback:{name}'] = fallbacks
+        
+        return KeywordMatcher(tables, encode=phrase_ids)
 
-    def interpret_prompt(self, prompt: str) -> GameConfig:
+    def interpret_prompt(self, prompt: Union[str, StagedPrompt]) -> GameConfig:
         """
         Main method to interpret a natural language prompt and extract game configuration
         
         Args:
-            prompt: Natural language description of the desired game
+            prompt: Natural language description of the desired game, or a prompt
+                already staged by the shared pipeline
             
         Returns:
             GameConfig object with extracted specifications
         """
-        prompt_lower = prompt.lower()
-        
-        # Extract core game elements
-        genre = self._detect_genre(prompt_lower)
-        subgenre = self._detect_subgenre(prompt_lower, genre)
-        theme = self._detect_theme(prompt_lower)
-        setting = self._detect_setting(prompt_lower, theme)
-        protagonist = self._detect_protagonist(prompt_lower)
-        antagonist = self._detect_antagonist(prompt_lower)
-        mechanics = self._detect_mechanics(prompt_lower, genre)
-        visual_style = self._detect_visual_style(prompt_lower)
-        mood = self._detect_mood(prompt_lower)
-        difficulty = self._detect_difficulty(prompt_lower)
-        complexity = self._assess_complexity(prompt_lower)
-        special_features = self._detect_special_features(prompt_lower)
+        return prompt_pipeline.run(prompt).stage('interpreter.config', self._interpret_stage)
+    
+    def _interpret_stage(self, prompt: StagedPrompt) -> GameConfig:
+        """Pipeline stage: build the GameConfig around the genre and theme stages"""
+        return self._build_config(prompt.stage('interpreter.hits', self._hits_stage),
+                                  genre=prompt.stage('interpreter.genre', self._genre_stage),
+                                  theme=prompt.stage('interpreter.theme', self._theme_stage))
+    
+    def _hits_stage(self, prompt: StagedPrompt) -> KeywordHits:
+        """Pipeline stage: the keyword hit table every detector reads"""
+        return self._match(prompt.tokens)
+    
+    def _genre_stage(self, prompt: StagedPrompt) -> str:
+        """Pipeline stage: the interpreter's genre, readable by any consumer of the prompt"""
+        return self._detect_genre(prompt.stage('interpreter.hits', self._hits_stage))
+    
+    def _theme_stage(self, prompt: StagedPrompt) -> str:
+        """Pipeline stage: the interpreter's theme, readable by any consumer of the prompt"""
+        return self._detect_theme(prompt.stage('interpreter.hits', self._hits_stage))
+    
+    def _match(self, tokens: TokenizedPrompt) -> KeywordHits:
+        """Single whole-word scan of the shared tokenization; every detector reads the hit table"""
+        # Words no keyword uses may be typos of keywords ("platfromer", "cyberpnk")
+        correction = self.fuzzy_index.correct(tokens)
+        if correction.matches:
+            return self.matcher.scan_weighted(correction.ids, correction.weights)
+        
+        return tokens.match(self.matcher)
+
+    def interpret_prompts(self, prompts: List[str]) -> List[GameConfig]:
+        """
+        Interpret a batch of prompts in one call
+        
+        Prompts are deduplicated by their normalized tokens, the unique token
+        sequences are scanned together, and each distinct interpretation is
+        built once and shared (GameConfig is immutable).
+        
+        Args:
+            prompts: Natural language descriptions, e.g. a whole prompt history
+            
+        Returns:
+            GameConfig objects in the same order as the prompts
+        """
+        # Tokenize each distinct text once, bypassing the per-request cache
+        tokenized = {text: TokenizedPrompt(text) for text in dict.fromkeys(prompts)}
+        
+        # Texts that normalize to the same tokens share one interpretation
+        unique_sequences = {}
+        for tokens in tokenized.values():
+            unique_sequences.setdefault(tokens.tokens, tokens)
+        
+        # Sequences with typo corrections are scanned with their confidences, the rest together
+        corrections = {sequence: self.fuzzy_index.correct(tokens) for sequence, tokens in unique_sequences.items()}
+        exact = [sequence for sequence, correction in corrections.items() if not correction.matches]
+        
+        hits_by_sequence = dict(zip(exact, self.matcher.scan_batch(unique_sequences[sequence].ids for sequence in exact)))
+        for sequence, correction in corrections.items():
+            if correction.matches:
+                hits_by_sequence[sequence] = self.matcher.scan_weighted(correction.ids, correction.weights)
+        
+        configs = {sequence: self._build_config(hits) for sequence, hits in hits_by_sequence.items()}
+        
+        return [configs[tokenized[prompt].tokens] for prompt in prompts]
+
+    def create_session(self) -> 'InterpretationSession':
+        """Start an incremental interpretation session for type-ahead previews"""
+        return InterpretationSession(self)
+
+    def preview_config(self, hits: KeywordHits) -> Dict[str, Any]:
+        """Cheap subset of the GameConfig fields, for live previews while the user types"""
+        genre = self._detect_genre(hits)
+        
+        return {
+            'genre': genre,
+            'subgenre': self._detect_subgenre(hits, genre),
+            'theme': self._detect_theme(hits),
+            'protagonist': self._detect_protagonist(hits),
+            'antagonist': self._detect_antagonist(hits),
+            'mechanics': tuple(self._detect_mechanics(hits, genre)),
+            'visual_style': self._detect_visual_style(hits),
+            'mood': self._detect_mood(hits),
+            'difficulty': self._detect_difficulty(hits)
+        }
+
+    def _build_config(self, hits: KeywordHits, genre: Optional[str] = None,
+                      theme: Optional[str] = None) -> GameConfig:
+        """Run every detector against one hit table and assemble the GameConfig"""
+        # Extract core game elements (genre and theme may come from pipeline stages)
+        if genre is None:
+            genre = self._detect_genre(hits)
+        subgenre = self._detect_subgenre(hits, genre)
+        if theme is None:
+            theme = self._detect_theme(hits)
+        setting = self._detect_setting(hits, theme)
+        protagonist = self._detect_protagonist(hits)
+        antagonist = self._detect_antagonist(hits)
+        mechanics = self._detect_mechanics(hits, genre)
+        visual_style = self._detect_visual_style(hits)
+        mood = self._detect_mood(hits)
+        difficulty = self._detect_difficulty(hits)
+        complexity = self._assess_complexity(hits)
+        special_features = self._detect_special_features(hits)
         color_palette = self._generate_color_palette(theme, mood, visual_style)
         audio_style = self._determine_audio_style(theme, mood, genre)
-        narrative_elements = self._extract_narrative_elements(prompt_lower)
-        target_audience = self._determine_target_audience(prompt_lower, difficulty)
+        narrative_elements = self._extract_narrative_elements(hits)
+        target_audience = self._determine_target_audience(hits, difficulty)
         estimated_playtime = self._estimate_playtime(complexity, genre)
         
         return GameConfig(
@@ -224,91 +435,48 @@ class AdvancedPromptInterpreter:
             setting=setting,
             protagonist=protagonist,
             antagonist=antagonist,
-            mechanics=mechanics,
+            mechanics=tuple(mechanics),
             visual_style=visual_style,
             mood=mood,
             difficulty=difficulty,
             complexity=complexity,
-            special_features=special_features,
+            special_features=tuple(special_features),
             color_palette=color_palette,
             audio_style=audio_style,
-            narrative_elements=narrative_elements,
+            narrative_elements=tuple(narrative_elements),
             target_audience=target_audience,
             estimated_playtime=estimated_playtime
         )
 
-    def _detect_genre(self, prompt: str) -> str:
+    def _detect_genre(self, hits: KeywordHits) -> str:
         """Detect the primary game genre from the prompt"""
-        genre_scores = {}
-        
-        for genre, keywords in self.genre_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in prompt)
-            if score > 0:
-                genre_scores[genre] = score
+        # Exact keywords count fully, typo matches by their confidence
+        genre_scores = hits.weighted_scores('genre')
         
         if genre_scores:
             return max(genre_scores, key=genre_scores.get)
         
         # Fallback based on common patterns
-        if any(word in prompt for word in ['jump', 'platform', 'side']):
-            return 'platformer'
-        elif any(word in prompt for word in ['shoot', 'gun', 'enemy']):
-            return 'shooter'
-        elif any(word in prompt for word in ['puzzle', 'solve', 'brain']):
-            return 'puzzle'
-        elif any(word in prompt for word in ['race', 'car', 'speed']):
-            return 'racing'
-        else:
-            return 'action'  # Default fallback
+        return hits.first('fallback:genre') or 'action'  # Default fallback
 
-    def _detect_subgenre(self, prompt: str, genre: str) -> Optional[str]:
+    def _detect_subgenre(self, hits: KeywordHits, genre: str) -> Optional[str]:
         """Detect subgenre based on main genre and additional context"""
-        subgenre_map = {
-            'platformer': {
-                'metroidvania': ['explore', 'backtrack', 'ability', 'unlock'],
-                'endless runner': ['endless', 'infinite', 'runner', 'continuous'],
-                'puzzle platformer': ['puzzle', 'solve', 'brain', 'logic']
-            },
-            'shooter': {
-                'bullet hell': ['bullet', 'hell', 'intense', 'overwhelming'],
-                'twin stick': ['twin', 'stick', 'dual', 'control'],
-                'space shooter': ['space', 'alien', 'spaceship', 'galaxy']
-            },
-            'puzzle': {
-                'match-3': ['match', 'three', 'connect', 'line'],
-                'sliding puzzle': ['slide', 'sliding', 'tile', 'arrange'],
-                'logic puzzle': ['logic', 'deduction', 'reasoning', 'brain']
-            }
-        }
-        
-        if genre in subgenre_map:
-            for subgenre, keywords in subgenre_map[genre].items():
-                if any(keyword in prompt for keyword in keywords):
-                    return subgenre
+        if genre in self.subgenre_keywords:
+            return hits.first(f'subgenre:{genre}')
         
         return None
 
-    def _detect_theme(self, prompt: str) -> str:
+    def _detect_theme(self, hits: KeywordHits) -> str:
         """Detect the thematic setting of the game"""
-        theme_scores = {}
-        
-        for theme, keywords in self.theme_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in prompt)
-            if score > 0:
-                theme_scores[theme] = score
+        theme_scores = hits.weighted_scores('theme')
         
         if theme_scores:
             return max(theme_scores, key=theme_scores.get)
         
         # Contextual fallback
-        if any(word in prompt for word in ['dream', 'sleep', 'night']):
-            return 'fantasy'
-        elif any(word in prompt for word in ['city', 'street', 'building']):
-            return 'urban'
-        else:
-            return 'fantasy'  # Default fallback
+        return hits.first('fallback:theme') or 'fantasy'  # Default fallback
 
-    def _detect_setting(self, prompt: str, theme: str) -> str:
+    def _detect_setting(self, hits: KeywordHits, theme: str) -> str:
         """Determine the specific setting based on theme and context"""
         setting_map = {
             'fantasy': ['enchanted forest', 'magical kingdom', 'mystical realm', 'ancient castle'],
@@ -324,47 +492,26 @@ class AdvancedPromptInterpreter:
         else:
             return f"{theme} environment"
 
-    def _detect_protagonist(self, prompt: str) -> str:
+    def _detect_protagonist(self, hits: KeywordHits) -> str:
         """Identify the main character or protagonist"""
-        for character, keywords in self.protagonist_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                return character
+        protagonist = hits.first('protagonist')
+        if protagonist:
+            return protagonist
         
         # Contextual detection
-        if any(word in prompt for word in ['player', 'character', 'hero']):
-            return 'hero'
-        elif any(word in prompt for word in ['animal', 'creature']):
-            return 'creature'
-        else:
-            return 'adventurer'  # Default fallback
+        return hits.first('fallback:protagonist') or 'adventurer'  # Default fallback
 
-    def _detect_antagonist(self, prompt: str) -> Optional[str]:
+    def _detect_antagonist(self, hits: KeywordHits) -> Optional[str]:
         """Identify enemies or antagonistic forces"""
-        antagonist_keywords = {
-            'monsters': ['monster', 'beast', 'creature', 'demon'],
-            'robots': ['robot', 'machine', 'android', 'cyborg'],
-            'aliens': ['alien', 'extraterrestrial', 'invader'],
-            'pirates': ['pirate', 'bandit', 'raider', 'thief'],
-            'ghosts': ['ghost', 'spirit', 'phantom', 'specter'],
-            'dragons': ['dragon', 'wyrm', 'serpent', 'drake']
-        }
-        
-        for antagonist, keywords in antagonist_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                return antagonist
-        
-        if any(word in prompt for word in ['enemy', 'villain', 'bad', 'evil']):
-            return 'enemies'
+        antagonist = hits.first('antagonist')
+        if antagonist:
+            return antagonist
         
-        return None
+        return hits.first('fallback:antagonist')
 
-    def _detect_mechanics(self, prompt: str, genre: str) -> List[str]:
+    def _detect_mechanics(self, hits: KeywordHits, genre: str) -> List[str]:
         """Identify core gameplay mechanics"""
-        detected_mechanics = []
-        
-        for mechanic, keywords in self.mechanics_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                detected_mechanics.append(mechanic)
+        detected_mechanics = hits.labels('mechanics')
         
         # Add genre-specific default mechanics
         genre_defaults = {
@@ -383,11 +530,11 @@ class AdvancedPromptInterpreter:
         
         return detected_mechanics if detected_mechanics else ['movement', 'interaction']
 
-    def _detect_visual_style(self, prompt: str) -> str:
+    def _detect_visual_style(self, hits: KeywordHits) -> str:
         """Determine the visual art style"""
-        for style, keywords in self.visual_styles.items():
-            if any(keyword in prompt for keyword in keywords):
-                return style
+        visual_style = hits.first('visual_style')
+        if visual_style:
+            return visual_style
         
         # Theme-based defaults
         theme_style_map = {
@@ -400,11 +547,11 @@ class AdvancedPromptInterpreter:
         # This would need theme detection first, simplified for now
         return 'cartoon'  # Default fallback
 
-    def _detect_mood(self, prompt: str) -> str:
+    def _detect_mood(self, hits: KeywordHits) -> str:
         """Determine the emotional tone and atmosphere"""
-        for mood, keywords in self.mood_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                return mood
+        mood = hits.first('mood')
+        if mood:
+            return mood
         
         # Genre-based defaults
         genre_mood_map = {
@@ -416,29 +563,18 @@ class AdvancedPromptInterpreter:
         
         return 'cheerful'  # Default fallback
 
-    def _detect_difficulty(self, prompt: str) -> str:
+    def _detect_difficulty(self, hits: KeywordHits) -> str:
         """Assess intended difficulty level"""
-        for difficulty, keywords in self.difficulty_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                return difficulty
+        difficulty = hits.first('difficulty')
+        if difficulty:
+            return difficulty
         
         # Context-based assessment
-        if any(word in prompt for word in ['child', 'kid', 'family']):
-            return 'easy'
-        elif any(word in prompt for word in ['expert', 'master', 'pro']):
-            return 'hard'
-        else:
-            return 'medium'  # Default
+        return hits.first('fallback:difficulty') or 'medium'  # Default
 
-    def _assess_complexity(self, prompt: str) -> int:
+    def _assess_complexity(self, hits: KeywordHits) -> int:
         """Assess game complexity on a scale of 1-10"""
-        complexity_indicators = [
-            'multiple levels', 'story', 'characters', 'inventory', 'upgrades',
-            'multiplayer', 'achievements', 'customization', 'progression',
-            'dialogue', 'quests', 'crafting', 'economy', 'factions'
-        ]
-        
-        complexity_score = sum(1 for indicator in complexity_indicators if indicator in prompt)
+        complexity_score = hits.total('complexity')
         
         # Base complexity by genre
         genre_complexity = {
@@ -455,26 +591,9 @@ class AdvancedPromptInterpreter:
         
         return min(10, max(1, complexity_score))
 
-    def _detect_special_features(self, prompt: str) -> List[str]:
+    def _detect_special_features(self, hits: KeywordHits) -> List[str]:
         """Identify special or unique features mentioned"""
-        features = []
-        
-        feature_keywords = {
-            'multiplayer': ['multiplayer', 'coop', 'versus', 'online'],
-            'procedural': ['procedural', 'random', 'generated', 'infinite'],
-            'physics': ['physics', 'realistic', 'gravity', 'momentum'],
-            'day_night': ['day', 'night', 'time', 'cycle'],
-            'weather': ['weather', 'rain', 'snow', 'storm'],
-            'achievements': ['achievement', 'trophy', 'reward', 'unlock'],
-            'customization': ['customize', 'personalize', 'modify', 'edit'],
-            'voice_acting': ['voice', 'narration', 'spoken', 'audio']
-        }
-        
-        for feature, keywords in feature_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                features.append(feature)
-        
-        return features
+        return hits.labels('special_features')
 
     def _generate_color_palette(self, theme: str, mood: str, visual_style: str) -> str:
         """Generate appropriate color palette based on theme, mood, and style"""
@@ -516,33 +635,15 @@ class AdvancedPromptInterpreter:
         
         return audio_map.get(theme, 'upbeat_electronic')
 
-    def _extract_narrative_elements(self, prompt: str) -> List[str]:
+    def _extract_narrative_elements(self, hits: KeywordHits) -> List[str]:
         """Extract story and narrative elements"""
-        elements = []
-        
-        narrative_keywords = {
-            'quest': ['quest', 'mission', 'journey', 'adventure'],
-            'rescue': ['rescue', 'save', 'help', 'protect'],
-            'discovery': ['discover', 'find', 'uncover', 'reveal'],
-            'revenge': ['revenge', 'vengeance', 'payback', 'retribution'],
-            'survival': ['survive', 'escape', 'endure', 'overcome'],
-            'mystery': ['mystery', 'secret', 'hidden', 'unknown'],
-            'romance': ['love', 'romance', 'relationship', 'heart'],
-            'friendship': ['friend', 'companion', 'ally', 'team']
-        }
-        
-        for element, keywords in narrative_keywords.items():
-            if any(keyword in prompt for keyword in keywords):
-                elements.append(element)
-        
-        return elements
+        return hits.labels('narrative')
 
-    def _determine_target_audience(self, prompt: str, difficulty: str) -> str:
+    def _determine_target_audience(self, hits: KeywordHits, difficulty: str) -> str:
         """Determine the intended target audience"""
-        if any(word in prompt for word in ['child', 'kid', 'family', 'young']):
-            return 'children'
-        elif any(word in prompt for word in ['adult', 'mature', 'complex']):
-            return 'adults'
+        audience = hits.first('fallback:audience')
+        if audience:
+            return audience
         elif difficulty in ['easy', 'medium']:
             return 'general'
         else:
@@ -606,6 +707,125 @@ Estimated Playtime: {config.estimated_playtime}
         """Export configuration as JSON string"""
         return json.dumps(asdict(config), indent=2)
 
+class InterpretationSession:
+    """
+    Incremental interpreter for one prompt box.
+    Keeps the matcher state after every token, so an edit only rolls back to
+    the first changed token and re-scans the suffix instead of the whole prompt.
+    The typo-tolerant lookups spend the same per-prompt budgets as ``TrigramIndex.correct``.
+    Updates are serialized, so concurrent requests for one session are safe.
+    """
+    
+    def __init__(self, interpreter: AdvancedPromptInterpreter):
+        self.interpreter = interpreter
+        self.matcher = interpreter.matcher
+        self.text = ''
+        self.tokens_scanned = 0
+        self._lock = threading.Lock()
+        
+        self._spans: List[Tuple[int, int]] = []     # token offsets in the lowered text
+        self._states: List[int] = []                # automaton state after each token
+        self._emitted: List[Tuple[int, ...]] = []   # keyword ids ending at each token
+        self._weights: List[float] = []             # match confidence of each token (1.0 exact)
+        self._found: Dict[int, int] = {}            # keyword id -> occurrences so far
+        self._typos = 0                             # tokens matched by the typo-tolerant lookup
+        self._budgets: List[int] = []               # fuzzy comparisons left after each token
+        self._looked_up: List[Optional[str]] = []   # word first looked up at each token, if any
+        self._resolved: Dict[str, Optional[FuzzyMatch]] = {}   # word -> lookup result (one lookup each)
+    
+    def update(self, prompt: str) -> Dict[str, Any]:
+        """Feed the current contents of the prompt box and return the preview fields"""
+        with self._lock:
+            return self._update(prompt)
+    
+    def _update(self, prompt: str) -> Dict[str, Any]:
+        lowered = clamp_text(prompt, MAX_PROMPT_CHARS).lower()
+        
+        # Length of the unchanged prefix since the previous update
+        previous = self.text
+        limit = min(len(previous), len(lowered))
+        prefix = 0
+        while prefix < limit and previous[prefix] == lowered[prefix]:
+            prefix += 1
+        
+        # Roll back every token touching the changed region (it may have grown or been edited)
+        keep = len(self._spans)
+        while keep and self._spans[keep - 1][1] >= prefix:
+            keep -= 1
+        self._rollback(keep)
+        
+        # Scan only the new suffix, resuming from the saved automaton state
+        state = self._states[-1] if self._states else 0
+        start = self._spans[-1][1] if self._spans else 0
+        found = self._found
+        resolved = self._resolved
+        fuzzy_index = self.interpreter.fuzzy_index
+        budget = [self._budgets[-1] if self._budgets else fuzzy_index.max_comparisons]
+        for match in TOKEN_PATTERN.finditer(lowered, start):
+            word = match.group()
+            token = normalize_token(word)
+            symbol = vocabulary.get(token)
+            weight = 1.0
+            looked_up = None
+            if not symbol and MIN_FUZZY_LENGTH <= len(word) <= MAX_FUZZY_LENGTH:
+                # Same typo-tolerant lookup and limits as interpret_prompt: each distinct word
+                # is looked up once, until max_lookups words or the comparisons are spent
+                if (word not in resolved and len(resolved) < fuzzy_index.max_lookups
+                        and budget[0] > 0):
+                    resolved[word] = fuzzy_index.resolve(word, token, budget)
+                    looked_up = word
+                correction = resolved.get(word)
+                if correction is not None:
+                    symbol, weight = correction.token_id, correction.confidence
+                    self._typos += 1
+            state, emitted = self.matcher.advance(state, symbol)
+            self._spans.append(match.span())
+            self._states.append(state)
+            self._emitted.append(emitted)
+            self._weights.append(weight)
+            self._budgets.append(budget[0])
+            self._looked_up.append(looked_up)
+            for keyword_id in emitted:
+                found[keyword_id] = found.get(keyword_id, 0) + 1
+            self.tokens_scanned += 1
+        
+        self.text = lowered
+        return self.interpreter.preview_config(KeywordHits(self.matcher, dict(found), self._confidence()))
+    
+    def _confidence(self) -> Optional[Dict[int, float]]:
+        """Best confidence per keyword, as scan_weighted reports it (None while every token is exact)"""
+        if not self._typos:
+            return None
+        lengths = self.matcher.keyword_lengths
+        weights = self._weights
+        confidence: Dict[int, float] = {}
+        for position, emitted in enumerate(self._emitted):
+            for keyword_id in emitted:
+                weight = min(weights[position - lengths[keyword_id] + 1:position + 1])
+                if weight > confidence.get(keyword_id, 0.0):
+                    confidence[keyword_id] = weight
+        return confidence
+    
+    def _rollback(self, keep: int):
+        """Forget every token after the first ``keep`` ones"""
+        found = self._found
+        for emitted in self._emitted[keep:]:
+            for keyword_id in emitted:
+                found[keyword_id] -= 1
+                if not found[keyword_id]:
+                    del found[keyword_id]
+        
+        self._typos -= sum(1 for weight in self._weights[keep:] if weight < 1.0)
+        for word in self._looked_up[keep:]:
+            if word is not None:
+                del self._resolved[word]
+        del self._spans[keep:]
+        del self._states[keep:]
+        del self._emitted[keep:]
+        del self._weights[keep:]
+        del self._budgets[keep:]
+        del self._looked_up[keep:]
+
 # Example usage and testing
 if __name__ == "__main__":
     interpreter = AdvancedPromptInterpreter()
@@ -627,3 +847,12 @@ if __name__ == "__main__":
         print("\nJSON Export:")
         print(interpreter.export_config_json(config))
         print("\n" + "="*80)
+    
+    # Live previews while typing agree with the full interpretation, typos included
+    for prompt in ["a spce shootr with alens", "a fantsy platfromer with dragns", "a cyberpnk racng game"]:
+        session = interpreter.create_session()
+        for end in range(1, len(prompt) + 1):
+            preview = session.update(prompt[:end])
+        config = interpreter.interpret_prompt(prompt)
+        assert all(getattr(config, field) == value for field, value in preview.items())
+        print(f"Preview of '{prompt}': {preview['genre']}/{preview['theme']}")
@@ -0,0 +1,123 @@
+"""
+Asset Bundles - Content-addressed static bundles shared by generated games
+Stores each distinct CSS/JavaScript fragment once and serves it from an immutable URL
+
+This module provides:
+- Content-hashed bundle names (the same engine code always gets the same URL)
+- Deduplicated in-memory bundle storage shared by every game in the process
+- Lookup of bundles by name for the static bundle route
+- Size statistics (unique bundles, bytes stored, bytes saved by sharing)
+- gzip/brotli variants of each bundle, compressed once when it is first stored
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+from content_encoding import precompress
+
+# URL prefix the bundle route is mounted on
+BUNDLE_URL_PREFIX = '/bundles/'
+
+# Bundles never change under a given name, so browsers and CDNs may keep them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+CONTENT_TYPES = {
+    'css': 'text/css; charset=utf-8',
+    'js': 'application/javascript; charset=utf-8'
+}
+
+@dataclass(frozen=True)
+class Bundle:
+    """One stored bundle; the name embeds the content digest"""
+    name: str
+    digest: str
+    content: bytes
+    content_type: str
+    variants: Dict[str, bytes] = field(default_factory=dict, compare=False)
+
+    @property
+    def url(self) -> str:
+        return BUNDLE_URL_PREFIX + self.name
+
+class BundleStore:
+    """
+    Content-addressed bundle storage.
+    Fragments are looked up by their text first, so the digest of a fragment
+    the engines hand out again (they come from a shared cache) is computed once.
+    """
+
+    def __init__(self):
+        self._bundles: Dict[str, Bundle] = {}
+        self._by_content: Dict[str, Bundle] = {}
+        self._lock = threading.Lock()
+        self.references = 0
+        self.referenced_bytes = 0
+
+    def add(self, content: str, extension: str) -> Bundle:
+        """Store a fragment (if new) and return its bundle"""
+        bundle = self._by_content.get(content)
+        if bundle is None:
+            encoded = content.encode('utf-8')
+            digest = hashlib.sha256(encoded).hexdigest()[:20]
+            bundle = Bundle(f"{digest}.{extension}", digest, encoded, CONTENT_TYPES[extension],
+                            precompress(encoded))
+            with self._lock:
+                bundle = self._bundles.setdefault(bundle.name, bundle)
+                self._by_content[content] = bundle
+
+        with self._lock:
+            self.references += 1
+            self.referenced_bytes += len(bundle.content)
+        return bundle
+
+    def get(self, name: str) -> Optional[Bundle]:
+        """Bundle stored under a name, or None"""
+        return self._bundles.get(name)
+
+    def __len__(self) -> int:
+        return len(self._bundles)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Unique bundles, stored bytes and bytes saved by sharing them"""
+        with self._lock:
+            stored = sum(len(bundle.content) for bundle in self._bundles.values())
+            compressed = sum(len(body) for bundle in self._bundles.values() for body in bundle.variants.values())
+            return {
+                'bundles': len(self._bundles),
+                'stored_bytes': stored,
+                'compressed_bytes': compressed,
+                'references': self.references,
+                'referenced_bytes': self.referenced_bytes,
+                'bytes_saved': self.referenced_bytes - stored
+            }
+
+# Store shared by the generator and the bundle route
+bundle_store = BundleStore()
+
+# Example usage and testing
+if __name__ == "__main__":
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from modular_game_generator import ModularGameGenerator
+    # Use the store the generator imported so the stats below are the ones it filled
+    from asset_bundles import bundle_store
+
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator()
+
+    prompts = [
+        "a platformer where a cat travels through dreams",
+        "a platformer with a ninja in a mystical forest",
+        "a space shooter defending Earth from alien invaders",
+        "a sliding puzzle with mystical fantasy theme",
+        "a cyberpunk racing game with neon lights",
+        "a cyberpunk racing game through rainy streets"
+    ]
+
+    for prompt in prompts:
+        assets = generator.generate_game(interpreter.interpret_prompt(prompt))
+        inline_page = generator.assemble_game_html(assets)
+        bundled_page = generator.assemble_bundled_html(assets)
+        print(f"{prompt[:45]:<45} inline {len(inline_page.encode()):>6} B  bundled {len(bundled_page.encode()):>5} B")
+
+    print(f"\nBundle store: {bundle_store.get_stats()}")
@@ -0,0 +1,363 @@
+"""
+Asset Minifier - Conservative minification of generated CSS and JavaScript
+Strips comments and indentation from game assets without touching their meaning
+
+This module provides:
+- CSS minification (comments, whitespace runs, spaces around braces, semicolons and commas)
+- JavaScript minification that only removes comments and collapses whitespace between tokens;
+  line breaks are kept, so automatic semicolon insertion behaves exactly as before
+- Strings, template literals and regular expression literals copied verbatim
+- Whole-document minification of inline <style> and <script> blocks
+- A minification cache keyed by fragment text, with bytes saved per genre
+- A self-check (run this module) that passes every genre's scripts through a JS syntax check
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Any, Callable, Tuple
+
+# Characters after which a '/' starts a regular expression literal rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                  'void', 'throw', 'instanceof', 'yield', 'await'}
+
+# Whitespace around these CSS characters carries no meaning
+CSS_TIGHT_CHARS = set('{};,')
+
+STYLE_BLOCK_PATTERN = re.compile(r'(<style\b[^>]*>)(.*?)(</style>)', re.IGNORECASE | re.DOTALL)
+SCRIPT_BLOCK_PATTERN = re.compile(r'(<script\b(?![^>]*\bsrc=)[^>]*>)(.*?)(</script>)', re.IGNORECASE | re.DOTALL)
+
+def _skip_quoted(source: str, i: int) -> int:
+    """Index just past the string literal starting at ``source[i]`` (a quote)"""
+    quote = source[i]
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote or char == '\n':   # unterminated strings end at the line break
+            return i + 1
+        i += 1
+    return i
+
+def _skip_template(source: str, i: int) -> int:
+    """Index just past the template literal starting at ``source[i]`` (a backtick)"""
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+        elif char == '`':
+            return i + 1
+        elif char == '$' and source.startswith('${', i):
+            i = _skip_braced(source, i + 2)
+        else:
+            i += 1
+    return i
+
+def _skip_braced(source: str, i: int) -> int:
+    """Index just past the '}' closing a template expression that starts at ``source[i]``"""
+    depth = 0
+    while i < len(source):
+        char = source[i]
+        if char in '\'"':
+            i = _skip_quoted(source, i)
+        elif char == '`':
+            i = _skip_template(source, i)
+        elif char == '{':
+            depth += 1
+            i += 1
+        elif char == '}':
+            if depth == 0:
+                return i + 1
+            depth -= 1
+            i += 1
+        else:
+            i += 1
+    return i
+
+def _skip_regex(source: str, i: int) -> int:
+    """Index just past the regular expression literal body starting at ``source[i]`` (a '/')"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return i
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            return i + 1
+        i += 1
+    return i
+
+def _regex_allowed(out: list) -> bool:
+    """Whether a '/' after the emitted code so far begins a regular expression"""
+    text = ''.join(out[-3:]).rstrip() if out else ''
+    if not text:
+        return True
+    if text[-1] in REGEX_PRECEDERS:
+        return True
+    match = re.search(r'([A-Za-z_$][\w$]*)$', ''.join(out[-12:]))
+    return bool(match) and match.group(1) in REGEX_KEYWORDS
+
+def minify_js(source: str) -> str:
+    """
+    Remove comments and redundant whitespace from JavaScript.
+    Whitespace inside a line collapses to one space and indentation and blank lines
+    are dropped, but every remaining line break is kept; literals are never modified.
+    """
+    out: list = []
+    pending = ''        # '', ' ' or '\n': whitespace owed before the next token
+    i = 0
+    length = len(source)
+
+    def flush():
+        nonlocal pending
+        if pending and out:
+            out.append(pending)
+        pending = ''
+
+    while i < length:
+        char = source[i]
+
+        if char in ' \t\r\n':
+            if char == '\n':
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i += 1
+            continue
+
+        if char == '/' and i + 1 < length and source[i + 1] == '/':
+            end = source.find('\n', i)
+            i = length if end == -1 else end
+            continue
+
+        if char == '/' and i + 1 < length and source[i + 1] == '*':
+            end = source.find('*/', i + 2)
+            comment = source[i:length if end == -1 else end + 2]
+            i += len(comment)
+            if '\n' in comment:
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            continue
+
+        if char in '\'"':
+            end = _skip_quoted(source, i)
+        elif char == '`':
+            end = _skip_template(source, i)
+        elif char == '/' and _regex_allowed(out):
+            end = _skip_regex(source, i)
+        else:
+            end = i + 1
+
+        flush()
+        out.append(source[i:end])
+        i = end
+
+    return ''.join(out)
+
+def minify_css(source: str) -> str:
+    """Remove comments and redundant whitespace from CSS; string contents are kept as they are"""
+    out: list = []
+    pending = False
+    i = 0
+    length = len(source)
+
+    while i < length:
+        char = source[i]
+
+        if char in ' \t\r\n\f':
+            pending = True
+            i += 1
+            continue
+
+        if char == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            pending = True
+            continue
+
+        end = _skip_quoted(source, i) if char in '\'"' else i + 1
+        previous = out[-1][-1] if out else ''
+        if pending and out and char not in CSS_TIGHT_CHARS and previous not in CSS_TIGHT_CHARS and previous != ':':
+            out.append(' ')
+        pending = False
+
+        # A semicolon directly before a closing brace is redundant
+        if char == '}' and previous == ';':
+            out[-1] = out[-1][:-1]
+        out.append(source[i:end])
+        i = end
+
+    return ''.join(out)
+
+def minify_document(html: str) -> str:
+    """Minify the inline <style> and <script> blocks of an HTML document, leaving the markup alone"""
+    html = STYLE_BLOCK_PATTERN.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), html)
+    return SCRIPT_BLOCK_PATTERN.sub(lambda m: m.group(1) + minify_js(m.group(2)) + m.group(3), html)
+
+class AssetMinifier:
+    """
+    Minification with a cache keyed by fragment text.
+    Engines hand out the same fragment objects from their fragment cache, and a
+    string caches its own hash, so a repeated fragment costs one dict lookup.
+    Whole documents are cached too, so the cache is bounded by characters held
+    (originals and results) as well as by entries.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_chars: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._cache: Dict[Tuple[str, str], str] = {}
+        self._cached_chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.genre_stats: Dict[str, List[int]] = {}
+
+    def minify(self, kind: str, fragment: str, genre: str = 'unknown') -> str:
+        """Minified ``fragment`` of the given kind ('css', 'js' or 'html'), counted under ``genre``"""
+        key = (kind, fragment)
+        minified = self._cache.get(key)
+        hit = minified is not None
+        if not hit:
+            minified = MINIFIERS[kind](fragment)
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+                size = len(fragment) + len(minified)
+                if len(self._cache) >= self.max_entries or self._cached_chars + size > self.max_chars:
+                    self._cache.clear()
+                    self._cached_chars = 0
+                if size <= self.max_chars:
+                    self._cache[key] = minified
+                    self._cached_chars += size
+            stats = self.genre_stats.get(genre)
+            if stats is None:
+                stats = self.genre_stats[genre] = [0, 0, 0]   # fragments, bytes in, bytes out
+            stats[0] += 1
+            stats[1] += len(fragment)
+            stats[2] += len(minified)
+        return minified
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hit rate and bytes saved per genre"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            genres = {
+                genre: {
+                    'fragments': fragments,
+                    'bytes_in': bytes_in,
+                    'bytes_out': bytes_out,
+                    'bytes_saved': bytes_in - bytes_out,
+                    'ratio': round(bytes_out / bytes_in, 3) if bytes_in else 1.0
+                }
+                for genre, (fragments, bytes_in, bytes_out) in self.genre_stats.items()
+            }
+            return {
+                'entries': len(self._cache),
+                'cached_chars': self._cached_chars,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'genres': genres
+            }
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {'css': minify_css, 'js': minify_js, 'html': minify_document}
+
+# Whether generators minify their output unless told otherwise
+MINIFY_BY_DEFAULT = os.environ.get('MINIFY_GAME_ASSETS', '1') != '0'
+
+# Minifier shared by the generators
+asset_minifier = AssetMinifier()
+
+def check_js_syntax(sources: Dict[str, str]) -> Dict[str, str]:
+    """Syntax errors by name for each JavaScript source, checked with ``node --check``"""
+    import shutil
+    import subprocess
+    import tempfile
+
+    node = shutil.which('node')
+    if node is None:
+        raise RuntimeError("node is not installed; cannot check JavaScript syntax")
+
+    errors = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (name, source) in enumerate(sources.items()):
+            path = os.path.join(directory, f"script_{index}.js")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            result = subprocess.run([node, '--check', path], capture_output=True, text=True)
+            if result.returncode != 0:
+                lines = [line for line in result.stderr.splitlines() if 'Error' in line]
+                errors[name] = lines[0].strip() if lines else 'syntax error'
+    return errors
+
+# Example usage and self-check: every genre's scripts must still parse after minification
+if __name__ == "__main__":
+    import sys
+    import genre_modules
+    import true_game_engines
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from modular_game_generator import ModularGameGenerator
+
+    colors = {'primary': '#4A148C', 'secondary': '#7B1FA2', 'accent': '#FFD700'}
+    fonts = {'family': "'Segoe UI', sans-serif", 'body_size': '16px', 'title_size': '2.5em', 'weight': 'bold'}
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator(minify=False)
+
+    documents: Dict[str, str] = {}
+    scripts: Dict[str, str] = {}
+    for genre in ['platformer', 'shooter', 'puzzle', 'racing']:
+        assets = generator.generate_game(interpreter.interpret_prompt(f"a {genre} game in a cyberpunk city"))
+        scripts[f"modular.{genre}"] = assets.javascript_code
+        documents[f"modular.{genre}.css"] = assets.css_styles
+    for module_class in (genre_modules.PuzzleModule, genre_modules.ShooterModule, genre_modules.PlatformerModule,
+                         genre_modules.RacingModule, genre_modules.RPGModule, genre_modules.StrategyModule):
+        module = module_class()
+        module.minify = False
+        documents[f"genre_modules.{module.genre}"] = module.generate({}, colors, fonts, {})
+    documents['true_game_engines.racing'] = true_game_engines.RacingGameEngine().generate_racing_game({'theme': 'space'})
+    documents['true_game_engines.puzzle'] = true_game_engines.PuzzleGameEngine().generate_puzzle_game({'theme': 'fantasy'})
+
+    for name, document in documents.items():
+        for index, match in enumerate(SCRIPT_BLOCK_PATTERN.finditer(document)):
+            scripts[f"{name}.script{index}"] = match.group(2)
+
+    checked = {}
+    for name, script in scripts.items():
+        checked[name] = script
+        checked[f"{name} (minified)"] = minify_js(script)
+    errors = check_js_syntax(checked)
+
+    print(f"{'source':<36} {'original':>9} {'minified':>9} {'saved':>6}")
+    for name, script in scripts.items():
+        minified = minify_js(script)
+        print(f"{name:<36} {len(script):>9} {len(minified):>9} {1 - len(minified) / len(script):>6.0%}")
+    for name, css in documents.items():
+        minified = minify_css(css) if name.endswith('.css') else minify_document(css)
+        print(f"{name:<36} {len(css):>9} {len(minified):>9} {1 - len(minified) / len(css):>6.0%}")
+
+    minified_errors = {name: error for name, error in errors.items() if name.endswith('(minified)')}
+    original_errors = {name: error for name, error in errors.items() if name not in minified_errors}
+    if original_errors:
+        print(f"\nScripts that already fail to parse before minification: {original_errors}")
+    introduced = {name: error for name, error in minified_errors.items()
+                  if name[:-len(' (minified)')] not in original_errors}
+    print(f"\nJS syntax check: {len(scripts)} scripts, {len(introduced)} broken by minification")
+    for name, error in introduced.items():
+        print(f"  {name}: {error}")
+    sys.exit(1 if introduced else 0)
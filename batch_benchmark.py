@@ -0,0 +1,110 @@
+"""
+Batch Benchmark - Scaling of process-pool game generation with worker count
+Measures games/sec of BatchGameGenerator against in-process serial generation
+
+This module provides:
+- A deterministic catalogue of GameConfigs covering every engine and theme
+- Serial games/sec as the single-core baseline
+- Games/sec, speedup and parallel efficiency for each worker count (pools warmed before timing)
+- A check that seeded batch output is identical to serial generation
+- JSON output for keeping results next to the other benchmark baselines
+
+Usage:
+    python batch_benchmark.py
+    python batch_benchmark.py --games 20000 --workers 1 2 4 8 --json batch_results.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Dict, List, Any, Optional
+from advanced_prompt_interpreter import AdvancedPromptInterpreter, GameConfig
+from modular_game_generator import ModularGameGenerator
+from batch_generator import BatchGameGenerator, WARM_PROMPTS
+
+def build_catalogue(games: int) -> List[GameConfig]:
+    """``games`` configs cycling through every genre and theme"""
+    interpreter = AdvancedPromptInterpreter()
+    configs = [interpreter.interpret_prompt(prompt) for prompt in WARM_PROMPTS]
+    return [configs[index % len(configs)] for index in range(games)]
+
+def default_worker_counts() -> List[int]:
+    """1, 2, 4, ... up to the number of CPUs (always including the CPU count itself)"""
+    cpus = os.cpu_count() or 1
+    counts = []
+    workers = 1
+    while workers < cpus:
+        counts.append(workers)
+        workers *= 2
+    counts.append(cpus)
+    return counts
+
+def best_rate(run, games: int, rounds: int) -> float:
+    """Best games/sec over ``rounds`` timed runs"""
+    best = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        best = max(best, games / (time.perf_counter() - start))
+    return best
+
+def run_benchmark(games: int = 5000, worker_counts: Optional[List[int]] = None,
+                  chunk_size: Optional[int] = None, rounds: int = 3) -> Dict[str, Any]:
+    """Serial and per-worker-count throughput over one catalogue"""
+    catalogue = build_catalogue(games)
+    seeds = list(range(games))
+    worker_counts = worker_counts or default_worker_counts()
+
+    generator = ModularGameGenerator()
+    serial_games = [generator.generate_game(config, seed) for config, seed in zip(catalogue, seeds)]
+    serial = best_rate(lambda: [generator.generate_game(config, seed) for config, seed in zip(catalogue, seeds)],
+                       games, rounds)
+
+    pools = []
+    for workers in worker_counts:
+        with BatchGameGenerator(max_workers=workers, chunk_size=chunk_size) as batch:
+            # The first batch starts and warms the pool; it also checks the output
+            assert batch.generate_all(catalogue, seeds) == serial_games, f"{workers} workers: output differs"
+            rate = best_rate(lambda: batch.generate_all(catalogue, seeds), games, rounds)
+        pools.append({'workers': workers, 'games_per_sec': round(rate, 1)})
+
+    one_worker = pools[0]['games_per_sec'] if worker_counts[0] == 1 else None
+    for result in pools:
+        result['speedup_vs_serial'] = round(result['games_per_sec'] / serial, 3)
+        if one_worker:
+            result['efficiency'] = round(result['games_per_sec'] / (one_worker * result['workers']), 3)
+
+    return {
+        'games': games,
+        'cpus': os.cpu_count(),
+        'serial_games_per_sec': round(serial, 1),
+        'pools': pools
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark process-pool batch game generation")
+    parser.add_argument('--games', type=int, default=5000, help="games per batch")
+    parser.add_argument('--workers', type=int, nargs='+', help="worker counts to measure (default 1, 2, 4, ... CPUs)")
+    parser.add_argument('--chunk-size', type=int, help="games per submitted chunk (default: automatic)")
+    parser.add_argument('--rounds', type=int, default=3, help="timed batches per configuration")
+    parser.add_argument('--json', help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.games, args.workers, args.chunk_size, args.rounds)
+
+    print(f"{results['games']} games, {results['cpus']} CPUs, serial {results['serial_games_per_sec']:.0f} games/s\n")
+    print(f"{'workers':>7} {'games/s':>10} {'vs serial':>10} {'efficiency':>11}")
+    for result in results['pools']:
+        efficiency = f"{result['efficiency']:.0%}" if 'efficiency' in result else '-'
+        print(f"{result['workers']:>7} {result['games_per_sec']:>10.0f} "
+              f"{result['speedup_vs_serial']:>9.2f}x {efficiency:>11}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Batch Generator - Catalogue-scale game generation over a process pool
+Fans lists of GameConfigs or prompts out to worker processes for showcase seeding and load tests
+
+This module provides:
+- A batch API taking GameConfig objects and/or prompt strings, with optional per-item seeds
+- Chunked submission to a ProcessPoolExecutor (one pickle round trip per chunk, not per game)
+- Results streamed back in completion order, tagged with each item's input index
+- Worker processes that warm their fragment and minification caches once, at start-up
+- Batch counters (games, chunks, seconds) for the health report and the batch benchmark
+"""
+
+import math
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple, Union
+from advanced_prompt_interpreter import AdvancedPromptInterpreter, GameConfig
+from modular_game_generator import ModularGameGenerator, GameAssets
+
+# Chunks submitted per worker when no chunk size is given: enough to balance uneven
+# chunks across workers, few enough that pickling stays a small share of the work
+CHUNKS_PER_WORKER = 4
+
+# Prompts generated once in every worker so each engine's fragments are cached before real work
+WARM_PROMPTS = [
+    f"a {genre} game in a {theme} world"
+    for genre in ['platformer', 'shooter', 'puzzle', 'racing']
+    for theme in ['fantasy', 'sci-fi', 'cyberpunk', 'underwater', 'forest']
+]
+
+BatchItem = Union[GameConfig, str]
+
+# Per-process state of a worker, set up once by _init_worker
+_worker_interpreter: Optional[AdvancedPromptInterpreter] = None
+_worker_generator: Optional[ModularGameGenerator] = None
+
+def _init_worker(minify: Optional[bool], warm_prompts: Sequence[str]):
+    """Create the worker's interpreter and generator and warm the engine caches"""
+    global _worker_interpreter, _worker_generator
+    _worker_interpreter = AdvancedPromptInterpreter()
+    _worker_generator = ModularGameGenerator(minify=minify)
+    for prompt in warm_prompts:
+        _worker_generator.generate_game(_worker_interpreter.interpret_prompt(prompt), seed=0)
+
+def _generate_chunk(chunk: List[Tuple[int, BatchItem, Optional[int]]]) -> List[Tuple[int, GameAssets]]:
+    """Generate one chunk of (index, config or prompt, seed) items inside a worker"""
+    if _worker_generator is None:
+        _init_worker(None, ())
+    results = []
+    for index, item, seed in chunk:
+        config = _worker_interpreter.interpret_prompt(item) if isinstance(item, str) else item
+        results.append((index, _worker_generator.generate_game(config, seed)))
+    return results
+
+class BatchGameGenerator:
+    """
+    Process-pool game generation for whole catalogues.
+    The pool is started on first use and reused across batches; close it with
+    ``close()`` or by using the generator as a context manager.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 minify: Optional[bool] = None, warm_prompts: Sequence[str] = WARM_PROMPTS):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.minify = minify
+        self.warm_prompts = list(warm_prompts)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.games = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @property
+    def workers(self) -> int:
+        """Number of worker processes in the pool"""
+        return self._get_executor()._max_workers
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.minify, self.warm_prompts)
+                )
+            return self._executor
+
+    def _chunk(self, items: Sequence[BatchItem], seeds: Optional[Sequence[Optional[int]]]) -> List[list]:
+        if seeds is not None and len(seeds) != len(items):
+            raise ValueError(f"got {len(seeds)} seeds for {len(items)} items")
+        size = self.chunk_size or max(1, math.ceil(len(items) / (self.workers * CHUNKS_PER_WORKER)))
+        tagged = [(index, item, seeds[index] if seeds is not None else None) for index, item in enumerate(items)]
+        return [tagged[start:start + size] for start in range(0, len(tagged), size)]
+
+    def generate_batch(self, items: Sequence[BatchItem],
+                       seeds: Optional[Sequence[Optional[int]]] = None) -> Iterator[Tuple[int, GameAssets]]:
+        """
+        Generate a game for every config or prompt, yielding (input index, assets)
+        as soon as each chunk completes. A failing item raises when its chunk is reached.
+        """
+        chunks = self._chunk(items, seeds)
+        executor = self._get_executor()
+        start = time.perf_counter()
+        futures = [executor.submit(_generate_chunk, chunk) for chunk in chunks]
+
+        generated = 0
+        try:
+            for future in as_completed(futures):
+                for index, assets in future.result():
+                    generated += 1
+                    yield index, assets
+        finally:
+            for future in futures:
+                future.cancel()
+            with self._lock:
+                self.batches += 1
+                self.games += generated
+                self.chunks += len(chunks)
+                self.seconds += time.perf_counter() - start
+
+    def generate_all(self, items: Sequence[BatchItem],
+                     seeds: Optional[Sequence[Optional[int]]] = None) -> List[GameAssets]:
+        """Generate every game and return them in input order"""
+        results: List[Optional[GameAssets]] = [None] * len(items)
+        for index, assets in self.generate_batch(items, seeds):
+            results[index] = assets
+        return results
+
+    def close(self):
+        """Shut the worker pool down (a later batch starts a new one)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> 'BatchGameGenerator':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Games generated and throughput over every batch so far"""
+        with self._lock:
+            return {
+                'workers': self._executor._max_workers if self._executor else 0,
+                'batches': self.batches,
+                'games': self.games,
+                'chunks': self.chunks,
+                'seconds': round(self.seconds, 3),
+                'games_per_sec': round(self.games / self.seconds, 1) if self.seconds else 0.0
+            }
+
+# Example usage and testing
+if __name__ == "__main__":
+    prompts = [
+        "a platformer where a cat travels through dreams",
+        "a space shooter defending Earth from alien invaders",
+        "a sliding puzzle with mystical fantasy theme",
+        "a cyberpunk racing game with neon lights"
+    ] * 50
+    seeds = list(range(len(prompts)))
+
+    with BatchGameGenerator(max_workers=2) as batch:
+        order = []
+        for index, assets in batch.generate_batch(prompts, seeds):
+            order.append(index)
+        print(f"Streamed {len(order)} games; first indices in completion order: {order[:8]}")
+
+        # Seeded batch output matches serial generation exactly
+        games = batch.generate_all(prompts, seeds)
+        interpreter = AdvancedPromptInterpreter()
+        generator = ModularGameGenerator()
+        for index in (0, 1, 2, 3, len(prompts) - 1):
+            serial = generator.generate_game(interpreter.interpret_prompt(prompts[index]), seeds[index])
+            assert games[index] == serial, f"batch game {index} differs from serial generation"
+        print(f"Batch output matches serial generation; stats: {batch.get_stats()}")
@@ -11,7 +11,7 @@ import time
 from datetime import datetime
 import os
 import requests
-import re
+from input_limits import extract_json_object
 
 def generate_game(description):
     """
@@ -160,9 +160,9 @@ def parse_ai_game_response(content, game_id):
             content = content.replace('```', '').strip()
         
         # Try to find JSON in the response
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            content = json_match.group()
+        json_object = extract_json_object(content)
+        if json_object:
+            content = json_object
         
         # Parse JSON
         game_data = json.loads(content)
@@ -0,0 +1,250 @@
+"""
+Fuzzy Matcher - Typo-tolerant keyword lookup for prompt analysis
+Character-trigram index over keyword vocabularies with a hard per-prompt cost cap
+
+This module provides:
+- A precomputed trigram index over every word of a keyword matcher's tables
+- Candidate filtering by shared trigrams, verified with a bounded edit distance
+- Match confidence scores (1.0 exact, lower for more edits relative to word length)
+- Per-prompt corrections of unknown tokens into keyword token IDs
+- Lookup and comparison budgets so long or hostile prompts stay cheap
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from prompt_tokenizer import TokenizedPrompt, phrase_tokens, vocabulary, TOKEN_PATTERN
+
+# Words shorter than this are never corrected (too many real words sit one edit apart)
+MIN_FUZZY_LENGTH = 4
+
+# Longer words are never corrected (no keyword is that long, and it bounds the cost per lookup)
+MAX_FUZZY_LENGTH = 24
+
+def trigrams(word: str) -> List[str]:
+    """Padded character trigrams of a word"""
+    padded = f"$${word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions and
+    adjacent transpositions), or ``limit + 1`` as soon as it is known to exceed ``limit``
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_minimum = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_minimum = min(row_minimum, value)
+        if row_minimum > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+def allowed_edits(length: int) -> int:
+    """Edits tolerated for a word of the given length"""
+    return 1 if length <= 9 else 2
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """An unknown prompt word matched to a keyword word"""
+    word: str
+    match: str
+    token_id: int
+    confidence: float
+
+@dataclass
+class FuzzyCorrection:
+    """Token IDs of a prompt with approximate matches substituted, and their confidences"""
+    ids: array
+    weights: List[float]
+    matches: List[FuzzyMatch]
+    lookups: int
+    comparisons: int
+    truncated: bool          # True when the per-prompt budget ran out
+
+class TrigramIndex:
+    """
+    Trigram index over the words of a keyword matcher.
+
+    Both the raw keyword words and their normalized tokens are indexed, and
+    each maps to the normalized token's vocabulary ID, so a corrected word
+    feeds straight into the matcher's token-level automaton.
+    """
+
+    def __init__(self, words: Dict[str, int], min_confidence: float = 0.75,
+                 max_lookups: int = 32, max_comparisons: int = 256, cache_size: int = 4096):
+        self.min_confidence = min_confidence
+        self.max_lookups = max_lookups
+        self.max_comparisons = max_comparisons
+        self.cache_size = cache_size
+
+        self.words: List[str] = []
+        self.token_ids: List[int] = []
+        self.gram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        self._cache: Dict[str, Optional[FuzzyMatch]] = {}
+
+        for word, token_id in words.items():
+            if not MIN_FUZZY_LENGTH <= len(word) <= MAX_FUZZY_LENGTH:
+                continue
+            word_index = len(self.words)
+            self.words.append(word)
+            self.token_ids.append(token_id)
+            grams = set(trigrams(word))
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(word_index)
+
+    @classmethod
+    def from_matcher(cls, matcher, **options) -> 'TrigramIndex':
+        """Index every word of a token-level KeywordMatcher's keywords"""
+        words: Dict[str, int] = {}
+        for keyword in matcher.keywords:
+            raw_words = TOKEN_PATTERN.findall(keyword.lower())
+            for raw, token in zip(raw_words, phrase_tokens(keyword)):
+                token_id = vocabulary.get(token)
+                if token_id:
+                    words.setdefault(raw, token_id)
+                    words.setdefault(token, token_id)
+        return cls(words, **options)
+
+    def lookup(self, word: str, budget: Optional[List[int]] = None) -> Optional[FuzzyMatch]:
+        """
+        Best keyword word within the allowed edits of ``word``, or None.
+        ``budget`` is a one-element list of remaining comparisons, decremented in place.
+        """
+        cached = self._cache.get(word)
+        if cached is not None or word in self._cache:
+            return cached
+
+        grams = set(trigrams(word))
+        limit = allowed_edits(len(word))
+
+        # Count shared trigrams per candidate; one edit changes at most 4 of them
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for word_index in self.postings.get(gram, ()):
+                shared[word_index] = shared.get(word_index, 0) + 1
+
+        best = None
+        best_confidence = self.min_confidence
+        for word_index, count in sorted(shared.items(), key=lambda item: -item[1]):
+            if count < max(len(grams), self.gram_counts[word_index]) - 4 * limit:
+                continue
+            candidate = self.words[word_index]
+            # Typos rarely hit the first letter; real words often differ only there (tower/power).
+            # A keyword followed by extra letters is a derived word, not a typo (timer/time)
+            if candidate[0] != word[0] or word.startswith(candidate):
+                continue
+            if budget is not None:
+                if budget[0] <= 0:
+                    return best   # out of budget: keep the answer uncached
+                budget[0] -= 1
+
+            distance = bounded_edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            confidence = 1.0 - distance / max(len(word), len(candidate))
+            if confidence > best_confidence:
+                best_confidence = confidence
+                best = FuzzyMatch(word, candidate, self.token_ids[word_index], round(confidence, 3))
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[word] = best
+        return best
+
+    def resolve(self, word: str, token: str, budget: Optional[List[int]] = None) -> Optional[FuzzyMatch]:
+        """Best match for a prompt word or its normalized token (None for words never corrected)"""
+        if not MIN_FUZZY_LENGTH <= len(word) <= MAX_FUZZY_LENGTH:
+            return None
+        match = self.lookup(word, budget)
+        if token != word:
+            alternative = self.lookup(token, budget)
+            if alternative and (match is None or alternative.confidence > match.confidence):
+                match = alternative
+        return match
+
+    def correct(self, tokens: TokenizedPrompt) -> FuzzyCorrection:
+        """
+        Substitute approximate matches for the prompt tokens no keyword uses.
+        At most ``max_lookups`` distinct words are looked up and at most
+        ``max_comparisons`` candidates verified per prompt; the rest stay unknown.
+        """
+        ids = array('I', tokens.ids)
+        weights = [1.0] * len(ids)
+        matches: List[FuzzyMatch] = []
+        resolved: Dict[str, Optional[FuzzyMatch]] = {}
+        budget = [self.max_comparisons]
+        lookups = 0
+        truncated = False
+
+        for position, token_id in enumerate(ids):
+            if token_id:
+                continue
+            word = tokens.words[position]
+            if not MIN_FUZZY_LENGTH <= len(word) <= MAX_FUZZY_LENGTH:
+                continue
+
+            if word not in resolved:
+                if lookups >= self.max_lookups or budget[0] <= 0:
+                    truncated = True
+                    continue
+                lookups += 1
+                resolved[word] = self.resolve(word, tokens.tokens[position], budget)
+
+            match = resolved[word]
+            if match is not None:
+                ids[position] = match.token_id
+                weights[position] = match.confidence
+                matches.append(match)
+
+        return FuzzyCorrection(ids, weights, matches, lookups,
+                               self.max_comparisons - budget[0], truncated)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Size of the index"""
+        return {
+            'words': len(self.words),
+            'trigrams': len(self.postings),
+            'cached_lookups': len(self._cache)
+        }
+
+# Example usage and testing
+if __name__ == "__main__":
+    import time
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from prompt_tokenizer import TokenizedPrompt
+
+    interpreter = AdvancedPromptInterpreter()
+    index = interpreter.fuzzy_index
+    print(f"Index: {index.get_stats()}")
+
+    for prompt in ["a platfromer with a ninja cat", "cyberpnk racing through neon streets",
+                   "a spaec shooter agaisnt alein invaders", "an undrewater puzzel adventure"]:
+        correction = index.correct(TokenizedPrompt(prompt))
+        config = interpreter.interpret_prompt(prompt)
+        print(f"\nPrompt: '{prompt}'")
+        print(f"  Corrections: {[(m.word, m.match, m.confidence) for m in correction.matches]}")
+        print(f"  Genre: {config.genre}  Theme: {config.theme}")
+
+    # Pathological input: thousands of distinct unknown words stay within the budget
+    garbage = ' '.join(f"zq{i:05d}xv" for i in range(20000))
+    start = time.perf_counter()
+    correction = index.correct(TokenizedPrompt(garbage))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\n{len(garbage)} chars of noise: {correction.lookups} lookups, "
+          f"{correction.comparisons} comparisons, truncated={correction.truncated}, {elapsed:.1f} ms")
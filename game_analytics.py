@@ -0,0 +1,429 @@
+"""
+Game Analytics - Streaming, memory-bounded per-game statistics
+Summarizes every recorded play and rating in constant time per event, without keeping the events
+
+This module provides:
+- HyperLogLog distinct counting (exact while small, then a fixed register array) for unique players
+- DDSketch quantiles with bounded relative error for session times, in at most a fixed number of buckets
+- A count-min sketch shared by all games, counting plays per hour of day and day of week
+- Completion rates, recent ratings and a per-game summary assembled from the sketches
+- Validation of reported session fields (a finite, non-negative duration and a true/false completion)
+"""
+
+import os
+import math
+import time
+import threading
+from array import array
+from collections import deque
+from typing import Dict, List, Any, Hashable, Optional, Set, Tuple
+
+MASK64 = (1 << 64) - 1
+
+# HyperLogLog registers per game are 2 ** precision bytes; the standard error is 1.04 / sqrt(2 ** precision)
+HLL_PRECISION = int(os.environ.get('GAME_ANALYTICS_HLL_PRECISION', 10))
+
+# Session-time quantiles are within this relative error; a game keeps at most
+# SESSION_MAX_BUCKETS counters, and the lowest are merged beyond that
+SESSION_RELATIVE_ACCURACY = float(os.environ.get('GAME_ANALYTICS_SESSION_ACCURACY', 0.02))
+SESSION_MAX_BUCKETS = 256
+SESSION_PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+
+# Count-min table shared by every game: width counters per row, one row per hash
+COUNT_MIN_WIDTH = int(os.environ.get('GAME_ANALYTICS_COUNT_MIN_WIDTH', 1 << 16))
+COUNT_MIN_DEPTH = 4
+
+RECENT_RATINGS = 10
+
+# Count-min keys per game: hours 0-23, then weekdays (Monday = 0) at 24-30
+HOUR_SLOTS = 24
+DAY_PARTS = [('night', range(0, 6)), ('morning', range(6, 12)),
+             ('afternoon', range(12, 18)), ('evening', range(18, 24))]
+WEEKEND_DAYS = (5, 6)
+
+def mix64(value: int) -> int:
+    """SplitMix64 finalizer: spreads every input bit over the 64-bit result"""
+    value &= MASK64
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & MASK64
+    return value ^ (value >> 31)
+
+def hash64(value: Hashable) -> int:
+    """64-bit hash of a value (stable within a process, like ``hash``)"""
+    return mix64(hash(value))
+
+def session_report(duration: Any = None, completed: Any = None) -> Tuple[Optional[float], Optional[bool]]:
+    """A session's duration (seconds) and completion as reported by a client, validated; raises ValueError"""
+    if duration is not None:
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) \
+                or not math.isfinite(duration) or duration < 0:
+            raise ValueError("duration must be a finite, non-negative number of seconds")
+        duration = float(duration)
+    if completed is not None and not isinstance(completed, bool):
+        raise ValueError("completed must be true or false")
+    return duration, completed
+
+class HyperLogLog:
+    """
+    Approximate distinct count.
+    Hashes are kept exactly in a set until there are more than 2 ** precision / 32
+    of them (a set entry costs about 32 times a register), then folded into
+    2 ** precision one-byte registers. The register sum used by the estimate is
+    maintained on insert, so counting is O(1).
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.size = 1 << precision
+        self.sparse_limit = max(self.size // 32, 1)
+        self._sparse: Optional[Set[int]] = set()
+        self._registers: Optional[bytearray] = None
+        self._inverse_sum = float(self.size)   # sum of 2 ** -register
+        self._zeros = self.size                # registers still at zero
+
+    def add(self, value: Hashable):
+        """Count a value (repeats are not counted again)"""
+        hashed = hash64(value)
+        if self._sparse is not None:
+            self._sparse.add(hashed)
+            if len(self._sparse) > self.sparse_limit:
+                self._densify()
+            return
+        self._insert(hashed)
+
+    def _densify(self):
+        self._registers = bytearray(self.size)
+        for hashed in self._sparse:
+            self._insert(hashed)
+        self._sparse = None
+
+    def _insert(self, hashed: int):
+        index = hashed & (self.size - 1)
+        # Position of the first 1 bit in the remaining bits, counting from 1
+        rank = 65 - self.precision - (hashed >> self.precision).bit_length()
+        old = self._registers[index]
+        if rank > old:
+            self._registers[index] = rank
+            self._inverse_sum += 2.0 ** -rank - 2.0 ** -old
+            if not old:
+                self._zeros -= 1
+
+    @property
+    def dense(self) -> bool:
+        return self._registers is not None
+
+    def count(self) -> int:
+        """Estimated distinct values (exact while sparse)"""
+        if self._sparse is not None:
+            return len(self._sparse)
+        size = self.size
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / self._inverse_sum
+        if estimate <= 2.5 * size and self._zeros:
+            estimate = size * math.log(size / self._zeros)   # linear counting for small cardinalities
+        return round(estimate)
+
+class DDSketch:
+    """
+    Quantile sketch with relative error guarantees.
+    A positive value x falls in bucket ceil(log_gamma(x)), gamma = (1 + a) / (1 - a),
+    and every value of a bucket is reported as the one point within relative error a
+    of all of them. Buckets are counters in one array covering the lowest to the
+    highest bucket seen; past ``max_buckets`` the lowest are merged into one, which
+    keeps the upper quantiles exact to within a. Zero and negative values are
+    counted as zero. Count, sum and mean are exact.
+    """
+
+    def __init__(self, relative_accuracy: float = SESSION_RELATIVE_ACCURACY,
+                 max_buckets: int = SESSION_MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self._counts = array('Q')
+        self._offset = 0          # bucket index of _counts[0]
+        self._collapsed = False   # _counts[0] also holds every lower bucket
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        if not math.isfinite(value):
+            raise ValueError(f"cannot add {value!r} to a quantile sketch")
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        self.total += value
+        index = math.ceil(math.log(value) / self._log_gamma)
+        counts = self._counts
+        if not counts:
+            self._offset = index
+            counts.append(1)
+        elif index < self._offset:
+            if self._collapsed:
+                counts[0] += 1
+                return
+            self._counts = array('Q', bytes(8 * (self._offset - index))) + counts
+            self._counts[0] = 1
+            self._offset = index
+            self._collapse()
+        elif index - self._offset < len(counts):
+            counts[index - self._offset] += 1
+        else:
+            counts.extend(array('Q', bytes(8 * (index - self._offset - len(counts)))))
+            counts.append(1)
+            self._collapse()
+
+    def _collapse(self):
+        counts = self._counts
+        excess = len(counts) - self.max_buckets
+        if excess > 0:
+            counts[excess] += sum(counts[:excess])
+            del counts[:excess]
+            self._offset += excess
+            self._collapsed = True
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Value at the given fraction of the distribution (None when empty)"""
+        if not self.count:
+            return None
+        rank = fraction * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for position, count in enumerate(self._counts):
+            seen += count
+            if seen > rank:
+                return 2 * self.gamma ** (self._offset + position) / (self.gamma + 1)
+        return 2 * self.gamma ** (self._offset + len(self._counts) - 1) / (self.gamma + 1)
+
+    @property
+    def buckets(self) -> int:
+        return len(self._counts)
+
+class CountMinSketch:
+    """
+    Approximate counts for any number of keys in a fixed table.
+    Each key has one counter per row; counts are overestimated by at most
+    e / width of the total with probability 1 - e^-depth. Updates are
+    conservative (only counters at the key's current minimum grow), which
+    tightens the overestimate further.
+    """
+
+    def __init__(self, width: int = COUNT_MIN_WIDTH, depth: int = COUNT_MIN_DEPTH):
+        self.width = width
+        self.depth = depth
+        self._table = array('I', bytes(4 * width * depth))
+        self._rows = [(row, row * width) for row in range(depth)]   # (row, offset of its counters)
+        self.total = 0
+
+    def _cells(self, hashed: int) -> List[int]:
+        # Row i uses h1 + i * h2 (two hashes stand in for depth independent ones)
+        first, second = hashed & 0xffffffff, (hashed >> 32) | 1
+        width = self.width
+        return [offset + (first + row * second) % width for row, offset in self._rows]
+
+    def add(self, hashed: int, count: int = 1):
+        """Add to the key with the given 64-bit hash"""
+        table = self._table
+        cells = self._cells(hashed)
+        counts = [table[cell] for cell in cells]
+        target = min(counts) + count
+        for cell, current in zip(cells, counts):
+            if current < target:
+                table[cell] = target
+        self.total += count
+
+    def estimate(self, hashed: int) -> int:
+        """Count for the key with the given 64-bit hash (never an underestimate)"""
+        table = self._table
+        return min([table[cell] for cell in self._cells(hashed)])
+
+    @property
+    def nbytes(self) -> int:
+        return self._table.itemsize * len(self._table)
+
+class GameSketches:
+    """Sketches and counters for one game"""
+
+    def __init__(self, precision: int, relative_accuracy: float, max_buckets: int):
+        self.plays = 0
+        self.players = HyperLogLog(precision)
+        self.session_seconds = DDSketch(relative_accuracy, max_buckets)
+        self.completion_reports = 0
+        self.completions = 0
+        self.recent_ratings: deque = deque(maxlen=RECENT_RATINGS)
+
+class GameAnalytics:
+    """
+    Per-game streaming statistics.
+    Every event updates a fixed number of counters and registers, so recording is
+    O(1) and a game's memory is bounded however many events it gets: at most
+    2 ** precision HyperLogLog registers and ``max_buckets`` session counters, with
+    play times in one count-min table shared by all games.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION,
+                 relative_accuracy: float = SESSION_RELATIVE_ACCURACY,
+                 max_buckets: int = SESSION_MAX_BUCKETS,
+                 width: int = COUNT_MIN_WIDTH, depth: int = COUNT_MIN_DEPTH):
+        self.precision = precision
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._games: Dict[str, GameSketches] = {}
+        self._play_times = CountMinSketch(width, depth)
+        self._lock = threading.Lock()
+
+    def _sketches(self, game_id: str) -> GameSketches:
+        sketches = self._games.get(game_id)
+        if sketches is None:
+            sketches = self._games[game_id] = GameSketches(self.precision, self.relative_accuracy,
+                                                           self.max_buckets)
+        return sketches
+
+    def record_play(self, game_id: str, user_id: str, timestamp: Optional[float] = None,
+                    duration: Optional[float] = None, completed: Optional[bool] = None):
+        """Count a play; ``duration`` (seconds) and ``completed`` are taken when the session reported them"""
+        duration, completed = session_report(duration, completed)
+        moment = time.localtime(timestamp)
+        game_hash = hash64(game_id)
+        with self._lock:
+            sketches = self._sketches(game_id)
+            sketches.plays += 1
+            sketches.players.add(user_id)
+            self._add_session(sketches, duration, completed)
+            self._play_times.add(mix64(game_hash + moment.tm_hour))
+            self._play_times.add(mix64(game_hash + HOUR_SLOTS + moment.tm_wday))
+
+    def record_session(self, game_id: str, duration: Optional[float] = None, completed: Optional[bool] = None):
+        """Take a session's duration (seconds) and/or completion reported after its play was counted"""
+        duration, completed = session_report(duration, completed)
+        with self._lock:
+            self._add_session(self._sketches(game_id), duration, completed)
+
+    @staticmethod
+    def _add_session(sketches: GameSketches, duration: Optional[float], completed: Optional[bool]):
+        if duration is not None:
+            sketches.session_seconds.add(duration)
+        if completed is not None:
+            sketches.completion_reports += 1
+            sketches.completions += completed
+
+    def record_rating(self, game_id: str, rating: float):
+        """Keep a rating among the game's most recent ones"""
+        with self._lock:
+            self._sketches(game_id).recent_ratings.append(rating)
+
+    def _popular_times(self, game_id: str) -> List[str]:
+        """Busiest part of the day and whether weekends are busier per day than weekdays"""
+        game_hash = hash64(game_id)
+        slots = [self._play_times.estimate(mix64(game_hash + slot)) for slot in range(HOUR_SLOTS + 7)]
+        hours, days = slots[:HOUR_SLOTS], slots[HOUR_SLOTS:]
+        if not any(hours):
+            return []
+        busiest = max(DAY_PARTS, key=lambda part: sum(hours[hour] for hour in part[1]))[0]
+        weekend = sum(days[day] for day in WEEKEND_DAYS) / len(WEEKEND_DAYS)
+        weekdays = sum(count for day, count in enumerate(days) if day not in WEEKEND_DAYS) / (7 - len(WEEKEND_DAYS))
+        return [busiest, 'weekend' if weekend > weekdays else 'weekdays']
+
+    def summary(self, game_id: str) -> Dict[str, Any]:
+        """
+        Plays, unique players, session times (seconds), completion rate, recent ratings
+        and popular times; session fields are None until a session has reported them
+        """
+        with self._lock:
+            sketches = self._games.get(game_id)
+            if sketches is None:
+                sketches = GameSketches(self.precision, self.relative_accuracy, self.max_buckets)
+            sessions = sketches.session_seconds
+            return {
+                'plays': sketches.plays,
+                'unique_players': sketches.players.count(),
+                'sessions': sessions.count,
+                'average_session_seconds': sessions.mean if sessions.count else None,
+                'session_seconds_percentiles': {
+                    name: sessions.quantile(fraction) for name, fraction in SESSION_PERCENTILES.items()
+                } if sessions.count else {},
+                'completion_rate': (sketches.completions / sketches.completion_reports
+                                    if sketches.completion_reports else None),
+                'recent_ratings': list(sketches.recent_ratings),
+                'popular_times': self._popular_times(game_id) if sketches.plays else []
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Games tracked and the memory held by their sketches"""
+        with self._lock:
+            dense = sum(1 for sketches in self._games.values() if sketches.players.dense)
+            return {
+                'games': len(self._games),
+                'plays': self._play_times.total // 2,
+                'dense_hyperloglogs': dense,
+                'hyperloglog_register_bytes': dense * (1 << self.precision),
+                'session_bucket_bytes': sum(8 * sketches.session_seconds.buckets
+                                            for sketches in self._games.values()),
+                'count_min_bytes': self._play_times.nbytes
+            }
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(6)
+    analytics = GameAnalytics()
+    players: Dict[str, Set[str]] = {}
+    sessions: Dict[str, List[float]] = {}
+    weekday_evening = time.mktime((2026, 10, 14, 20, 0, 0, 0, 0, -1))   # a Wednesday, 8 pm
+    saturday_morning = time.mktime((2026, 10, 17, 9, 0, 0, 0, 0, -1))
+
+    events = 300000
+    start = time.perf_counter()
+    for number in range(events):
+        game_id = f"game_{int(rng.paretovariate(1.0)) % 200}"
+        user_id = f"user_{int(rng.paretovariate(0.5)) % 200000}"
+        duration = rng.lognormvariate(5.5, 1.0)
+        timestamp = (weekday_evening if game_id != 'game_2' else saturday_morning) + rng.uniform(0, 3600)
+        analytics.record_play(game_id, user_id, timestamp, duration, completed=rng.random() < 0.7)
+        players.setdefault(game_id, set()).add(user_id)
+        sessions.setdefault(game_id, []).append(duration)
+    per_event = (time.perf_counter() - start) / events * 1e6
+
+    for game_id in ['game_1', 'game_2', 'game_7', 'game_150']:
+        summary = analytics.summary(game_id)
+        exact = len(players[game_id])
+        error = abs(summary['unique_players'] - exact) / exact
+        assert error < 4 * 1.04 / math.sqrt(1 << HLL_PRECISION), (game_id, summary['unique_players'], exact)
+        durations = sorted(sessions[game_id])
+        for name, fraction in SESSION_PERCENTILES.items():
+            expected = durations[int(fraction * (len(durations) - 1))]
+            assert abs(summary['session_seconds_percentiles'][name] - expected) <= \
+                SESSION_RELATIVE_ACCURACY * expected * 1.0001
+        assert math.isclose(summary['average_session_seconds'], sum(durations) / len(durations))
+        print(f"{game_id}: {summary['plays']} plays, {summary['unique_players']} players (exact {exact}), "
+              f"p50/p99 {summary['session_seconds_percentiles']['p50']:.0f}/"
+              f"{summary['session_seconds_percentiles']['p99']:.0f} s, "
+              f"completion {summary['completion_rate']:.2f}, {summary['popular_times']}")
+    assert analytics.summary('game_1')['popular_times'] == ['evening', 'weekdays']
+    assert analytics.summary('game_2')['popular_times'] == ['morning', 'weekend']
+    assert analytics.summary('unknown')['plays'] == 0
+    assert analytics.summary('unknown')['average_session_seconds'] is None
+    analytics.record_play('game_new', 'user_1')
+    assert analytics.summary('game_new')['completion_rate'] is None
+    analytics.record_session('game_new', 90, completed=False)
+    assert analytics.summary('game_new')['average_session_seconds'] == 90.0
+    for duration, completed in [('90', None), (float('nan'), None), (-1, None), (True, None), (None, 'yes')]:
+        try:
+            analytics.record_session('game_new', duration, completed)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted session report {duration!r}, {completed!r}")
+
+    # Session buckets stay bounded over a range wider than they can cover
+    sketch = DDSketch(max_buckets=64)
+    for exponent in range(-20, 40):
+        sketch.add(2.0 ** exponent)
+    assert sketch.buckets == 64 and sketch.quantile(1.0) >= 2.0 ** 39 * (1 - SESSION_RELATIVE_ACCURACY)
+    print(f"{per_event:.2f} us per event; stats: {analytics.get_stats()}")
@@ -6,10 +6,12 @@ Creates completely unique games from user descriptions using GROQ AI
 
 import os
 import json
-import re
 import random
 import requests
 from datetime import datetime
+from input_limits import (MAX_PROMPT_CHARS, MAX_AI_RESPONSE_CHARS, clamp_text,
+                          extract_html_document, extract_title, StageTimer)
+from generation_metrics import generation_metrics
 
 class TrueAIGameGenerator:
     def __init__(self):
@@ -19,6 +21,7 @@ class TrueAIGameGenerator:
     def generate_game(self, description):
         """Generate a completely unique game from user description"""
         try:
+            description = clamp_text(description, MAX_PROMPT_CHARS)
             print(f"🎮 Generating unique game from: {description[:100]}...")
             
             if self.groq_api_key:
@@ -101,24 +104,31 @@ Make sure the game is fully functional and matches the user's description exactl
     def _parse_ai_response(self, ai_response, description):
         """Parse AI response and extract game data"""
         try:
-            # Extract HTML content from AI response
-            html_match = re.search(r'<!DOCTYPE html>.*?</html>', ai_response, re.DOTALL | re.IGNORECASE)
+            if len(ai_response) > MAX_AI_RESPONSE_CHARS:
+                print(f"❌ AI response too large ({len(ai_response)} chars)")
+                return self._generate_fallback(description)
             
-            if html_match:
-                html_content = html_match.group(0)
-                
+            timer = StageTimer()
+            
+            # Extract HTML content from AI response (linear scan, no backtracking)
+            with timer.stage('extract_html'):
+                html_content = extract_html_document(ai_response)
+            
+            if html_content:
                 # Extract title from HTML
-                title_match = re.search(r'<title>(.*?)</title>', html_content, re.IGNORECASE)
-                title = title_match.group(1) if title_match else self._generate_title_from_description(description)
+                with timer.stage('extract_title'):
+                    title = extract_title(html_content) or self._generate_title_from_description(description)
                 
                 # Determine genre from description
-                genre = self._determine_genre(description)
+                with timer.stage('determine_genre'):
+                    genre = self._determine_genre(description)
                 
                 return {
                     "title": title,
                     "description": f"A unique {genre} game: {description}",
                     "genre": genre,
-                    "html_content": html_content
+                    "html_content": html_content,
+                    "parse_timings_ms": timer.as_ms()
                 }
             else:
                 print("❌ No valid HTML found in AI response")
@@ -176,16 +186,18 @@ Make sure the game is fully functional and matches the user's description exactl
         genre = self._determine_genre(description)
         
         # Generate themed game based on description
-        if any(word in description_lower for word in ['fairy', 'magic', 'forest', 'mushroom', 'enchanted']):
-            html_content = self._create_fairy_collection_game(description)
-        elif any(word in description_lower for word in ['space', 'alien', 'ship', 'galaxy', 'star']):
-            html_content = self._create_space_adventure_game(description)
-        elif any(word in description_lower for word in ['cook', 'recipe', 'kitchen', 'food', 'chef']):
-            html_content = self._create_cooking_game(description)
-        elif any(word in description_lower for word in ['race', 'car', 'speed', 'drive']):
-            html_content = self._create_racing_game(description)
-        else:
-            html_content = self._create_adventure_game(description)
+        with generation_metrics.measure('game_engine.fallback', genre) as measurement:
+            if any(word in description_lower for word in ['fairy', 'magic', 'forest', 'mushroom', 'enchanted']):
+                html_content = self._create_fairy_collection_game(description)
+            elif any(word in description_lower for word in ['space', 'alien', 'ship', 'galaxy', 'star']):
+                html_content = self._create_space_adventure_game(description)
+            elif any(word in description_lower for word in ['cook', 'recipe', 'kitchen', 'food', 'chef']):
+                html_content = self._create_cooking_game(description)
+            elif any(word in description_lower for word in ['race', 'car', 'speed', 'drive']):
+                html_content = self._create_racing_game(description)
+            else:
+                html_content = self._create_adventure_game(description)
+            measurement.record_document(html_content)
         
         return {
             "title": title,
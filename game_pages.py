@@ -0,0 +1,132 @@
+"""
+Game Pages - Precompiled, ready-to-send game documents
+Encodes a generated game page once at creation so every play streams stored bytes
+
+This module provides:
+- Game pages held as UTF-8 byte chunks (document head first, then the body in bounded pieces)
+- Construction from a finished HTML string or from a template's chunk iterator
+- A streaming iterator for generator responses, with the total length known up front
+- A content digest usable as an ETag
+- gzip/brotli variants compressed once at creation and picked per request
+- Insertion of a snippet (e.g. a reporting script) before a streamed document's </body>
+"""
+
+import hashlib
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from content_encoding import precompress, negotiate_encoding, GZIP_LEVEL, BROTLI_QUALITY
+
+# Largest chunk handed to the server in one write
+PAGE_CHUNK_BYTES = 16 * 1024
+
+HEAD_END = '</head>'
+BODY_END = '</body>'
+
+def insert_before_body_end(pieces: Iterable[str], snippet: str) -> Iterator[str]:
+    """The pieces of a document with ``snippet`` before its first </body> (or at the end without one)"""
+    inserted = False
+    for piece in pieces:
+        if not inserted and BODY_END in piece:
+            split = piece.index(BODY_END)
+            yield piece[:split]
+            yield snippet
+            piece = piece[split:]
+            inserted = True
+        yield piece
+    if not inserted:
+        yield snippet
+
+class GamePage:
+    """
+    A game document encoded once.
+    The first chunk ends right after ``</head>`` so a browser can start fetching
+    the stylesheet and scripts it links before the body has been sent.
+    """
+
+    def __init__(self, chunks: Tuple[bytes, ...], gzip_level: int = GZIP_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY):
+        self.chunks = chunks
+        self.size = sum(len(chunk) for chunk in chunks)
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            digest.update(chunk)
+        self.digest = digest.hexdigest()[:20]
+        self.variants: Dict[str, bytes] = precompress(b''.join(chunks), gzip_level, brotli_quality)
+
+    @classmethod
+    def from_chunks(cls, pieces: Iterable[str], chunk_bytes: int = PAGE_CHUNK_BYTES, **compression) -> 'GamePage':
+        """
+        Encode a document given as consecutive pieces of text (e.g. ``iter_bundled_html`` of the generator).
+        ``compression`` (gzip_level, brotli_quality) is passed on to the page.
+        """
+        chunks: List[bytes] = []
+        pending: List[str] = []
+        pending_chars = 0
+        head_sent = False
+
+        for piece in pieces:
+            if not head_sent and HEAD_END in piece:
+                split = piece.index(HEAD_END) + len(HEAD_END)
+                pending.append(piece[:split])
+                chunks.append(''.join(pending).encode('utf-8', 'replace'))
+                pending, pending_chars, head_sent = [], 0, True
+                piece = piece[split:]
+
+            pending.append(piece)
+            pending_chars += len(piece)
+            if pending_chars >= chunk_bytes:
+                text = ''.join(pending)
+                for start in range(0, len(text), chunk_bytes):
+                    chunks.append(text[start:start + chunk_bytes].encode('utf-8', 'replace'))
+                pending, pending_chars = [], 0
+
+        if pending_chars:
+            chunks.append(''.join(pending).encode('utf-8', 'replace'))
+        return cls(tuple(chunks), **compression)
+
+    @classmethod
+    def from_html(cls, html: str, chunk_bytes: int = PAGE_CHUNK_BYTES, **compression) -> 'GamePage':
+        """Encode a finished HTML document"""
+        return cls.from_chunks([html], chunk_bytes, **compression)
+
+    def stream(self) -> Iterator[bytes]:
+        """The stored chunks in order, for a generator response"""
+        return iter(self.chunks)
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], Iterator[bytes], int]:
+        """(content-coding or None, body iterator, body length) for a request's Accept-Encoding"""
+        encoding = negotiate_encoding(accept_encoding, list(self.variants))
+        if encoding is None:
+            return None, self.stream(), self.size
+        body = self.variants[encoding]
+        return encoding, iter((body,)), len(body)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'bytes': self.size,
+            'chunks': len(self.chunks),
+            'digest': self.digest,
+            'encoded_bytes': {name: len(body) for name, body in self.variants.items()}
+        }
+
+# Example usage and testing
+if __name__ == "__main__":
+    import time
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from modular_game_generator import ModularGameGenerator
+
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator()
+    assets = generator.generate_game(interpreter.interpret_prompt("a space shooter defending Earth from alien invaders"))
+
+    for name, html, pieces in [
+        ('inline', generator.assemble_game_html(assets), None),
+        ('bundled', generator.assemble_bundled_html(assets), generator.iter_bundled_html(assets))
+    ]:
+        page = GamePage.from_html(html) if pieces is None else GamePage.from_chunks(pieces)
+        assert b''.join(page.stream()).decode('utf-8') == html
+        start = time.perf_counter()
+        for _ in range(10000):
+            for chunk in page.stream():
+                pass
+        per_play = (time.perf_counter() - start) / 10000 * 1e6
+        print(f"{name:<8} {page.get_stats()}  first chunk {len(page.chunks[0])} B  stream {per_play:.2f} us/play")
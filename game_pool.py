@@ -0,0 +1,225 @@
+"""
+Game Pool - Pre-generated games for the most requested configurations
+Keeps ready-made games for popular genre/theme combinations so creation skips generation
+
+This module provides:
+- A sliding window of recent create requests and its top-N combinations
+- A background thread that keeps seed-varied games ready for each top combination
+- A refill rate limit, so pre-generation never competes with live traffic for the CPU
+- Optional start of the refill thread on the first request, so it runs only in serving processes
+- Ready games finished once up front (e.g. encoded and compressed pages) by a caller-supplied hook
+- Hand-out with the requester's own title and description patched in, falling back to synchronous generation
+- Hit ratio, refill and eviction counters, and the ready games per combination
+"""
+
+import time
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Deque, Optional, Tuple
+from advanced_prompt_interpreter import GameConfig
+from modular_game_generator import ModularGameGenerator, GameAssets, new_game_seed
+
+# Config fields a pre-generated game must share with the request it is handed to: they
+# select the engine and stylesheet and are recorded in the metadata. The title and
+# description are patched per request from the request's own config.
+POOL_KEY_FIELDS = ('genre', 'theme', 'difficulty', 'visual_style')
+
+@dataclass
+class PooledGame:
+    """A ready game and whatever the finish hook built from it"""
+    assets: GameAssets
+    finished: Any
+
+def pool_key(config: GameConfig) -> Tuple[str, ...]:
+    """The combination a config belongs to"""
+    return tuple(getattr(config, field) for field in POOL_KEY_FIELDS)
+
+class GamePool:
+    """
+    Background pre-generation of games for the top-N combinations in recent traffic.
+    ``create(config)`` hands out a ready game when there is one and generates
+    synchronously otherwise; either way the request is counted towards the top-N.
+    """
+
+    def __init__(self, generator: ModularGameGenerator, finish: Optional[Callable[[GameAssets], Any]] = None,
+                 top_n: int = 8, games_per_combo: int = 4, refill_per_sec: float = 2.0,
+                 window: int = 1000, start_on_demand: bool = False):
+        self.generator = generator
+        self.finish = finish or (lambda assets: None)
+        self.top_n = top_n
+        self.games_per_combo = games_per_combo
+        self.refill_per_sec = refill_per_sec   # games pre-generated per second at most (0: no limit)
+        self.window = window
+        self.start_on_demand = start_on_demand   # start the refill thread on the first create()
+
+        self._recent: Deque[Tuple[str, ...]] = deque()
+        self._counts: Counter = Counter()
+        self._configs: Dict[Tuple[str, ...], GameConfig] = {}   # latest config seen per combination
+        self._ready: Dict[Tuple[str, ...], Deque[PooledGame]] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.evicted = 0
+        self.refill_seconds = 0.0
+
+    def create(self, config: GameConfig) -> Tuple[GameAssets, Any]:
+        """
+        (assets, finished) for a request: a ready game if the pool has one, else a new
+        one with ``finished`` None
+        """
+        if self.start_on_demand and self._thread is None:
+            self.start()
+        
+        key = pool_key(config)
+        with self._condition:
+            self._observe(key, config)
+            ready = self._ready.get(key)
+            pooled = ready.popleft() if ready else None
+            if pooled is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._condition.notify()
+
+        if pooled is None:
+            # The finish hook is for background builds; the caller finishes a game
+            # generated on the request path with whatever settings suit a waiting client
+            return self.generator.generate_game(config), None
+        assets = self.generator.personalize_game(pooled.assets, config)
+        # A page finished with the pooled title no longer matches the game
+        return assets, pooled.finished if assets.title == pooled.assets.title else None
+
+    def _observe(self, key: Tuple[str, ...], config: GameConfig):
+        """Count a request in the sliding window (caller holds the lock)"""
+        self._recent.append(key)
+        self._counts[key] += 1
+        self._configs[key] = config
+        if len(self._recent) > self.window:
+            old = self._recent.popleft()
+            self._counts[old] -= 1
+            if not self._counts[old]:
+                del self._counts[old]
+                self._configs.pop(old, None)
+
+    def top_combinations(self) -> List[Tuple[str, ...]]:
+        """The ``top_n`` most requested combinations in the window, most requested first"""
+        with self._condition:
+            return [key for key, _ in self._counts.most_common(self.top_n)]
+
+    def _next_refill(self) -> Optional[Tuple[Tuple[str, ...], GameConfig]]:
+        """The top combination with the fewest ready games, if any is short (caller holds the lock)"""
+        top = [key for key, _ in self._counts.most_common(self.top_n)]
+
+        # Games of combinations that fell out of the top-N are dropped
+        for key in [key for key in self._ready if key not in top]:
+            self.evicted += len(self._ready.pop(key))
+
+        short = [key for key in top if len(self._ready.get(key, ())) < self.games_per_combo]
+        if not short:
+            return None
+        key = min(short, key=lambda key: len(self._ready.get(key, ())))
+        return key, self._configs[key]
+
+    def refill_once(self) -> bool:
+        """Generate one game for the neediest combination; False if every combination is full"""
+        with self._condition:
+            target = self._next_refill()
+        if target is None:
+            return False
+
+        key, config = target
+        start = time.perf_counter()
+        assets = self.generator.generate_game(config, new_game_seed())
+        pooled = PooledGame(assets, self.finish(assets))
+        with self._condition:
+            self._ready.setdefault(key, deque()).append(pooled)
+            self.generated += 1
+            self.refill_seconds += time.perf_counter() - start
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+            if self.refill_once():
+                if self.refill_per_sec > 0:
+                    time.sleep(1.0 / self.refill_per_sec)
+                continue
+            # Nothing to do until the next request changes the picture
+            with self._condition:
+                if self._running:
+                    self._condition.wait(timeout=1.0)
+
+    def start(self):
+        """Start the background refill thread"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name='game-pool-refill', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refill thread for good (ready games are kept)"""
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._running = False
+            self.start_on_demand = False
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuration, hit ratio and ready games per top combination"""
+        with self._condition:
+            requests = self.hits + self.misses
+            return {
+                'running': self._thread is not None,
+                'top_n': self.top_n,
+                'games_per_combo': self.games_per_combo,
+                'refill_per_sec': self.refill_per_sec,
+                'window': self.window,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / requests, 4) if requests else 0.0,
+                'generated': self.generated,
+                'evicted': self.evicted,
+                'mean_refill_ms': round(self.refill_seconds * 1000 / self.generated, 3) if self.generated else 0.0,
+                'ready': {
+                    '/'.join(str(part) for part in key): len(self._ready.get(key, ()))
+                    for key, _ in self._counts.most_common(self.top_n)
+                }
+            }
+
+# Example usage and testing
+if __name__ == "__main__":
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator()
+    pool = GamePool(generator, top_n=3, games_per_combo=2, refill_per_sec=0)
+
+    traffic = [
+        "a space shooter defending Earth from alien invaders",
+        "a space shooter where a robot defends the moon",
+        "a platformer where a cat travels through dreams",
+        "a cyberpunk racing game with neon lights"
+    ] * 5
+
+    pool.start()
+    for prompt in traffic:
+        config = interpreter.interpret_prompt(prompt)
+        assets, _ = pool.create(config)
+        assert assets.description == generator.describe_game(config)
+        assert assets.title == generator.generate_game(config, assets.metadata['seed']).title
+        time.sleep(0.01)   # give the refill thread a turn between requests
+    pool.stop()
+
+    print(f"Top combinations: {pool.top_combinations()}")
+    print(f"Pool stats: {pool.get_stats()}")
@@ -3,10 +3,12 @@ Game Showcase System - Revolutionary Game Sharing and Discovery Platform
 Advanced system for showcasing, sharing, and discovering AI-generated games
 
 This module provides:
-- Game gallery with filtering and search
+- Game gallery with indexed filtering and full-text search (word prefixes, ranked results)
 - Social sharing and community features
 - Mobile-optimized game viewing
-- Game analytics and statistics
+- Game statistics from streaming per-game sketches (unique players, session times, popular times)
+- A bounded, columnar interaction log
+- Time-decayed trending leaderboard with incrementally maintained top-K
 - User ratings and reviews
 - Game collections and playlists
 - Viral sharing mechanisms
@@ -16,8 +18,13 @@ import json
 import random
 import time
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
+from search_index import InvertedIndex, index_words
+from sorted_index import SortedIndex, GroupedSortedIndex
+from trending_leaderboard import TrendingLeaderboard
+from interaction_log import InteractionLog
+from game_analytics import GameAnalytics, session_report
 
 @dataclass
 class GameEntry:
@@ -47,12 +54,13 @@ class GameStats:
     """Game statistics and analytics"""
     total_plays: int
     unique_players: int
-    average_session_time: float
-    completion_rate: float
+    average_session_time: Optional[float]   # minutes; None until a session reports its duration
+    completion_rate: Optional[float]        # None until a session reports whether it was completed
     user_ratings: List[int]
     popular_times: List[str]
     device_breakdown: Dict[str, int]
     geographic_data: Dict[str, int]
+    session_time_percentiles: Dict[str, float] = field(default_factory=dict)  # minutes
 
 @dataclass
 class UserInteraction:
@@ -71,11 +79,24 @@ class GameShowcaseSystem:
     
     def __init__(self):
         self.games_database = {}
-        self.user_interactions = []
+        self.interaction_log = InteractionLog()
+        self.analytics = GameAnalytics()   # per-game sketches behind get_game_stats
         self.featured_games = []
         self.trending_games = []
         self.game_collections = {}
         
+        # Title/description/tags words -> games, and every game ordered by play count
+        # (search results of equal relevance are listed most played first)
+        self.search_index = InvertedIndex()
+        self.play_ranking = SortedIndex()
+        
+        # Secondary indexes behind the filtered listings, kept current by _update_indexes
+        self.genre_index = GroupedSortedIndex()     # lowercase genre -> games by play count
+        self.theme_index = GroupedSortedIndex()     # lowercase theme -> games by rating
+        
+        # Games by time-decayed activity, with featured games as a tracked subset
+        self.trending = TrendingLeaderboard()
+        
         # Initialize with some sample games for demonstration
         self._initialize_sample_games()
     
@@ -106,6 +127,13 @@ class GameShowcaseSystem:
         )
         
         self.games_database[game_id] = game_entry
+        self.search_index.add(game_id, {
+            'title': game_entry.title,
+            'description': game_entry.description,
+            'tags': game_entry.tags
+        })
+        self.trending.add(game_id)
+        self._update_indexes(game_entry)
         return game_id
     
     def get_game(self, game_id: str) -> Optional[GameEntry]:
@@ -119,60 +147,70 @@ class GameShowcaseSystem:
     
     def get_featured_games(self, limit: int = 10) -> List[GameEntry]:
         """Get featured games"""
-        featured = [game for game in self.games_database.values() if game.featured]
-        return sorted(featured, key=lambda x: x.trending_score, reverse=True)[:limit]
+        return [self.games_database[game_id] for game_id, _ in self.trending.top(limit, 'featured')]
     
     def get_trending_games(self, limit: int = 10) -> List[GameEntry]:
         """Get trending games based on recent activity"""
-        games = list(self.games_database.values())
-        # Sort by trending score (combination of recent plays, likes, and shares)
-        trending = sorted(games, key=lambda x: x.trending_score, reverse=True)
-        return trending[:limit]
+        # Ranked by time-decayed plays, likes, and shares
+        return [self.games_database[game_id] for game_id, _ in self.trending.top(limit)]
     
     def get_games_by_genre(self, genre: str, limit: int = 20) -> List[GameEntry]:
         """Get games filtered by genre"""
-        games = [game for game in self.games_database.values() if game.genre.lower() == genre.lower()]
-        return sorted(games, key=lambda x: x.play_count, reverse=True)[:limit]
+        game_ids = self.genre_index.top([genre.lower()], limit)
+        return [self.games_database[game_id] for game_id in game_ids]
     
     def get_games_by_theme(self, theme: str, limit: int = 20) -> List[GameEntry]:
         """Get games filtered by theme"""
-        games = [game for game in self.games_database.values() if theme.lower() in game.theme.lower()]
-        return sorted(games, key=lambda x: x.rating, reverse=True)[:limit]
+        # A theme matches every indexed theme containing it (e.g. 'sci' matches 'sci-fi')
+        themes = [indexed for indexed in self.theme_index.groups() if theme.lower() in indexed]
+        game_ids = self.theme_index.top(themes, limit)
+        return [self.games_database[game_id] for game_id in game_ids]
     
     def search_games(self, query: str, limit: int = 20) -> List[GameEntry]:
-        """Search games by title, description, or tags"""
-        query_lower = query.lower()
-        matching_games = []
-        
-        for game in self.games_database.values():
-            if (query_lower in game.title.lower() or 
-                query_lower in game.description.lower() or
-                any(query_lower in tag.lower() for tag in game.tags)):
-                matching_games.append(game)
+        """
+        Search games by title, description, or tags. Every query word must start a
+        word of the game; title matches rank above tags and tags above description,
+        whole words above prefixes, and equally relevant games by play count
+        """
+        if not index_words(query):
+            # Nothing to match on: the most played games
+            return [self.games_database[game_id] for game_id in self.play_ranking.top(limit)]
         
-        return sorted(matching_games, key=lambda x: x.play_count, reverse=True)[:limit]
+        results = self.search_index.search(query, limit, self.play_ranking)
+        return [self.games_database[game_id] for game_id, _ in results]
     
     def record_play(self, game_id: str, user_id: str = None, session_data: Dict[str, Any] = None) -> bool:
-        """Record a game play event"""
+        """
+        Record a game play event; ``session_data`` may report the session's
+        'duration' (seconds) and whether it was 'completed' (ValueError if invalid)
+        """
         if game_id not in self.games_database:
             return False
+        session_data = session_data or {}
+        duration, completed = session_report(session_data.get('duration'), session_data.get('completed'))
         
         game = self.games_database[game_id]
         game.play_count += 1
         
         # Update trending score
         self._update_trending_score(game_id, 'play')
+        self._update_indexes(game)
         
         # Record user interaction
-        interaction = UserInteraction(
-            user_id=user_id or f"anonymous_{random.randint(1000, 9999)}",
-            game_id=game_id,
-            action='play',
-            timestamp=datetime.now().isoformat(),
-            metadata=session_data or {}
-        )
-        self.user_interactions.append(interaction)
+        user_id = user_id or f"anonymous_{random.randint(1000, 9999)}"
+        timestamp = time.time()
+        self.interaction_log.append(game_id, user_id, 'play', timestamp=timestamp)
+        self.analytics.record_play(game_id, user_id, timestamp, duration, completed)
+        
+        return True
+    
+    def record_session_end(self, game_id: str, duration: Any = None, completed: Any = None) -> bool:
+        """Record how long a play session lasted (seconds) and/or whether it was completed"""
+        if game_id not in self.games_database:
+            return False
         
+        # Raises ValueError for anything but a finite, non-negative duration and a true/false completion
+        self.analytics.record_session(game_id, duration, completed)
         return True
     
     def record_like(self, game_id: str, user_id: str) -> bool:
@@ -185,21 +223,15 @@ class GameShowcaseSystem:
         
         # Update trending score
         self._update_trending_score(game_id, 'like')
+        self._update_indexes(game)
         
         # Record user interaction
-        interaction = UserInteraction(
-            user_id=user_id,
-            game_id=game_id,
-            action='like',
-            timestamp=datetime.now().isoformat(),
-            metadata={}
-        )
-        self.user_interactions.append(interaction)
+        self.interaction_log.append(game_id, user_id, 'like')
         
         return True
     
     def record_share(self, game_id: str, user_id: str, platform: str = 'general') -> bool:
-        """Record a game share"""
+        """Record a game share (the interaction log does not keep the platform)"""
         if game_id not in self.games_database:
             return False
         
@@ -208,16 +240,10 @@ class GameShowcaseSystem:
         
         # Update trending score (shares have high impact)
         self._update_trending_score(game_id, 'share')
+        self._update_indexes(game)
         
         # Record user interaction
-        interaction = UserInteraction(
-            user_id=user_id,
-            game_id=game_id,
-            action='share',
-            timestamp=datetime.now().isoformat(),
-            metadata={'platform': platform}
-        )
-        self.user_interactions.append(interaction)
+        self.interaction_log.append(game_id, user_id, 'share')
         
         return True
     
@@ -233,16 +259,11 @@ class GameShowcaseSystem:
         new_total = current_total + rating
         new_count = max(1, game.like_count) + 1
         game.rating = new_total / new_count
+        self._update_indexes(game)
         
         # Record user interaction
-        interaction = UserInteraction(
-            user_id=user_id,
-            game_id=game_id,
-            action='rate',
-            timestamp=datetime.now().isoformat(),
-            metadata={'rating': rating}
-        )
-        self.user_interactions.append(interaction)
+        self.interaction_log.append(game_id, user_id, 'rate', value=rating)
+        self.analytics.record_rating(game_id, rating)
         
         return True
     
@@ -251,27 +272,40 @@ class GameShowcaseSystem:
         if game_id not in self.games_database:
             return None
         
-        game = self.games_database[game_id]
-        game_interactions = [i for i in self.user_interactions if i.game_id == game_id]
+        # Read from this game's streaming sketches (constant time however many events it has)
+        summary = self.analytics.summary(game_id)
         
-        # Calculate statistics
-        total_plays = len([i for i in game_interactions if i.action == 'play'])
-        unique_players = len(set(i.user_id for i in game_interactions if i.action == 'play'))
-        
-        # Mock some additional stats
+        # Device and geographic breakdowns are not tracked yet
         stats = GameStats(
-            total_plays=total_plays,
-            unique_players=unique_players,
-            average_session_time=random.uniform(2.0, 8.0),  # minutes
-            completion_rate=random.uniform(0.6, 0.9),
-            user_ratings=[random.randint(3, 5) for _ in range(min(10, total_plays))],
-            popular_times=['evening', 'weekend'],
+            total_plays=summary['plays'],
+            unique_players=summary['unique_players'],
+            average_session_time=(summary['average_session_seconds'] / 60
+                                  if summary['average_session_seconds'] is not None else None),
+            completion_rate=summary['completion_rate'],
+            user_ratings=summary['recent_ratings'],
+            popular_times=summary['popular_times'],
             device_breakdown={'mobile': 60, 'desktop': 35, 'tablet': 5},
-            geographic_data={'US': 40, 'EU': 30, 'Asia': 20, 'Other': 10}
+            geographic_data={'US': 40, 'EU': 30, 'Asia': 20, 'Other': 10},
+            session_time_percentiles={name: seconds / 60 for name, seconds
+                                      in summary['session_seconds_percentiles'].items()}
         )
         
         return stats
     
+    def get_game_interactions(self, game_id: str, limit: int = 50) -> List[UserInteraction]:
+        """Most recent interactions with a game, oldest first"""
+        history = self.interaction_log.game_history(game_id)
+        interactions = []
+        for user_id, action, timestamp, value in list(zip(*history.values()))[-limit:]:
+            interactions.append(UserInteraction(
+                user_id=user_id,
+                game_id=game_id,
+                action=action,
+                timestamp=datetime.fromtimestamp(timestamp).isoformat(),
+                metadata={'rating': int(value)} if action == 'rate' else {}
+            ))
+        return interactions
+    
     def create_collection(self, collection_name: str, game_ids: List[str], creator: str) -> str:
         """Create a game collection/playlist"""
         collection_id = f"collection_{int(time.time())}_{random.randint(100, 999)}"
@@ -794,8 +828,11 @@ class GameShowcaseSystem:
     def _generate_game_id(self) -> str:
         """Generate unique game ID"""
         timestamp = int(time.time())
-        random_suffix = random.randint(1000, 9999)
-        return f"game_{timestamp}_{random_suffix}"
+        while True:
+            # 32 random bits, retried on the (rare) clash with a game added in the same second
+            game_id = f"game_{timestamp}_{random.getrandbits(32):08x}"
+            if game_id not in self.games_database:
+                return game_id
     
     def _generate_game_card_html(self, game: GameEntry) -> str:
         """Generate HTML for a single game card"""
@@ -829,6 +866,13 @@ class GameShowcaseSystem:
         </div>
         """
     
+    def _update_indexes(self, game: GameEntry):
+        """Bring every ordering up to date with a game's counters and featured flag"""
+        self.play_ranking.update(game.game_id, game.play_count)
+        self.genre_index.update(game.game_id, game.genre.lower(), game.play_count)
+        self.theme_index.update(game.game_id, game.theme.lower(), game.rating)
+        self.trending.set_member(game.game_id, 'featured', game.featured)
+    
     def _update_trending_score(self, game_id: str, action: str):
         """Update trending score based on user actions"""
         if game_id not in self.games_database:
@@ -846,10 +890,9 @@ class GameShowcaseSystem:
         
         weight = action_weights.get(action, 1.0)
         
-        # Time decay factor (recent actions have more weight)
-        time_factor = 1.0  # In real implementation, you'd calculate based on time
-        
-        game.trending_score += weight * time_factor
+        # Recent actions have more weight: every action's weight halves each half-life,
+        # and trending_score holds the decayed score as of this action
+        game.trending_score = self.trending.record(game_id, weight)
     
     def _initialize_sample_games(self):
         """Initialize with sample games for demonstration"""
@@ -909,11 +952,13 @@ class GameShowcaseSystem:
             game.like_count = random.randint(10, 100)
             game.share_count = random.randint(5, 50)
             game.rating = random.uniform(3.5, 5.0)
-            game.trending_score = random.uniform(10, 100)
+            game.trending_score = self.trending.record(game_id, random.uniform(10, 100))
             
             # Mark some as featured
             if random.random() < 0.5:
                 game.featured = True
+            
+            self._update_indexes(game)
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -942,10 +987,65 @@ if __name__ == "__main__":
     # Test search
     search_results = showcase.search_games("space")
     print(f"Search results for 'space': {[g.title for g in search_results]}")
+    print(f"Search results for 'neo cyber': {[g.title for g in showcase.search_games('neo cyber')]}")
+    
+    # Search latency over a larger catalogue
+    rng = random.Random(5)
+    words = ['mystic', 'neon', 'cosmic', 'ocean', 'dragon', 'ninja', 'robot', 'quest', 'speed', 'dream']
+    for number in range(20000):
+        showcase.add_game({
+            'title': f"{rng.choice(words).title()} {rng.choice(words).title()} {number}",
+            'description': f"An exciting game about a {rng.choice(words)} and a {rng.choice(words)}",
+            'genre': rng.choice(['platformer', 'shooter', 'puzzle', 'racing']),
+            'theme': rng.choice(['fantasy', 'sci-fi', 'cyberpunk', 'underwater']),
+            'tags': rng.sample(words, 3)
+        })
+    for played_id in rng.sample(sorted(showcase.games_database), 5000):
+        showcase.record_play(played_id)
+        showcase.rate_game(played_id, "user123", rng.randint(1, 5))
+    for query in ['dragon', 'neon quest', 'drea', 'exciting game']:
+        start = time.perf_counter()
+        results = showcase.search_games(query)
+        print(f"'{query}': {len(results)} results in {(time.perf_counter() - start) * 1000:.3f} ms "
+              f"over {len(showcase.games_database)} games")
+    
+    # Indexed listings match a full filter and sort
+    all_games = list(showcase.games_database.values())
+    now = time.time()
+    listings = [
+        ("genre 'Racing'", lambda: showcase.get_games_by_genre('Racing'),
+         sorted([g for g in all_games if g.genre == 'racing'], key=lambda g: g.play_count, reverse=True)[:20]),
+        ("theme 'sci'", lambda: showcase.get_games_by_theme('sci'),
+         sorted([g for g in all_games if 'sci' in g.theme], key=lambda g: g.rating, reverse=True)[:20]),
+        ("featured", lambda: showcase.get_featured_games(5),
+         sorted([g for g in all_games if g.featured], key=lambda g: showcase.trending.score(g.game_id, now), reverse=True)[:5]),
+        ("trending", lambda: showcase.get_trending_games(10),
+         sorted(all_games, key=lambda g: showcase.trending.score(g.game_id, now), reverse=True)[:10])
+    ]
+    for name, listing, expected in listings:
+        start = time.perf_counter()
+        games = listing()
+        elapsed = (time.perf_counter() - start) * 1000
+        assert games == expected
+        print(f"Listing {name}: {len(games)} games in {elapsed:.3f} ms")
     
     # Test recording interactions
-    showcase.record_play(game_id, "user123")
+    before = showcase.get_game_stats(game_id)
+    showcase.record_play(game_id, "user123", {'duration': 300, 'completed': True})
     showcase.record_like(game_id, "user123")
     showcase.rate_game(game_id, "user123", 5)
+    stats = showcase.get_game_stats(game_id)
+    assert stats.total_plays == before.total_plays + 1 and stats.user_ratings[-1] == 5
+    assert stats.average_session_time == 5.0 and stats.completion_rate == 1.0 and stats.popular_times
+    assert showcase.record_session_end(game_id, 420, completed=False)
+    assert showcase.get_game_stats(game_id).completion_rate == 0.5
+    unplayed = showcase.add_game({'title': 'Unplayed', 'genre': 'puzzle'})
+    showcase.record_play(unplayed)
+    assert showcase.get_game_stats(unplayed).average_session_time is None
+    print(f"Stats: {stats.unique_players} players, sessions {stats.session_time_percentiles} min, "
+          f"{stats.popular_times}; analytics {showcase.analytics.get_stats()}")
+    assert [i.action for i in showcase.get_game_interactions(game_id, 3)] == ['play', 'like', 'rate']
+    print(f"Interaction log: {showcase.interaction_log.get_stats()}")
+    showcase.interaction_log.close()
     
     print("Game showcase system initialized and tested successfully!")
@@ -0,0 +1,295 @@
+"""
+Generation Metrics - Payload size, time and allocation of every game generation path
+Records what each engine produces and what it costs, aggregated per path and genre
+
+This module provides:
+- A process-wide registry of generations keyed by generation path and genre
+- Output size in UTF-8 bytes, split into HTML, CSS and JavaScript sections
+- Wall time of every generation; whole-document sizes and peak allocation sampled every Nth one
+  (peak allocation is approximate: tracemalloc sees every thread of the process)
+- Fixed-bucket histograms of every measure, with count, mean, max and bucket percentiles
+- A measurement context manager and a method decorator for instrumenting generators
+"""
+
+import os
+import re
+import time
+import threading
+import tracemalloc
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# Histogram upper bounds: sizes double from 1 KiB to 4 MiB, times follow a 1-2-5 series
+SIZE_BUCKETS = [1024 * 2 ** power for power in range(13)]
+TIME_BUCKETS_MS = [scale * 10 ** exponent for exponent in range(-2, 4) for scale in (1, 2, 5)]
+
+HISTOGRAM_BUCKETS = {
+    'bytes': SIZE_BUCKETS,
+    'html_bytes': SIZE_BUCKETS,
+    'css_bytes': SIZE_BUCKETS,
+    'js_bytes': SIZE_BUCKETS,
+    'wall_ms': TIME_BUCKETS_MS,
+    'peak_alloc_bytes': SIZE_BUCKETS
+}
+
+# Tracing allocations slows generation several times over, so only every Nth one is traced (0: never).
+# tracemalloc traces the whole process, not one thread: allocations other threads make while
+# a generation is traced (pool refills, concurrent requests) land in its peak, so the
+# peak_alloc_bytes histogram is an upper-bound estimate rather than an exact per-generation figure
+ALLOC_SAMPLE_EVERY = int(os.environ.get('GENERATION_ALLOC_SAMPLE_EVERY', 50))
+
+# Splitting a whole document into sections takes longer than a template engine takes to
+# build it, so whole documents are sized every Nth generation (1: always); output that
+# is already split into sections is always sized
+DOCUMENT_SAMPLE_EVERY = int(os.environ.get('GENERATION_DOCUMENT_SAMPLE_EVERY', 10))
+
+OPENING_TAG_PATTERN = re.compile(rb'<(style|script)\b[^>]*>')
+
+def utf8_size(text: str) -> int:
+    """Size of ``text`` in UTF-8 bytes (no copy for ASCII text)"""
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+def document_sections(document: str) -> Dict[str, int]:
+    """UTF-8 bytes of a whole HTML document's inline CSS, inline JavaScript and remaining markup"""
+    data = document.encode('utf-8')
+    sections = {'html': len(data), 'css': 0, 'js': 0}
+    match = OPENING_TAG_PATTERN.search(data)
+    while match:
+        body = match.end()
+        tag = match.group(1)
+        end = data.find(b'</' + tag + b'>', body)
+        if end == -1:
+            end = len(data)
+        sections['css' if tag == b'style' else 'js'] += end - body
+        match = OPENING_TAG_PATTERN.search(data, end)
+    sections['html'] -= sections['css'] + sections['js']
+    return sections
+
+class Histogram:
+    """Counts of observations per fixed bucket (each bucket holds values up to its bound)"""
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # the last bucket is unbounded
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations (None: unbounded)"""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = [{'le': bound, 'count': count} for bound, count in zip(self.bounds, self.counts) if count]
+        if self.counts[-1]:
+            buckets.append({'le': None, 'count': self.counts[-1]})
+        return {
+            'count': self.count,
+            'mean': round(self.mean, 3),
+            'max': round(self.max, 3),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': buckets
+        }
+
+class Measurement:
+    """
+    One generation being measured, as a context manager around the generation.
+    The generator reports its output before the block ends; a block that reports
+    no output (the generator returned nothing or raised) is not recorded.
+    """
+
+    def __init__(self, registry: 'GenerationMetrics', path: str, genre: str):
+        self.registry = registry
+        self.path = path
+        self.genre = genre
+        self.sections: Optional[Dict[str, int]] = None
+        self._tracing = False
+        self._start = 0.0
+
+    def __enter__(self) -> 'Measurement':
+        self._tracing = self.registry._start_alloc_trace((self.path, self.genre))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self._start
+        peak = self.registry._stop_alloc_trace() if self._tracing else None
+        if exc_type is None and self.sections is not None:
+            self.registry.record(self.path, self.genre, self.sections, seconds, peak)
+
+    def record_sections(self, html: str = '', css: str = '', js: str = ''):
+        """Report output that is already split into markup, stylesheet and script"""
+        self.sections = {'html': utf8_size(html), 'css': utf8_size(css), 'js': utf8_size(js)}
+
+    def record_document(self, document: str):
+        """Report output as one HTML document with inline styles and scripts (sized when sampled)"""
+        sampled = self.registry._sampled(self.registry._documents, (self.path, self.genre),
+                                         self.registry.document_sample_every)
+        self.sections = document_sections(document) if sampled else {}
+
+class GenerationMetrics:
+    """Aggregated generation metrics per (path, genre)"""
+
+    def __init__(self, alloc_sample_every: int = ALLOC_SAMPLE_EVERY,
+                 document_sample_every: int = DOCUMENT_SAMPLE_EVERY):
+        self.alloc_sample_every = alloc_sample_every
+        self.document_sample_every = document_sample_every
+        self._histograms: Dict[Tuple[str, str], Dict[str, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._alloc_lock = threading.Lock()
+        # Per (path, genre) call counts, so sampling cannot alias with an interleaved call pattern
+        self._calls: Dict[Tuple[str, str], int] = {}
+        self._documents: Dict[Tuple[str, str], int] = {}
+
+    def record(self, path: str, genre: str, sections: Dict[str, int], seconds: float,
+               peak_alloc_bytes: Optional[int] = None):
+        """
+        Add one generation's output sizes (if measured: ``sections`` may be empty) and
+        wall time, or its peak allocation if it was traced (tracing slows the
+        generation down, so its wall time is not kept; the peak includes whatever
+        other threads allocated meanwhile)
+        """
+        with self._lock:
+            histograms = self._histograms.get((path, genre))
+            if histograms is None:
+                histograms = self._histograms[(path, genre)] = {
+                    name: Histogram(bounds) for name, bounds in HISTOGRAM_BUCKETS.items()
+                }
+            if sections:
+                histograms['bytes'].observe(sum(sections.values()))
+                histograms['html_bytes'].observe(sections['html'])
+                histograms['css_bytes'].observe(sections['css'])
+                histograms['js_bytes'].observe(sections['js'])
+            if peak_alloc_bytes is None:
+                histograms['wall_ms'].observe(seconds * 1000)
+            else:
+                histograms['peak_alloc_bytes'].observe(peak_alloc_bytes)
+
+    def _sampled(self, counts: Dict[Tuple[str, str], int], key: Tuple[str, str], every: int) -> bool:
+        """Count a call for ``key``; True for its 1st, (every+1)th, ... call (never if every is 0)"""
+        if every <= 0:
+            return False
+        # Generations run on request threads and the pool refill thread at once
+        with self._lock:
+            count = counts.get(key, 0)
+            counts[key] = count + 1
+        return count % every == 0
+
+    def _start_alloc_trace(self, key: Tuple[str, str]) -> bool:
+        """
+        Start tracing allocations for a sampled generation if nobody else is tracing.
+        The trace covers every thread, so the peak is approximate (see ALLOC_SAMPLE_EVERY)
+        """
+        if not self._sampled(self._calls, key, self.alloc_sample_every):
+            return False
+        if tracemalloc.is_tracing() or not self._alloc_lock.acquire(blocking=False):
+            return False
+        tracemalloc.start()
+        return True
+
+    def _stop_alloc_trace(self) -> int:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._alloc_lock.release()
+        return peak
+
+    def measure(self, path: str, genre: str) -> Measurement:
+        """Context manager timing a generation and recording the output reported on it"""
+        return Measurement(self, path, genre)
+
+    def reset(self):
+        """Drop every recorded generation"""
+        with self._lock:
+            self._histograms.clear()
+
+    def get_stats(self, path: Optional[str] = None, genre: Optional[str] = None) -> Dict[str, Any]:
+        """Histograms per path and genre, optionally narrowed to one path and/or genre"""
+        with self._lock:
+            stats: Dict[str, Dict[str, Any]] = {}
+            for (entry_path, entry_genre), histograms in sorted(self._histograms.items()):
+                if (path and entry_path != path) or (genre and entry_genre != genre):
+                    continue
+                stats.setdefault(entry_path, {})[entry_genre] = {
+                    name: histogram.to_dict() for name, histogram in histograms.items() if histogram.count
+                }
+            return stats
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Generations, mean size and mean time per path and genre, largest pages first"""
+        with self._lock:
+            rows = [
+                {
+                    'path': path,
+                    'genre': genre,
+                    # Every generation is either timed or traced for allocations
+                    'generations': histograms['wall_ms'].count + histograms['peak_alloc_bytes'].count,
+                    'mean_bytes': round(histograms['bytes'].mean) if histograms['bytes'].count else None,
+                    'mean_ms': round(histograms['wall_ms'].mean, 3) if histograms['wall_ms'].count else None
+                }
+                for (path, genre), histograms in self._histograms.items()
+            ]
+        return {'generations': sorted(rows, key=lambda row: row['mean_bytes'] or 0, reverse=True)}
+
+# Registry shared by every generation path
+generation_metrics = GenerationMetrics()
+
+def measured_document(path: str) -> Callable:
+    """Decorator for a generator method returning an HTML document; the genre is ``self.genre``"""
+    def decorate(method: Callable[..., str]) -> Callable[..., str]:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with generation_metrics.measure(path, getattr(self, 'genre', 'unknown')) as measurement:
+                document = method(self, *args, **kwargs)
+                measurement.record_document(document)
+            return document
+        return wrapper
+    return decorate
+
+# Example usage and testing
+if __name__ == "__main__":
+    import json
+    import genre_modules
+    import true_game_engines
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from modular_game_generator import ModularGameGenerator
+    from generation_metrics import generation_metrics   # the registry the generators record into
+
+    generation_metrics.alloc_sample_every = 5
+    generation_metrics.document_sample_every = 2
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator()
+    selector = true_game_engines.TrueGameEngineSelector()
+    colors = {'primary': '#4A148C', 'secondary': '#7B1FA2', 'accent': '#FFD700'}
+    fonts = {'family': "'Segoe UI', sans-serif", 'body_size': '16px', 'title_size': '2.5em', 'weight': 'bold'}
+
+    for _ in range(20):
+        for prompt in ["a platformer where a cat travels through dreams", "a cyberpunk racing game with neon lights"]:
+            generator.generate_game(interpreter.interpret_prompt(prompt))
+        for game_type in ['racing', 'puzzle']:
+            selector.generate_game({'game_type': game_type, 'theme': 'space'})
+        for module_class in (genre_modules.PuzzleModule, genre_modules.ShooterModule):
+            module_class().generate({}, colors, fonts, {})
+
+    for row in generation_metrics.get_summary()['generations']:
+        print(f"{row['path']:<24} {row['genre']:<11} {row['generations']:>4} games "
+              f"{row['mean_bytes'] or '-':>7} B {row['mean_ms'] or 0:>8.3f} ms")
+    print(json.dumps(generation_metrics.get_stats(genre='racing'), indent=1)[:1500])
@@ -7,17 +7,25 @@ Six completely different game experiences with distinct gameplay
 import random
 import json
 from typing import Dict, List, Any
+from generation_metrics import measured_document
+from asset_minifier import asset_minifier, MINIFY_BY_DEFAULT
 
 class BaseGameModule:
     """Base class for all game genre modules"""
     
     def __init__(self):
         self.genre = "base"
+        # Minify the inline CSS/JS of generated documents (MINIFY_GAME_ASSETS=0 turns the default off)
+        self.minify = MINIFY_BY_DEFAULT
     
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         """Generate game HTML/CSS/JS code"""
         raise NotImplementedError("Subclasses must implement generate method")
     
+    def _finish_document(self, html: str) -> str:
+        """The finished document, minified unless minification is off"""
+        return asset_minifier.minify('html', html, self.genre) if self.minify else html
+    
     def _create_base_html_structure(self, title: str, colors: Dict, fonts: Dict) -> str:
         """Create base HTML structure with responsive design"""
         return f"""
@@ -172,6 +180,7 @@ class PuzzleModule(BaseGameModule):
         super().__init__()
         self.genre = "puzzle"
     
+    @measured_document('genre_modules')
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         grid_size = config.get('grid_size', 4)
         tile_style = config.get('tile_style', 'numbers')
@@ -507,7 +516,7 @@ class PuzzleModule(BaseGameModule):
         </html>
         """
         
-        return html
+        return self._finish_document(html)
 
 class ShooterModule(BaseGameModule):
     """Advanced space shooter with multiple enemy types and power-ups"""
@@ -516,6 +525,7 @@ class ShooterModule(BaseGameModule):
         super().__init__()
         self.genre = "shooter"
     
+    @measured_document('genre_modules')
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         enemy_types = config.get('enemy_types', 3)
         bullet_speed = config.get('bullet_speed', 7)
@@ -1113,7 +1123,7 @@ class ShooterModule(BaseGameModule):
         </html>
         """
         
-        return html
+        return self._finish_document(html)
 
 class PlatformerModule(BaseGameModule):
     """Physics-based platformer with jumping and coin collection"""
@@ -1122,6 +1132,7 @@ class PlatformerModule(BaseGameModule):
         super().__init__()
         self.genre = "platformer"
     
+    @measured_document('genre_modules')
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         platform_count = config.get('platform_count', 8)
         jump_height = config.get('jump_height', 100)
@@ -1354,7 +1365,7 @@ class PlatformerModule(BaseGameModule):
                         updateUI();
                         
                         if (timeLeft <= 0) {{
-                            endGame('Time\'s up!');
+                            endGame('Time\\'s up!');
                         }}
                     }}, 1000);
                     
@@ -1644,7 +1655,7 @@ class PlatformerModule(BaseGameModule):
         </html>
         """
         
-        return html
+        return self._finish_document(html)
 
 # Additional modules would be implemented similarly...
 class RacingModule(BaseGameModule):
@@ -1652,29 +1663,36 @@ class RacingModule(BaseGameModule):
         super().__init__()
         self.genre = "racing"
     
+    @measured_document('genre_modules')
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         # Implementation for racing games
-        return self._create_base_html_structure("Racing Game", colors, fonts) + "</body></html>"
+        html = self._create_base_html_structure("Racing Game", colors, fonts) + "</body></html>"
+        return self._finish_document(html)
 
 class RPGModule(BaseGameModule):
     def __init__(self):
         super().__init__()
         self.genre = "rpg"
     
+    @measured_document('genre_modules')
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         # Implementation for RPG games
-        return self._create_base_html_structure("RPG Adventure", colors, fonts) + "</body></html>"
+        html = self._create_base_html_structure("RPG Adventure", colors, fonts) + "</body></html>"
+        return self._finish_document(html)
 
 class StrategyModule(BaseGameModule):
     def __init__(self):
         super().__init__()
         self.genre = "strategy"
     
+    @measured_document('genre_modules')
     def generate(self, config: Dict, colors: Dict, fonts: Dict, effects: Dict) -> str:
         # Implementation for strategy games
-        return self._create_base_html_structure("Strategy Game", colors, fonts) + "</body></html>"
+        html = self._create_base_html_structure("Strategy Game", colors, fonts) + "</body></html>"
+        return self._finish_document(html)
 
 # Export all modules
 __all__ = [
     'BaseGameModule', 'PuzzleModule', 'ShooterModule', 'PlatformerModule',
     'RacingModule', 'RPGModule', 'StrategyModule'
+]
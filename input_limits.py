@@ -0,0 +1,128 @@
+"""
+Input Limits - Hardened handling of untrusted prompts and AI responses
+Caps input sizes and replaces backtracking regexes with linear-time scans
+
+This module provides:
+- Configurable size caps for prompts and AI responses (MAX_PROMPT_CHARS, MAX_AI_RESPONSE_CHARS)
+- Word-boundary-aware truncation of oversized prompts
+- Linear-time extraction of HTML documents, titles and JSON objects from model output
+- A stage timer that reports where the time of an analysis went
+"""
+
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Longest prompt any analyzer looks at; real prompts are a few hundred characters
+MAX_PROMPT_CHARS = int(os.environ.get('MAX_PROMPT_CHARS', 10000))
+
+# Longest model response we try to parse. Both generators request at most 4,000 tokens
+# (~16 KB), so 64 KB leaves headroom without parsing anything a real completion can't be
+MAX_AI_RESPONSE_CHARS = int(os.environ.get('MAX_AI_RESPONSE_CHARS', 64 * 1024))
+
+# Precompiled literal markers; searching for them never backtracks
+DOCTYPE_PATTERN = re.compile(r'<!DOCTYPE html>', re.IGNORECASE)
+HTML_END_PATTERN = re.compile(r'</html>', re.IGNORECASE)
+TITLE_START_PATTERN = re.compile(r'<title>', re.IGNORECASE)
+TITLE_END_PATTERN = re.compile(r'</title>', re.IGNORECASE)
+
+def clamp_text(text: str, limit: int = MAX_PROMPT_CHARS) -> str:
+    """Cut text to at most ``limit`` characters, preferring to end on a word boundary"""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = cut.rfind(' ', max(0, limit - 64))
+    return cut[:boundary] if boundary > 0 else cut
+
+def extract_html_document(text: str) -> Optional[str]:
+    """
+    First ``<!DOCTYPE html> ... </html>`` span of the text (case-insensitive).
+    Same result as ``re.search(r'<!DOCTYPE html>.*?</html>', text, re.S | re.I)``
+    but linear: each marker is searched once instead of rescanning from every doctype.
+    """
+    start = DOCTYPE_PATTERN.search(text)
+    if not start:
+        return None
+    end = HTML_END_PATTERN.search(text, start.end())
+    if not end:
+        return None
+    return text[start.start():end.end()]
+
+def extract_title(html: str) -> Optional[str]:
+    """
+    Contents of the first single-line ``<title>...</title>`` (case-insensitive).
+    Same result as ``re.search(r'<title>(.*?)</title>', html, re.I)`` in linear time:
+    once a line has no closing tag after an opening one, the rest of that line is skipped.
+    """
+    position = 0
+    while True:
+        start = TITLE_START_PATTERN.search(html, position)
+        if not start:
+            return None
+        line_end = html.find('\n', start.end())
+        if line_end == -1:
+            line_end = len(html)
+        end = TITLE_END_PATTERN.search(html, start.end(), line_end)
+        if end:
+            return html[start.end():end.start()]
+        position = line_end
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    Span from the first ``{`` to the last ``}`` of the text.
+    Same result as ``re.search(r'\\{.*\\}', text, re.DOTALL)`` without its quadratic
+    worst case on text with many unmatched braces.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    end = text.rfind('}')
+    if end < start:
+        return None
+    return text[start:end + 1]
+
+class StageTimer:
+    """Accumulates wall time per named stage of an analysis"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def as_ms(self) -> Dict[str, float]:
+        """Stage timings in milliseconds"""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()}
+
+# Example usage and testing
+if __name__ == "__main__":
+    samples = [
+        "Here you go:\n<!DOCTYPE html><html><head><title>Star Chef</title></head><body></body></html>\nEnjoy!",
+        "<!doctype HTML>\n<title>\nbroken</title>\n<TITLE>Second Try</TITLE></HTML>",
+        "no html here"
+    ]
+    for sample in samples:
+        html = extract_html_document(sample)
+        print(f"HTML: {html is not None}  Title: {extract_title(html) if html else None!r}")
+
+    # Pathological inputs that make the backtracking regexes quadratic
+    hostile = {
+        'doctype without end': '<!DOCTYPE html>' * 70000,
+        'titles without end': '<title>' * 150000,
+        'braces without end': '{' * 1000000
+    }
+    timer = StageTimer()
+    for name, text in hostile.items():
+        with timer.stage(name):
+            extract_html_document(text)
+            extract_title(text)
+            extract_json_object(text)
+    print(f"1 MB hostile inputs (ms): {timer.as_ms()}")
+    print(f"Clamped prompt: {len(clamp_text('word ' * 500000))} chars (limit {MAX_PROMPT_CHARS})")
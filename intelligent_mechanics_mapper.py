@@ -11,7 +11,8 @@ This module provides:
 
 import json
 import random
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Union
+from prompt_pipeline import StagedPrompt
 
 class IntelligentMechanicsMapper:
     """Maps prompt analysis to specific, implementable game mechanics"""
@@ -94,16 +95,20 @@ class IntelligentMechanicsMapper:
             10: {'multiplier': 2.5, 'complexity': 'insane'}
         }
     
-    def map_prompt_to_mechanics(self, prompt_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def map_prompt_to_mechanics(self, prompt_analysis: Union[Dict[str, Any], StagedPrompt]) -> Dict[str, Any]:
         """
         Map prompt analysis to specific, implementable game mechanics
         
         Args:
-            prompt_analysis: Analysis from AdvancedPromptAnalyzer
+            prompt_analysis: Analysis from AdvancedPromptAnalyzer, or a staged prompt
+                whose analysis stage is computed (or reused) on demand
             
         Returns:
             Detailed mechanics specification for game generation
         """
+        if isinstance(prompt_analysis, StagedPrompt):
+            return prompt_analysis.stage('mapper.mechanics_spec', self._mechanics_stage)
+        
         game_type = prompt_analysis.get('game_type', 'collection')
         theme = prompt_analysis.get('theme', 'modern')
         complexity = prompt_analysis.get('complexity_score', 5)
@@ -132,6 +137,12 @@ class IntelligentMechanicsMapper:
         
         return mechanics_spec
     
+    def _mechanics_stage(self, prompt: StagedPrompt) -> Dict[str, Any]:
+        """Pipeline stage: map the shared analysis of a staged prompt"""
+        from advanced_prompt_analyzer import advanced_analyzer
+        
+        return self.map_prompt_to_mechanics(advanced_analyzer.deep_analyze_prompt(prompt))
+    
     def _generate_core_mechanics(self, base_mechanics: Dict, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate specific core mechanics based on analysis"""
         game_type = analysis.get('game_type', 'collection')
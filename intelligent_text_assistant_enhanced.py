@@ -15,6 +15,14 @@ import re
 import random
 from datetime import datetime
 import os
+from input_limits import MAX_PROMPT_CHARS, clamp_text, StageTimer
+
+# Words that add to a concept's complexity (entities, level structure, systems), in one pass
+COMPLEXITY_PATTERN = re.compile(
+    r'\b(?:character|enemy|obstacle|collectible|power|ability'
+    r'|level|stage|world|area|zone'
+    r'|mechanic|system|feature|element)\w*\b'
+)
 
 class GameAnalyzer:
     """Analyzes games and provides improvement suggestions"""
@@ -90,43 +98,47 @@ class GameAnalyzer:
             'theme_analysis': {},
             'complexity_score': 0
         }
+        timer = StageTimer()
         
-        description_lower = description.lower()
+        # Oversized descriptions are cut before any scan touches them
+        description_lower = clamp_text(description, MAX_PROMPT_CHARS).lower()
         
         # Identify strengths
-        if any(word in description_lower for word in ['unique', 'original', 'creative', 'innovative']):
-            analysis['strengths'].append("Creative and original concept")
-        
-        if any(word in description_lower for word in ['collect', 'gather', 'find']):
-            analysis['strengths'].append("Clear collection-based objective")
-        
-        if any(word in description_lower for word in ['avoid', 'dodge', 'escape']):
-            analysis['strengths'].append("Engaging challenge mechanics")
-        
-        if any(word in description_lower for word in ['magical', 'mystical', 'enchanted', 'fantasy']):
-            analysis['strengths'].append("Rich fantasy theming")
+        with timer.stage('strengths'):
+            if any(word in description_lower for word in ['unique', 'original', 'creative', 'innovative']):
+                analysis['strengths'].append("Creative and original concept")
+            
+            if any(word in description_lower for word in ['collect', 'gather', 'find']):
+                analysis['strengths'].append("Clear collection-based objective")
+            
+            if any(word in description_lower for word in ['avoid', 'dodge', 'escape']):
+                analysis['strengths'].append("Engaging challenge mechanics")
+            
+            if any(word in description_lower for word in ['magical', 'mystical', 'enchanted', 'fantasy']):
+                analysis['strengths'].append("Rich fantasy theming")
         
         # Suggest improvements
-        if 'story' not in description_lower and 'narrative' not in description_lower:
-            analysis['improvements'].append("Consider adding a backstory or narrative element")
-        
-        if 'level' not in description_lower and 'stage' not in description_lower:
-            analysis['improvements'].append("Think about level progression and difficulty scaling")
-        
-        if 'power' not in description_lower and 'ability' not in description_lower:
-            analysis['improvements'].append("Consider adding special abilities or power-ups")
+        with timer.stage('improvements'):
+            if 'story' not in description_lower and 'narrative' not in description_lower:
+                analysis['improvements'].append("Consider adding a backstory or narrative element")
+            
+            if 'level' not in description_lower and 'stage' not in description_lower:
+                analysis['improvements'].append("Think about level progression and difficulty scaling")
+            
+            if 'power' not in description_lower and 'ability' not in description_lower:
+                analysis['improvements'].append("Consider adding special abilities or power-ups")
         
         # Generate specific suggestions
-        for category, suggestions in self.enhancement_suggestions.items():
-            analysis['suggestions'].extend(random.sample(suggestions, min(2, len(suggestions))))
+        with timer.stage('suggestions'):
+            for category, suggestions in self.enhancement_suggestions.items():
+                analysis['suggestions'].extend(random.sample(suggestions, min(2, len(suggestions))))
         
         # Calculate complexity score
-        complexity_factors = [
-            len(re.findall(r'\b(character|enemy|obstacle|collectible|power|ability)\w*\b', description_lower)),
-            len(re.findall(r'\b(level|stage|world|area|zone)\w*\b', description_lower)),
-            len(re.findall(r'\b(mechanic|system|feature|element)\w*\b', description_lower))
-        ]
-        analysis['complexity_score'] = min(10, sum(complexity_factors) * 2)
+        with timer.stage('complexity'):
+            complexity_words = sum(1 for _ in COMPLEXITY_PATTERN.finditer(description_lower))
+            analysis['complexity_score'] = min(10, complexity_words * 2)
+        
+        analysis['stage_timings_ms'] = timer.as_ms()
         
         return analysis
 
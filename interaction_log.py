@@ -0,0 +1,416 @@
+"""
+Interaction Log - Bounded, columnar log of user interactions with games
+Keeps recent interactions in fixed-size typed arrays and older ones in segment files on disk
+
+This module provides:
+- A ring buffer of columns (game, user, action code, epoch seconds, numeric value) in typed arrays
+- Interned game and user IDs, so a record takes 21 bytes instead of a dataclass with strings
+- A per-game offset index: the sequence numbers of each game's records still in memory
+- Spilling of the oldest records to disk by a background thread, sorted by game so each
+  game's records in a segment are one contiguous slice; appends never wait on the disk
+  unless the ring fills up faster than batches can be written
+- A compact directory per segment (sorted game numbers and slice offsets in typed arrays)
+- A retention limit on segments (the oldest are deleted) and cleanup of the spill directory at exit
+- Per-game history and summaries read through the index (memory) and the segment directories (disk)
+"""
+
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Tuple
+
+ACTIONS = ['play', 'like', 'share', 'rate', 'comment']
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# Column name -> array typecode; every column has one item per record
+COLUMNS = [('game', 'I'), ('user', 'I'), ('action', 'B'), ('time', 'd'), ('value', 'f')]
+
+# Records held in memory; once fewer than SPILL_FRACTION of the slots are free, the
+# oldest SPILL_FRACTION of them are written to disk while appends fill the free slots
+INTERACTION_LOG_CAPACITY = int(os.environ.get('INTERACTION_LOG_CAPACITY', 1000000))
+SPILL_FRACTION = 0.25
+
+# Segment files kept on disk (each holds one spilled batch); older ones are deleted
+INTERACTION_LOG_MAX_SEGMENTS = int(os.environ.get('INTERACTION_LOG_MAX_SEGMENTS', 32))
+
+# Directory for spilled segments (default: a temporary directory created on first spill)
+INTERACTION_LOG_DIR = os.environ.get('INTERACTION_LOG_DIR')
+
+# Games whose in-memory index is trimmed per lock acquisition after a spill
+TRIM_CHUNK = 1024
+
+class Segment:
+    """
+    One spilled batch on disk, sorted by game.
+    ``games`` holds the distinct game numbers in ascending order and ``starts`` the
+    offset of each game's slice, plus a final entry equal to ``records``.
+    """
+
+    def __init__(self, path: str, records: int, games: array, starts: array):
+        self.path = path
+        self.records = records
+        self.games = games
+        self.starts = starts
+
+    def locate(self, game: int) -> Optional[Tuple[int, int]]:
+        """(start, count) of a game's slice, or None if the segment has none of its records"""
+        index = bisect_left(self.games, game)
+        if index < len(self.games) and self.games[index] == game:
+            return self.starts[index], self.starts[index + 1] - self.starts[index]
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return self.games.itemsize * len(self.games) + self.starts.itemsize * len(self.starts)
+
+class InteractionLog:
+    """
+    Fixed-capacity columnar interaction log.
+    Records are numbered in arrival order; record n lives in slot n % capacity
+    until it is spilled. Each game keeps the ascending sequence numbers of its
+    in-memory records (numbers below the oldest in-memory record are stale and
+    trimmed after each spill); its records on disk are found through the
+    directories of the retained segments.
+    """
+
+    def __init__(self, capacity: int = INTERACTION_LOG_CAPACITY, spill_dir: Optional[str] = INTERACTION_LOG_DIR,
+                 spill_fraction: float = SPILL_FRACTION, max_segments: int = INTERACTION_LOG_MAX_SEGMENTS):
+        self.capacity = capacity
+        self.spill_batch = max(1, int(capacity * spill_fraction))
+        self.spill_dir = spill_dir
+        self.max_segments = max_segments
+        self._owns_spill_dir = False
+
+        # Columns grow to ``capacity`` items, after which slots are reused
+        self._columns = {name: array(typecode) for name, typecode in COLUMNS}
+        self._start = 0   # sequence number of the oldest record in memory
+        self._end = 0     # sequence number of the next record
+
+        self._game_ids: List[str] = []
+        self._game_numbers: Dict[str, int] = {}
+        self._user_ids: List[str] = []
+        self._user_numbers: Dict[str, int] = {}
+
+        self._in_memory: Dict[int, array] = {}   # game -> sequence numbers
+        self._segments: List[Segment] = []       # retained segments, oldest first
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._spiller: Optional[threading.Thread] = None
+        self._closed = False
+        self.spills = 0
+        self.spill_waits = 0      # appends that found the ring full and waited for a spill
+        self.dropped = 0          # records deleted with expired segments (or lost to a failed write)
+        self.spill_errors = 0
+        self.last_spill_error: Optional[str] = None
+
+    @staticmethod
+    def _intern(value: str, ids: List[str], numbers: Dict[str, int]) -> int:
+        number = numbers.get(value)
+        if number is None:
+            number = numbers[value] = len(ids)
+            ids.append(value)
+        return number
+
+    def append(self, game_id: str, user_id: str, action: str, value: float = 0.0,
+               timestamp: Optional[float] = None):
+        """Log one interaction (``value`` carries a numeric detail such as a rating)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("interaction log is closed")
+            while self._end - self._start >= self.capacity:
+                # The disk is behind: wait for the spill in progress to free a batch of slots
+                self.spill_waits += 1
+                self._changed.wait()
+            game = self._intern(game_id, self._game_ids, self._game_numbers)
+            record = (game, self._intern(user_id, self._user_ids, self._user_numbers),
+                      ACTION_CODES[action], timestamp, value)
+            columns = self._columns
+            if self._end < self.capacity:
+                for (name, _), item in zip(COLUMNS, record):
+                    columns[name].append(item)
+            else:
+                slot = self._end % self.capacity
+                for (name, _), item in zip(COLUMNS, record):
+                    columns[name][slot] = item
+
+            sequences = self._in_memory.get(game)
+            if sequences is None:
+                sequences = self._in_memory[game] = array('Q')
+            sequences.append(self._end)
+            self._end += 1
+
+            if self._end - self._start >= self.capacity - self.spill_batch:
+                self._start_spiller()
+                self._changed.notify_all()
+
+    def _start_spiller(self):
+        """Start the background spill thread and the spill directory (caller holds the lock)"""
+        if self._spiller is not None:
+            return
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='interaction-log-')
+            self._owns_spill_dir = True
+        atexit.register(self.close)
+        self._spiller = threading.Thread(target=self._spill_loop, name='interaction-log-spill', daemon=True)
+        self._spiller.start()
+
+    def _spill_loop(self):
+        """Write the oldest batch whenever fewer than a batch of slots are free"""
+        while True:
+            with self._lock:
+                while not self._closed and self._end - self._start < self.capacity - self.spill_batch:
+                    self._changed.wait()
+                if self._closed:
+                    return
+                first = self._start
+                last = first + self.spill_batch
+                # Slots of [first, last) are not reused until _start moves past them,
+                # so the copy is all that needs the lock
+                batch = {name: self._copy_slots(self._columns[name], first, last) for name, _ in COLUMNS}
+                segment_number = self.spills
+
+            try:
+                segment = self._write_segment(batch, segment_number)
+                error = None
+            except OSError as e:
+                segment, error = None, str(e)
+
+            with self._lock:
+                if segment is not None:
+                    self._segments.append(segment)
+                else:
+                    self.spill_errors += 1
+                    self.last_spill_error = error
+                    self.dropped += last - first
+                expired = self._segments[:max(len(self._segments) - self.max_segments, 0)]
+                del self._segments[:len(expired)]
+                self.dropped += sum(old.records for old in expired)
+                self._start = last
+                self.spills += 1
+                self._changed.notify_all()
+
+            for old in expired:
+                try:
+                    os.remove(old.path)
+                except OSError:
+                    pass
+            self._trim(sorted(set(batch['game'])))
+
+    def _copy_slots(self, column: array, first: int, last: int) -> array:
+        start, end = first % self.capacity, (last - 1) % self.capacity + 1
+        return column[start:end] if start < end else column[start:] + column[:end]
+
+    def _write_segment(self, batch: Dict[str, array], number: int) -> Segment:
+        """Sort a batch by game (stably, so each game's records stay in arrival order) and write it"""
+        # Grouping in a Python loop (rather than one sorted() call over the batch) lets
+        # request threads take the interpreter in between, so they are not held up
+        by_game: Dict[int, List[int]] = {}
+        for index, game in enumerate(batch['game']):
+            positions = by_game.get(game)
+            if positions is None:
+                positions = by_game[game] = []
+            positions.append(index)
+        distinct = array('I', sorted(by_game))
+        starts = array('I')
+        order: List[int] = []
+        for game in distinct:
+            starts.append(len(order))
+            order.extend(by_game[game])
+        starts.append(len(order))
+
+        path = os.path.join(self.spill_dir, f"segment_{number:06d}.bin")
+        with open(path, 'wb') as f:
+            for name, typecode in COLUMNS:
+                column = batch[name]
+                array(typecode, [column[index] for index in order]).tofile(f)
+        return Segment(path, len(order), distinct, starts)
+
+    def _trim(self, games: List[int]):
+        """Drop spilled sequence numbers from the in-memory index, a chunk of games per lock hold"""
+        for chunk in range(0, len(games), TRIM_CHUNK):
+            with self._lock:
+                start = self._start
+                for game in games[chunk:chunk + TRIM_CHUNK]:
+                    sequences = self._in_memory.get(game)
+                    if sequences is None:
+                        continue
+                    del sequences[:bisect_left(sequences, start)]
+                    if not sequences:
+                        del self._in_memory[game]
+
+    @staticmethod
+    def _read_slice(segment: Segment, start: int, count: int) -> Dict[str, array]:
+        """One game's records from a segment file"""
+        columns = {}
+        offset = 0
+        with open(segment.path, 'rb') as f:
+            for name, typecode in COLUMNS:
+                column = array(typecode)
+                f.seek(offset + start * column.itemsize)
+                column.frombytes(f.read(count * column.itemsize))
+                columns[name] = column
+                offset += segment.records * column.itemsize
+        return columns
+
+    def _game_columns(self, game_id: str) -> List[Dict[str, array]]:
+        """
+        A game's records as column slices, oldest first. Locations and in-memory
+        records are taken under the lock; segment files are read after it is released
+        (a segment deleted by retention in between is skipped)
+        """
+        with self._lock:
+            game = self._game_numbers.get(game_id)
+            if game is None:
+                return []
+            locations = [(segment, location) for segment in self._segments
+                         for location in (segment.locate(game),) if location is not None]
+            sequences = self._in_memory.get(game, array('Q'))
+            sequences = sequences[bisect_left(sequences, self._start):]
+            recent = None
+            if sequences:
+                slots = [sequence % self.capacity for sequence in sequences]
+                recent = {name: array(typecode, [self._columns[name][slot] for slot in slots])
+                          for name, typecode in COLUMNS}
+
+        slices = []
+        for segment, (start, count) in locations:
+            try:
+                slices.append(self._read_slice(segment, start, count))
+            except FileNotFoundError:
+                continue
+        if recent is not None:
+            slices.append(recent)
+        return slices
+
+    def game_history(self, game_id: str) -> Dict[str, List[Any]]:
+        """A game's retained records in arrival order, as user IDs, actions, epoch times and values"""
+        history: Dict[str, List[Any]] = {'user': [], 'action': [], 'time': [], 'value': []}
+        for columns in self._game_columns(game_id):
+            history['user'].extend(self._user_ids[user] for user in columns['user'])
+            history['action'].extend(ACTIONS[code] for code in columns['action'])
+            history['time'].extend(columns['time'])
+            history['value'].extend(columns['value'])
+        return history
+
+    def game_summary(self, game_id: str) -> Dict[str, Any]:
+        """Retained records per action, distinct players and the value of every rating for a game"""
+        actions = dict.fromkeys(ACTIONS, 0)
+        players = set()
+        ratings: List[float] = []
+        play, rate = ACTION_CODES['play'], ACTION_CODES['rate']
+        for columns in self._game_columns(game_id):
+            codes = columns['action']
+            for action, code in ACTION_CODES.items():
+                actions[action] += codes.count(code)
+            players.update(user for user, code in zip(columns['user'], codes) if code == play)
+            if actions['rate']:
+                ratings.extend(value for value, code in zip(columns['value'], codes) if code == rate)
+        return {'actions': actions, 'unique_players': len(players), 'ratings': ratings}
+
+    def count_for(self, game_id: str) -> int:
+        """Retained records for a game (in memory and on disk) without reading them"""
+        with self._lock:
+            game = self._game_numbers.get(game_id)
+            if game is None:
+                return 0
+            sequences = self._in_memory.get(game, ())
+            in_memory = len(sequences) - bisect_left(sequences, self._start)
+            on_disk = 0
+            for segment in self._segments:
+                location = segment.locate(game)
+                if location is not None:
+                    on_disk += location[1]
+            return in_memory + on_disk
+
+    def __len__(self) -> int:
+        return self._end
+
+    def close(self):
+        """Stop the spill thread and delete the spill directory if the log created it"""
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+            spiller = self._spiller
+        if spiller is not None and spiller is not threading.current_thread():
+            spiller.join()
+        with self._lock:
+            if self._owns_spill_dir and self.spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+                self._owns_spill_dir = False
+            self._segments.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Record counts and memory held by the columns, the offset index and the segment directories"""
+        with self._lock:
+            column_bytes = sum(column.itemsize * len(column) for column in self._columns.values())
+            index_bytes = sum(sequences.itemsize * len(sequences) for sequences in self._in_memory.values())
+            return {
+                'capacity': self.capacity,
+                'records': self._end,
+                'in_memory': self._end - self._start,
+                'on_disk': sum(segment.records for segment in self._segments),
+                'dropped': self.dropped,
+                'segments': len(self._segments),
+                'max_segments': self.max_segments,
+                'spills': self.spills,
+                'spill_waits': self.spill_waits,
+                'spill_errors': self.spill_errors,
+                'last_spill_error': self.last_spill_error,
+                'games': len(self._game_ids),
+                'users': len(self._user_ids),
+                'column_bytes': column_bytes,
+                'index_bytes': index_bytes,
+                'segment_directory_bytes': sum(segment.nbytes for segment in self._segments),
+                'spill_dir': self.spill_dir
+            }
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(4)
+    log = InteractionLog(capacity=1000, max_segments=64)
+    expected: Dict[str, List[Tuple[str, str]]] = {}
+    for number in range(10000):
+        game_id = f"game_{int(rng.paretovariate(1.0)) % 50}"
+        user_id = f"user_{rng.randrange(300)}"
+        action = rng.choice(ACTIONS)
+        log.append(game_id, user_id, action, value=rng.randint(1, 5) if action == 'rate' else 0.0,
+                   timestamp=1700000000.0 + number)
+        expected.setdefault(game_id, []).append((user_id, action))
+
+    for game_id, records in expected.items():
+        history = log.game_history(game_id)
+        assert list(zip(history['user'], history['action'])) == records
+        assert history['time'] == sorted(history['time'])
+        assert log.count_for(game_id) == len(records)
+
+    history = log.game_history('game_1')
+    plays = [user for user, action in zip(history['user'], history['action']) if action == 'play']
+    summary = log.game_summary('game_1')
+    assert summary['actions']['play'] == len(plays) and summary['unique_players'] == len(set(plays))
+    print(f"game_1: {len(history['user'])} records, {len(plays)} plays by {len(set(plays))} players, "
+          f"{len(summary['ratings'])} ratings")
+    print(f"Stats: {log.get_stats()}")
+    log.close()
+
+    # Retention: only the newest segments (plus the records in memory) are kept
+    log = InteractionLog(capacity=1000, max_segments=4)
+    for number in range(20000):
+        log.append('game_0', f"user_{number}", 'play', timestamp=float(number))
+    history = log.game_history('game_0')
+    stats = log.get_stats()
+    assert stats['segments'] == 4 and stats['dropped'] + len(history['user']) == 20000
+    assert history['time'] == [float(number) for number in range(stats['dropped'], 20000)]
+    spill_dir = log.spill_dir
+    log.close()
+    assert not os.path.exists(spill_dir)
+    print(f"Retention: {stats['segments']} segments, {stats['dropped']} records dropped, "
+          f"{len(history['user'])} retained, {stats['spill_waits']} appends waited for a spill")
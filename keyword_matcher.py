@@ -0,0 +1,277 @@
+"""
+Keyword Matcher - Single-pass multi-keyword detection for prompt analysis
+Aho-Corasick automaton that finds every keyword of a set of labelled tables in one scan
+
+This module provides:
+- Compilation of labelled keyword tables into one automaton
+- Single-pass scanning of characters or token IDs
+- A shared hit table that detectors query by table and label
+- Confidence-weighted scans for symbol sequences containing approximate (fuzzy) matches
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Callable, Iterable, Sequence, Hashable
+
+class KeywordHits:
+    """
+    Result of one scan: the keywords found, grouped by table and label.
+    Labels are always reported in the order they were declared in their table,
+    so callers keep the same tie-breaking as a loop over the original dict.
+    """
+
+    def __init__(self, matcher: 'KeywordMatcher', keyword_counts: Dict[int, int],
+                 confidence: Optional[Dict[int, float]] = None):
+        self.matcher = matcher
+        self.keyword_counts = keyword_counts
+        # Best match confidence per keyword; None means every keyword matched exactly
+        self.confidence = confidence
+
+        # Flat (table, label) -> count maps; distinct keywords and total occurrences
+        counts: Dict[Tuple[str, str], int] = {}
+        occurrences: Dict[Tuple[str, str], int] = {}
+        payloads = matcher.payloads
+        for keyword_id, repeats in keyword_counts.items():
+            for entry in payloads[keyword_id]:
+                counts[entry] = counts.get(entry, 0) + 1
+                occurrences[entry] = occurrences.get(entry, 0) + repeats
+        self._counts = counts
+        self._occurrences = occurrences
+        
+        # Distinct keywords per label weighted by their confidence
+        if confidence is None:
+            self._weights = counts
+        else:
+            weights: Dict[Tuple[str, str], float] = {}
+            for keyword_id, weight in confidence.items():
+                for entry in payloads[keyword_id]:
+                    weights[entry] = weights.get(entry, 0.0) + weight
+            self._weights = weights
+
+    @property
+    def keywords(self) -> List[str]:
+        """All keywords found in the text"""
+        return [self.matcher.keywords[keyword_id] for keyword_id in self.keyword_counts]
+
+    def has(self, table: str, label: str) -> bool:
+        """Whether any keyword of the given label was found"""
+        return (table, label) in self._counts
+
+    def scores(self, table: str) -> Dict[str, int]:
+        """Number of matched keywords per label, for labels with at least one hit"""
+        return self._per_label(self._counts, table)
+
+    def labels(self, table: str) -> List[str]:
+        """Labels of the table with at least one hit, in declaration order"""
+        counts = self._counts
+        return [label for label in self.matcher.labels[table] if (table, label) in counts]
+
+    def first(self, table: str) -> Optional[str]:
+        """First label of the table (in declaration order) with a hit"""
+        counts = self._counts
+        for label in self.matcher.labels[table]:
+            if (table, label) in counts:
+                return label
+        return None
+
+    def total(self, table: str) -> int:
+        """Total number of matched keywords across every label of the table"""
+        return sum(self.scores(table).values())
+
+    def weighted_scores(self, table: str) -> Dict[str, float]:
+        """Like ``scores``, but approximate matches only count for their confidence"""
+        return self._per_label(self._weights, table)
+
+    def label_confidence(self, table: str, label: str) -> float:
+        """Confidence of the best keyword found for a label (1.0 exact, 0.0 not found)"""
+        if not self.has(table, label):
+            return 0.0
+        if self.confidence is None:
+            return 1.0
+        return max(self.confidence[keyword_id] for _, keyword_id in self.matcher.label_keywords[(table, label)]
+                   if keyword_id in self.confidence)
+
+    def occurrences(self, table: str) -> Dict[str, int]:
+        """Number of keyword occurrences per label (repeats counted), for labels with hits"""
+        return self._per_label(self._occurrences, table)
+
+    def matches(self, table: str, label: str) -> List[str]:
+        """Keywords of one label that were found, in declaration order"""
+        if not self.has(table, label):
+            return []
+        found = self.keyword_counts
+        return [keyword for keyword, keyword_id in self.matcher.label_keywords[(table, label)]
+                if keyword_id in found]
+
+    def _per_label(self, counts: Dict[Tuple[str, str], int], table: str) -> Dict[str, int]:
+        result = {}
+        for label in self.matcher.labels[table]:
+            count = counts.get((table, label))
+            if count:
+                result[label] = count
+        return result
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton compiled once from labelled keyword tables.
+
+    Tables map a table name to ``{label: [keywords]}``. A keyword may appear in
+    several tables or labels; every occurrence is credited, exactly like a
+    separate ``keyword in text`` check per table entry would be.
+
+    By default keywords are matched character by character. Pass ``encode`` to
+    turn each keyword into another symbol sequence (e.g. token IDs) and scan
+    sequences of the same symbols instead.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, List[str]]],
+                 encode: Optional[Callable[[str], Sequence[Hashable]]] = None):
+        self.encode = encode
+        self.labels: Dict[str, List[str]] = {}
+        self.label_keywords: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        self.keywords: List[str] = []
+        self.keyword_lengths: List[int] = []
+        self.payloads: List[List[Tuple[str, str]]] = []
+        self._keyword_index: Dict[str, int] = {}
+
+        # Trie: transitions per state, failure link per state, keyword ids ending per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for table, label_keywords in tables.items():
+            self.labels[table] = list(label_keywords)
+            for label, keywords in label_keywords.items():
+                for keyword in keywords:
+                    self._add_keyword(keyword, table, label)
+
+        self._compile()
+
+    def _add_keyword(self, keyword: str, table: str, label: str):
+        """Insert a keyword into the trie and record which table entry it belongs to"""
+        keyword_id = self._keyword_index.get(keyword)
+        if keyword_id is None:
+            keyword_id = len(self.keywords)
+            self._keyword_index[keyword] = keyword_id
+            self.keywords.append(keyword)
+            self.payloads.append([])
+
+            symbols = self.encode(keyword) if self.encode else keyword
+            self.keyword_lengths.append(len(symbols))
+
+            state = 0
+            for symbol in symbols:
+                next_state = self._goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[state][symbol] = next_state
+                state = next_state
+            self._output[state] = self._output[state] + (keyword_id,)
+
+        self.payloads[keyword_id].append((table, label))
+        self.label_keywords.setdefault((table, label), []).append((keyword, keyword_id))
+
+    def _compile(self):
+        """Compute failure links and merge outputs along them (breadth-first)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and symbol not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(symbol, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, symbols: Sequence[Hashable]) -> KeywordHits:
+        """Scan a text (or encoded symbol sequence) once and return every keyword occurring in it"""
+        return self.scan_batch((symbols,))[0]
+
+    def scan_batch(self, batch: Iterable[Sequence[Hashable]]) -> List[KeywordHits]:
+        """Scan many texts in one call, sharing the automaton lookups across the batch"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        results = []
+
+        for symbols in batch:
+            found: Dict[int, int] = {}
+            state = 0
+            for symbol in symbols:
+                while state and symbol not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(symbol, 0)
+                if output[state]:
+                    for keyword_id in output[state]:
+                        found[keyword_id] = found.get(keyword_id, 0) + 1
+            results.append(KeywordHits(self, found))
+
+        return results
+
+    def scan_weighted(self, symbols: Sequence[Hashable], weights: Sequence[float]) -> KeywordHits:
+        """
+        Scan symbols that each carry a match confidence (1.0 for exact symbols).
+        A keyword occurrence is as confident as its least confident symbol, and
+        each keyword keeps its best occurrence.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        lengths = self.keyword_lengths
+        found: Dict[int, int] = {}
+        confidence: Dict[int, float] = {}
+
+        state = 0
+        for position, symbol in enumerate(symbols):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if output[state]:
+                for keyword_id in output[state]:
+                    found[keyword_id] = found.get(keyword_id, 0) + 1
+                    start = position - lengths[keyword_id] + 1
+                    weight = min(weights[start:position + 1])
+                    if weight > confidence.get(keyword_id, 0.0):
+                        confidence[keyword_id] = weight
+
+        return KeywordHits(self, found, confidence)
+
+    def advance(self, state: int, symbol: Hashable) -> Tuple[int, Tuple[int, ...]]:
+        """Feed one symbol from a saved state; returns the new state and the keyword ids ending there"""
+        goto = self._goto
+        while state and symbol not in goto[state]:
+            state = self._fail[state]
+        state = goto[state].get(symbol, 0)
+        return state, self._output[state]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Size of the compiled automaton"""
+        return {
+            'tables': len(self.labels),
+            'keywords': len(self.keywords),
+            'states': len(self._goto)
+        }
+
+# Example usage and testing
+if __name__ == "__main__":
+    matcher = KeywordMatcher({
+        'genre': {
+            'racing': ['racing', 'car', 'speed'],
+            'horror': ['horror', 'scary', 'ghost']
+        },
+        'theme': {
+            'sci-fi': ['space', 'alien'],
+            'urban': ['city', 'street']
+        }
+    })
+
+    hits = matcher.scan("a scary car chase through city streets")
+    print(f"Keywords: {sorted(hits.keywords)}")
+    print(f"Genre scores: {hits.scores('genre')}")
+    print(f"Theme: {hits.first('theme')}")
+    print(f"Automaton: {matcher.get_stats()}")
@@ -11,13 +11,21 @@ This is the main application that brings together:
 - Real-time game improvement
 """
 
-from flask import Flask, render_template_string, request, jsonify, redirect, url_for
+from flask import Flask, render_template_string, request, jsonify, redirect, url_for, Response
 import json
 import random
 import time
 import os
+import uuid
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from dataclasses import asdict
+from html import escape as escape_html
 from typing import Dict, List, Any, Optional
+from game_pages import GamePage, insert_before_body_end
+from content_encoding import select_variant, REQUEST_GZIP_LEVEL, REQUEST_BROTLI_QUALITY
+from generation_metrics import generation_metrics
 
 # Import our revolutionary AI modules
 try:
@@ -25,6 +33,9 @@ try:
     from modular_game_generator import ModularGameGenerator
     from ai_stylist_assistant import AIStylistAssistant
     from game_showcase_system import GameShowcaseSystem
+    from prompt_cache import PromptCache
+    from game_pool import GamePool
+    from asset_bundles import bundle_store, IMMUTABLE_CACHE_CONTROL
     AI_MODULES_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Some AI modules not available: {e}")
@@ -32,21 +43,73 @@ except ImportError as e:
 
 app = Flask(__name__)
 
+# Sent by every game page when it is closed or navigated away from: the session's length
+# in seconds, posted to /api/games/<game_id>/session (the page is served at /play/<game_id>)
+SESSION_BEACON_SCRIPT = (
+    "<script>(function(){var start=Date.now(),sent=false;"
+    "addEventListener('pagehide',function(){if(sent||!navigator.sendBeacon)return;sent=true;"
+    "navigator.sendBeacon(location.pathname.replace(/^\\/play\\//,'/api/games/')+'/session',"
+    "JSON.stringify({duration:(Date.now()-start)/1000}));});})();</script>"
+)
+
 # Initialize AI systems
 if AI_MODULES_AVAILABLE:
     prompt_interpreter = AdvancedPromptInterpreter()
     game_generator = ModularGameGenerator()
     ai_assistant = AIStylistAssistant()
     showcase_system = GameShowcaseSystem()
+    prompt_cache = PromptCache(
+        max_entries=int(os.environ.get('PROMPT_CACHE_ENTRIES', 1024)),
+        max_bytes=int(os.environ.get('PROMPT_CACHE_BYTES', 32 * 1024 * 1024)),
+        ttl_seconds=float(os.environ.get('PROMPT_CACHE_TTL', 3600))
+    )
+    
+    def build_game_page(assets, **compression):
+        """
+        Encode a game's bundled page once (engine CSS/JS are stored as shared bundles),
+        with the beacon that reports the play session's length when the page is left.
+        Pool refills use the strongest compression; request paths pass moderate settings.
+        """
+        return GamePage.from_chunks(insert_before_body_end(game_generator.iter_bundled_html(assets),
+                                                           SESSION_BEACON_SCRIPT), **compression)
+    
+    def build_request_page(assets):
+        """Encode a game's page while a request waits, with moderate compression"""
+        return build_game_page(assets, gzip_level=REQUEST_GZIP_LEVEL, brotli_quality=REQUEST_BROTLI_QUALITY)
+    
+    # Ready-made games (pages already encoded) for the most requested combinations. The refill
+    # thread starts with the first create request, so it only runs in processes serving traffic
+    # (never in a preloading master, whose threads would not survive the fork)
+    game_pool = GamePool(
+        game_generator,
+        finish=build_game_page,
+        top_n=int(os.environ.get('GAME_POOL_TOP_N', 8)),
+        games_per_combo=int(os.environ.get('GAME_POOL_GAMES_PER_COMBO', 4)),
+        refill_per_sec=float(os.environ.get('GAME_POOL_REFILL_PER_SEC', 2)),
+        window=int(os.environ.get('GAME_POOL_WINDOW', 1000)),
+        start_on_demand=os.environ.get('GAME_POOL_ENABLED', '1') != '0'
+    )
 else:
     prompt_interpreter = None
     game_generator = None
     ai_assistant = None
     showcase_system = None
+    prompt_cache = None
+    game_pool = None
 
 # Global game storage
 games_database = {}
 
+# Upper bound on prompts accepted by one batch interpretation request
+MAX_BATCH_PROMPTS = int(os.environ.get('MAX_BATCH_PROMPTS', 10000))
+
+# Type-ahead preview sessions (session_id -> InterpretationSession), least recently used first.
+# The lock guards the map; each session serializes its own updates
+preview_sessions = OrderedDict()
+preview_sessions_lock = threading.Lock()
+MAX_PREVIEW_SESSIONS = int(os.environ.get('MAX_PREVIEW_SESSIONS', 5000))
+MAX_PREVIEW_SESSION_ID_CHARS = 64
+
 @app.route('/')
 def home():
     """Revolutionary AI Game Creation Platform Homepage"""
@@ -195,6 +258,13 @@ def home():
             background: #e9ecef;
         }
         
+        .prompt-preview {
+            min-height: 1.5em;
+            margin: -5px 0 15px;
+            color: #666;
+            font-size: 0.9em;
+        }
+        
         .ai-chat {
             max-height: 300px;
             overflow-y: auto;
@@ -370,6 +440,7 @@ Examples:
 
 Be as creative and detailed as you want!"
                 ></textarea>
+                <div id="promptPreview" class="prompt-preview"></div>
                 
                 <button id="createGameBtn" class="create-btn" onclick="createRevolutionaryGame()">
                     🚀 Create Revolutionary Game
@@ -469,6 +540,47 @@ Be as creative and detailed as you want!"
     <script>
         function setPrompt(text) {
             document.getElementById('gamePrompt').value = text;
+            updatePromptPreview();
+        }
+        
+        // Live preview of what the interpreter detects while typing
+        let previewSessionId = null;
+        let previewPending = false;
+        let previewQueued = false;
+        
+        async function updatePromptPreview() {
+            if (previewPending) {
+                previewQueued = true;
+                return;
+            }
+            previewPending = true;
+            
+            try {
+                const response = await fetch('/api/prompts/preview', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        session_id: previewSessionId,
+                        prompt: document.getElementById('gamePrompt').value
+                    })
+                });
+                const result = await response.json();
+                
+                if (result.success) {
+                    previewSessionId = result.session_id;
+                    const preview = result.preview;
+                    document.getElementById('promptPreview').textContent =
+                        `🎯 ${preview.genre} · 🌍 ${preview.theme} · ⚔️ ${preview.difficulty} · 🎭 ${preview.mood}`;
+                }
+            } catch (error) {
+                // Previews are best-effort; creation still works without them
+            } finally {
+                previewPending = false;
+                if (previewQueued) {
+                    previewQueued = false;
+                    updatePromptPreview();
+                }
+            }
         }
         
         async function createRevolutionaryGame() {
@@ -548,7 +660,9 @@ Be as creative and detailed as you want!"
         
         // Auto-focus on prompt input
         document.addEventListener('DOMContentLoaded', function() {
-            document.getElementById('gamePrompt').focus();
+            const promptInput = document.getElementById('gamePrompt');
+            promptInput.focus();
+            promptInput.addEventListener('input', updatePromptPreview);
         });
     </script>
 </body>
@@ -565,10 +679,46 @@ def create_revolutionary_game():
         if not prompt:
             return jsonify({'success': False, 'error': 'Prompt is required'}), 400
         
+        # Optional seed: the same prompt and seed always give the same game
+        seed = data.get('seed')
+        if seed is not None:
+            if not isinstance(seed, int) or isinstance(seed, bool) or seed < 0:
+                return jsonify({'success': False, 'error': 'Seed must be a non-negative integer'}), 400
+        
         if AI_MODULES_AVAILABLE:
-            # Use revolutionary AI system
-            config = prompt_interpreter.interpret_prompt(prompt)
-            game_data = game_generator.generate_game(config)
+            # Use revolutionary AI system (repeated prompts are served from the cache)
+            pooled_pages = []
+            
+            def generate_from_pool(config):
+                # Hand out a pre-built game for the combination when the pool has one,
+                # keeping its finished page so it is not rebuilt below
+                assets, page = game_pool.create(config)
+                if page is not None:
+                    pooled_pages.append(page)
+                return assets
+            
+            def finish_page(assets):
+                return pooled_pages[0] if pooled_pages else build_request_page(assets)
+            
+            # Engine CSS/JS are stored once as shared bundles; the page only links them
+            # and is encoded once, so plays just stream the stored bytes
+            if seed is not None:
+                # Cached and pooled games carry their own seeds, so only the interpretation is reused
+                config, _ = prompt_cache.get_or_create(prompt, prompt_interpreter.interpret_prompt)
+                assets = game_generator.generate_game(config, seed)
+                page = build_request_page(assets)
+            else:
+                # A new prompt is interpreted, generated, encoded and cached in one write;
+                # a repeated prompt reuses the cached page as well as the assets
+                config, assets, page = prompt_cache.get_or_create_page(prompt, prompt_interpreter.interpret_prompt,
+                                                                       generate_from_pool, finish_page)
+            
+            game_data = {
+                'title': assets.title,
+                'description': assets.description,
+                'page': page,
+                'seed': assets.metadata['seed']
+            }
             
             # Add to showcase system
             showcase_data = {
@@ -577,7 +727,7 @@ def create_revolutionary_game():
                 'genre': config.genre,
                 'theme': config.theme,
                 'creator': 'Revolutionary AI',
-                'tags': config.special_features + [config.genre, config.theme],
+                'tags': list(config.special_features) + [config.genre, config.theme],
                 'mobile_compatible': True,
                 'estimated_playtime': '5-20 minutes',
                 'difficulty': config.difficulty
@@ -593,11 +743,14 @@ def create_revolutionary_game():
                 'game_id': game_id,
                 'game_url': f'/play/{game_id}',
                 'title': game_data['title'],
-                'description': game_data['description']
+                'description': game_data['description'],
+                'seed': game_data['seed']
             })
         else:
             # Fallback system
-            game_data = create_fallback_game(prompt)
+            game_data = create_fallback_game(prompt, seed)
+            game_data['page'] = GamePage.from_html(game_data.pop('html'), gzip_level=REQUEST_GZIP_LEVEL,
+                                                 brotli_quality=REQUEST_BROTLI_QUALITY)
             game_id = f"fallback_{int(time.time())}_{random.randint(1000, 9999)}"
             games_database[game_id] = game_data
             
@@ -606,12 +759,91 @@ def create_revolutionary_game():
                 'game_id': game_id,
                 'game_url': f'/play/{game_id}',
                 'title': game_data['title'],
-                'description': game_data['description']
+                'description': game_data['description'],
+                'seed': game_data['seed']
             })
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/prompts/interpret-batch', methods=['POST'])
+def interpret_prompts_batch():
+    """Interpret a batch of prompts in one call (history re-classification, showcase seeding)"""
+    try:
+        data = request.get_json() or {}
+        prompts = data.get('prompts', [])
+        
+        if not isinstance(prompts, list) or not all(isinstance(prompt, str) for prompt in prompts):
+            return jsonify({'success': False, 'error': 'prompts must be a list of strings'}), 400
+        
+        if len(prompts) > MAX_BATCH_PROMPTS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_PROMPTS} prompts per batch'}), 413
+        
+        if not AI_MODULES_AVAILABLE:
+            return jsonify({'success': False, 'error': 'Prompt interpreter not available'}), 503
+        
+        configs = prompt_interpreter.interpret_prompts(prompts)
+        
+        # Duplicate prompts share one config object; serialize each distinct one once
+        serialized = {}
+        results = []
+        for config in configs:
+            if id(config) not in serialized:
+                serialized[id(config)] = asdict(config)
+            results.append(serialized[id(config)])
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'unique': len(serialized),
+            'configs': results
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/prompts/preview', methods=['POST'])
+def preview_prompt():
+    """Live genre/theme/difficulty preview while the user types a prompt"""
+    if not AI_MODULES_AVAILABLE:
+        return jsonify({'success': False, 'error': 'Prompt interpreter not available'}), 503
+    
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        
+        prompt = data.get('prompt', '')
+        if not isinstance(prompt, str):
+            return jsonify({'success': False, 'error': 'prompt must be a string'}), 400
+        
+        session_id = data.get('session_id') or uuid.uuid4().hex
+        if not isinstance(session_id, str) or len(session_id) > MAX_PREVIEW_SESSION_ID_CHARS:
+            return jsonify({'success': False, 'error': 'session_id must be a string of at most '
+                            f'{MAX_PREVIEW_SESSION_ID_CHARS} characters'}), 400
+        
+        with preview_sessions_lock:
+            session = preview_sessions.pop(session_id, None) or prompt_interpreter.create_session()
+            preview_sessions[session_id] = session
+            while len(preview_sessions) > MAX_PREVIEW_SESSIONS:
+                preview_sessions.popitem(last=False)
+        
+        start = time.perf_counter()
+        preview = session.update(prompt)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'preview': preview,
+            'elapsed_ms': round(elapsed_ms, 4)
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/ai/chat', methods=['POST'])
 def ai_chat():
     """AI Assistant chat endpoint"""
@@ -694,7 +926,36 @@ def play_game(game_id):
     if showcase_system:
         showcase_system.record_play(game_id)
     
-    return render_template_string(game_data['html'])
+    # Stream the bytes encoded (and compressed) at creation; nothing is rendered per play
+    encoding, body, size = game_data['page'].select(request.headers.get('Accept-Encoding'))
+    response = Response(body, content_type='text/html; charset=utf-8', direct_passthrough=True)
+    response.headers['Content-Length'] = str(size)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+@app.route('/bundles/<name>')
+def serve_bundle(name):
+    """Shared CSS/JS bundle of generated games (content-hashed, cacheable forever)"""
+    bundle = bundle_store.get(name) if AI_MODULES_AVAILABLE else None
+    if bundle is None:
+        return "Bundle not found", 404
+    
+    # Each representation (raw, gzip, br) gets its own strong ETag
+    encoding, body = select_variant(request.headers.get('Accept-Encoding'), bundle.content, bundle.variants)
+    etag = f"{bundle.digest}-{encoding}" if encoding else bundle.digest
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, content_type=bundle.content_type)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
 
 @app.route('/games/showcase')
 def games_showcase():
@@ -770,6 +1031,23 @@ def record_game_play(game_id):
         return jsonify({'success': success})
     return jsonify({'success': False})
 
+@app.route('/api/games/<game_id>/session', methods=['POST'])
+def report_game_session(game_id):
+    """Session end report from a game page: {"duration": seconds, "completed": true/false}, both optional"""
+    if not showcase_system:
+        return jsonify({'success': False})
+    
+    # Beacons arrive as text/plain, so the body is parsed whatever its content type
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+    
+    try:
+        success = showcase_system.record_session_end(game_id, data.get('duration'), data.get('completed'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': success})
+
 @app.route('/api/games/<game_id>/like', methods=['POST'])
 def like_game(game_id):
     """Like a game"""
@@ -803,6 +1081,17 @@ def get_share_url(game_id):
         'description': game_data['description']
     })
 
+@app.route('/api/metrics/generation')
+def generation_metrics_report():
+    """Output size, wall time and peak allocation histograms per generation path and genre"""
+    path = request.args.get('path')
+    genre = request.args.get('genre')
+    return jsonify({
+        'summary': generation_metrics.get_summary()['generations'],
+        'histograms': generation_metrics.get_stats(path=path, genre=genre),
+        'alloc_sample_every': generation_metrics.alloc_sample_every
+    })
+
 @app.route('/api/health')
 def health_check():
     """System health check"""
@@ -819,11 +1108,20 @@ def health_check():
             'showcase_system': showcase_system is not None,
             'mobile_compatible': True,
             'real_time_generation': True
-        }
+        },
+        'prompt_cache': prompt_cache.get_stats() if prompt_cache else None,
+        'fragment_cache': game_generator.get_cache_stats() if game_generator else None,
+        'minifier': game_generator.get_minify_stats() if game_generator else None,
+        'game_pool': game_pool.get_stats() if game_pool else None,
+        'asset_bundles': bundle_store.get_stats() if AI_MODULES_AVAILABLE else None
     })
 
-def create_fallback_game(prompt):
-    """Create a fallback game when AI modules aren't available"""
+def create_fallback_game(prompt, seed=None):
+    """Create a fallback game when AI modules aren't available (same prompt and seed, same game)"""
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    rng = random.Random(seed)
+    
     # Analyze prompt for basic theming
     prompt_lower = prompt.lower()
     
@@ -851,7 +1149,7 @@ def create_fallback_game(prompt):
     
     # Generate title
     title_words = ['Epic', 'Amazing', 'Incredible', 'Fantastic', 'Magical']
-    title = f"{random.choice(title_words)} {theme.title()} Adventure"
+    title = f"{rng.choice(title_words)} {theme.title()} Adventure"
     
     # Generate description
     description = f"An exciting {theme} adventure game created from your prompt: '{prompt[:50]}...'"
@@ -1035,7 +1333,7 @@ def create_fallback_game(prompt):
 <body>
     <div class="game-header">
         <h1 class="game-title">{theme_emoji} {title}</h1>
-        <p class="game-description">{description}</p>
+        <p class="game-description">{escape_html(description)}</p>
     </div>
     
     <div class="game-canvas" id="gameCanvas">
@@ -1253,7 +1551,8 @@ def create_fallback_game(prompt):
     return {
         'title': title,
         'description': description,
-        'html': game_html
+        'html': game_html,
+        'seed': seed
     }
 
 if __name__ == '__main__':
@@ -9,14 +9,23 @@ This module provides:
 - Theme-based visual generation
 - Procedural content creation
 - Real-time game compilation
+- Process-wide caching of fragments shared by games with the same settings
+- Bundled pages that reference shared, content-hashed CSS/JS instead of inlining them
+- Optional conservative minification of the generated CSS/JS
+- Seeded generation: the same config and seed always give byte-identical games
 """
 
 import json
 import random
 import math
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterator
+from dataclasses import dataclass, asdict, replace
 from advanced_prompt_interpreter import GameConfig
+from asset_bundles import BundleStore, bundle_store
+from asset_minifier import asset_minifier, MINIFY_BY_DEFAULT
+from generation_metrics import generation_metrics
 
 @dataclass
 class GameAssets:
@@ -29,23 +38,115 @@ class GameAssets:
     instructions: str
     metadata: Dict[str, Any]
 
+class FragmentCache:
+    """
+    Generated fragments shared across engines, keyed by engine class, fragment
+    name and the values of the config fields the fragment reads.
+    The key space is small (themes x visual styles x engines), so the cache is
+    simply cleared if it ever reaches ``max_entries``.
+    """
+    
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._fragments: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+    
+    def get(self, engine_class: type, name: str, key: Tuple, build: Callable[[], str]) -> str:
+        """Cached fragment, built with ``build()`` on first use"""
+        cache_key = (engine_class, name, key)
+        fragment = self._fragments.get(cache_key)
+        if fragment is not None:
+            with self._lock:
+                self.hits[name] = self.hits.get(name, 0) + 1
+            return fragment
+        
+        fragment = build()
+        with self._lock:
+            self.misses[name] = self.misses.get(name, 0) + 1
+            if len(self._fragments) >= self.max_entries:
+                self._fragments.clear()
+            self._fragments[cache_key] = fragment
+        return fragment
+    
+    def clear(self):
+        """Drop every fragment (counters are kept)"""
+        with self._lock:
+            self._fragments.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Entries and per-fragment hit rates"""
+        with self._lock:
+            fragments = {}
+            for name in sorted(set(self.hits) | set(self.misses)):
+                hits = self.hits.get(name, 0)
+                misses = self.misses.get(name, 0)
+                fragments[name] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / (hits + misses), 4)
+                }
+            total_hits = sum(self.hits.values())
+            lookups = total_hits + sum(self.misses.values())
+            return {
+                'entries': len(self._fragments),
+                'max_entries': self.max_entries,
+                'hits': total_hits,
+                'misses': lookups - total_hits,
+                'hit_rate': round(total_hits / lookups, 4) if lookups else 0.0,
+                'fragments': fragments
+            }
+
+# Fragment cache shared by every engine in the process
+fragment_cache = FragmentCache()
+
+# Seeds for games generated without one come from the OS, never from the global random state
+_seed_source = random.SystemRandom()
+
+def new_game_seed() -> int:
+    """A fresh 32-bit seed for a game generated without an explicit one"""
+    return _seed_source.getrandbits(32)
+
+def generation_key(config: GameConfig, seed: int) -> str:
+    """Content key of the game generated from (config, seed), for caching and deduplication"""
+    payload = json.dumps([asdict(config), seed], sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
 class BaseGameEngine:
-    """Base class for all genre-specific game engines"""
+    """
+    Base class for all genre-specific game engines.
+    Every random choice is drawn from the engine's own ``rng``, seeded per game,
+    so an engine never reads or disturbs the global ``random`` state.
+    """
     
-    def __init__(self, config: GameConfig):
+    # Config fields each cached fragment depends on; a subclass whose override of a
+    # fragment reads other fields must list them here. Unlisted fragments (the random
+    # title, metadata) are generated for every game.
+    FRAGMENT_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+        'css': ('theme', 'visual_style'),
+        'javascript': (),
+        'ui_elements': (),
+        'mobile_controls': (),
+        'instructions': ()
+    }
+    
+    def __init__(self, config: GameConfig, seed: Optional[int] = None):
         self.config = config
+        self.seed = new_game_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
         self.canvas_width = 800
         self.canvas_height = 600
         self.mobile_breakpoint = 768
         
     def generate_game(self) -> GameAssets:
         """Generate complete game assets"""
-        html = self._generate_html()
-        css = self._generate_css()
-        js = self._generate_javascript()
         title = self._generate_title()
+        instructions = self._fragment('instructions', self._generate_instructions)
+        html = self._generate_html(title, instructions)
+        css = self._fragment('css', self._generate_css)
+        js = self._fragment('javascript', self._generate_javascript)
         description = self._generate_description()
-        instructions = self._generate_instructions()
         metadata = self._generate_metadata()
         
         return GameAssets(
@@ -58,12 +159,20 @@ class BaseGameEngine:
             metadata=metadata
         )
     
-    def _generate_html(self) -> str:
+    def _fragment(self, name: str, build: Callable[[], str]) -> str:
+        """Fragment from the shared cache, keyed by the config fields it depends on"""
+        fields = self.FRAGMENT_DEPENDENCIES.get(name)
+        if fields is None:
+            return build()
+        key = tuple(getattr(self.config, field) for field in fields)
+        return fragment_cache.get(type(self), name, key, build)
+    
+    def _generate_html(self, title: str, instructions: str) -> str:
         """Generate HTML structure for the game"""
         return f"""
         <div id="gameContainer" class="game-container">
             <div id="gameHeader" class="game-header">
-                <h1 id="gameTitle">{self._generate_title()}</h1>
+                <h1 id="gameTitle">{title}</h1>
                 <div id="gameStats" class="game-stats">
                     <span id="score">Score: 0</span>
                     <span id="level">Level: 1</span>
@@ -72,14 +181,14 @@ class BaseGameEngine:
             <div id="gameArea" class="game-area">
                 <canvas id="gameCanvas" class="game-canvas"></canvas>
                 <div id="gameUI" class="game-ui">
-                    {self._generate_ui_elements()}
+                    {self._fragment('ui_elements', self._generate_ui_elements)}
                 </div>
             </div>
             <div id="mobileControls" class="mobile-controls">
-                {self._generate_mobile_controls()}
+                {self._fragment('mobile_controls', self._generate_mobile_controls)}
             </div>
             <div id="gameInstructions" class="game-instructions">
-                <p>{self._generate_instructions()}</p>
+                <p>{instructions}</p>
             </div>
         </div>
         """
@@ -372,8 +481,8 @@ class BaseGameEngine:
             'rpg': ['Chronicles', 'Saga', 'Legend', 'Epic']
         }
         
-        adjective = random.choice(theme_adjectives.get(self.config.theme, ['Epic']))
-        noun = random.choice(genre_nouns.get(self.config.genre, ['Adventure']))
+        adjective = self.rng.choice(theme_adjectives.get(self.config.theme, ['Epic']))
+        noun = self.rng.choice(genre_nouns.get(self.config.genre, ['Adventure']))
         
         return f"{adjective} {noun}"
     
@@ -392,7 +501,8 @@ class BaseGameEngine:
             'theme': self.config.theme,
             'difficulty': self.config.difficulty,
             'mobile_compatible': True,
-            'created_timestamp': random.randint(1000000000, 9999999999)
+            'seed': self.seed,
+            'created_timestamp': self.rng.randint(1000000000, 9999999999)
         }
     
     def _get_color_palette(self) -> Dict[str, str]:
@@ -1265,7 +1375,9 @@ class RacingEngine(BaseGameEngine):
 class ModularGameGenerator:
     """Main generator that orchestrates game creation based on genre"""
     
-    def __init__(self):
+    def __init__(self, minify: Optional[bool] = None):
+        # Minify generated CSS/JS (MINIFY_GAME_ASSETS=0 turns the default off)
+        self.minify = MINIFY_BY_DEFAULT if minify is None else minify
         self.engines = {
             'platformer': PlatformerEngine,
             'shooter': ShooterEngine,
@@ -1279,21 +1391,64 @@ class ModularGameGenerator:
             'horror': ShooterEngine      # Fallback to shooter
         }
     
-    def generate_game(self, config: GameConfig) -> GameAssets:
-        """Generate a complete game based on the configuration"""
+    def generate_game(self, config: GameConfig, seed: Optional[int] = None) -> GameAssets:
+        """
+        Generate a complete game based on the configuration.
+        The same (config, seed) always produces the same game; without a seed a fresh
+        one is drawn, and either way it is recorded in ``metadata['seed']``.
+        """
+        with generation_metrics.measure('modular_game_generator', config.genre) as measurement:
+            engine_class = self.engines.get(config.genre, PlatformerEngine)
+            engine = engine_class(config, seed)
+            assets = engine.generate_game()
+            
+            if self.minify:
+                assets.css_styles = asset_minifier.minify('css', assets.css_styles, config.genre)
+                assets.javascript_code = asset_minifier.minify('js', assets.javascript_code, config.genre)
+            
+            measurement.record_sections(assets.html_content, assets.css_styles, assets.javascript_code)
+        return assets
+    
+    def describe_game(self, config: GameConfig) -> str:
+        """The description ``generate_game`` would give a game for this config"""
         engine_class = self.engines.get(config.genre, PlatformerEngine)
-        engine = engine_class(config)
-        
-        return engine.generate_game()
+        return engine_class(config, seed=0)._generate_description()
+    
+    def personalize_game(self, assets: GameAssets, config: GameConfig) -> GameAssets:
+        """
+        A game generated for another config of the same engine and stylesheet, with the
+        title and description ``generate_game`` would give it for ``config``. The title
+        is drawn from the game's own seed, so the game still reproduces from
+        ``metadata['seed']``; the markup is rebuilt only when the title changes.
+        """
+        engine_class = self.engines.get(config.genre, PlatformerEngine)
+        engine = engine_class(config, assets.metadata['seed'])
+        title = engine._generate_title()
+        description = engine._generate_description()
+        if title == assets.title:
+            return replace(assets, description=description, metadata=dict(assets.metadata))
+        return replace(assets, title=title, description=description,
+                       html_content=engine._generate_html(title, assets.instructions),
+                       metadata=dict(assets.metadata))
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit rates of the shared fragment cache"""
+        return fragment_cache.get_stats()
+    
+    def get_minify_stats(self) -> Dict[str, Any]:
+        """Minification cache hit rate and bytes saved per genre"""
+        return asset_minifier.get_stats()
     
     def get_supported_genres(self) -> List[str]:
         """Get list of supported game genres"""
         return list(self.engines.keys())
     
-    def create_complete_game_html(self, config: GameConfig) -> str:
+    def create_complete_game_html(self, config: GameConfig, seed: Optional[int] = None) -> str:
         """Create a complete, standalone HTML game file"""
-        assets = self.generate_game(config)
-        
+        return self.assemble_game_html(self.generate_game(config, seed))
+    
+    def assemble_game_html(self, assets: GameAssets) -> str:
+        """Assemble already generated assets into a standalone HTML game file"""
         complete_html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -1313,6 +1468,42 @@ class ModularGameGenerator:
 </html>"""
         
         return complete_html
+    
+    def assemble_bundled_html(self, assets: GameAssets, store: BundleStore = bundle_store) -> str:
+        """
+        Assemble a game page that links the shared CSS/JS bundles instead of inlining
+        them. Only the markup and a small per-game config blob are unique to the game.
+        """
+        return ''.join(self.iter_bundled_html(assets, store))
+    
+    def iter_bundled_html(self, assets: GameAssets, store: BundleStore = bundle_store) -> Iterator[str]:
+        """The bundled page as consecutive pieces, for encoding or streaming without joining"""
+        css_bundle = store.add(assets.css_styles, 'css')
+        js_bundle = store.add(assets.javascript_code, 'js')
+        game_config = json.dumps({
+            'title': assets.title,
+            'genre': assets.metadata.get('genre'),
+            'theme': assets.metadata.get('theme'),
+            'difficulty': assets.metadata.get('difficulty'),
+            'instructions': assets.instructions
+        }).replace('</', '<\\/')
+        
+        yield f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no">
+    <title>{assets.title}</title>
+    <link rel="stylesheet" href="{css_bundle.url}">
+</head>
+<body>
+    """
+        yield assets.html_content
+        yield f"""
+    <script>window.GAME_CONFIG = {game_config};</script>
+    <script src="{js_bundle.url}"></script>
+</body>
+</html>"""
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -1343,3 +1534,11 @@ if __name__ == "__main__":
         print(f"Theme: {config.theme}")
         print(f"Mobile Compatible: {assets.metadata['mobile_compatible']}")
         print("\n" + "="*80)
+    
+    # Same config and seed -> byte-identical game
+    config = interpreter.interpret_prompt(test_prompts[0])
+    first = generator.create_complete_game_html(config, seed=42)
+    assert first == generator.create_complete_game_html(config, seed=42)
+    print(f"\nSeed 42 reproduces {generation_key(config, 42)[:12]} ({len(first)} chars)")
+    
+    print(f"\nFragment cache: {generator.get_cache_stats()}")
@@ -0,0 +1,319 @@
+"""
+Prompt Benchmark - Throughput and latency harness for the prompt analyzers
+Measures how fast each analyzer turns a synthetic prompt corpus into results
+
+This module provides:
+- A deterministic synthetic prompt corpus from 10 to 5,000 characters with varied vocabulary
+- Prompts/sec, p50 and p99 latency per analyzer and per prompt length bucket
+- Allocation cost per call (peak traced KiB via tracemalloc, plus memory blocks still held afterwards)
+- Baseline files and a regression threshold that fails the run when exceeded
+
+Usage:
+    python prompt_benchmark.py --save-baseline benchmarks.json
+    python prompt_benchmark.py --baseline benchmarks.json --max-regression 0.25
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# Length buckets (upper bound in characters, inclusive)
+LENGTH_BUCKETS = [('short', 100), ('medium', 1000), ('long', 5000)]
+
+GAME_VOCABULARY = [
+    'platformer', 'racing', 'puzzle', 'shooter', 'rpg', 'adventure', 'strategy', 'survival',
+    'space', 'alien', 'laser', 'dragon', 'wizard', 'castle', 'haunted', 'ghost', 'zombie',
+    'underwater', 'mermaid', 'pearls', 'cyberpunk', 'neon', 'hacker', 'steampunk', 'gears',
+    'jump', 'collect', 'coins', 'solve', 'riddles', 'fight', 'boss', 'enemies', 'craft',
+    'build', 'explore', 'treasure', 'knight', 'princess', 'cat', 'robot', 'ninja', 'cars',
+    'fast', 'speed', 'track', 'timer', 'levels', 'power-ups', 'multiplayer', 'story', 'quest',
+    'cute', 'scary', 'epic', 'relaxing', 'pixel', 'retro', 'cartoon', 'hard', 'easy', 'kids'
+]
+
+PLAIN_VOCABULARY = [
+    'a', 'the', 'where', 'with', 'and', 'through', 'into', 'who', 'must', 'some', 'very',
+    'game', 'about', 'lots', 'of', 'in', 'on', 'that', 'while', 'their', 'friends', 'home',
+    'morning', 'bright', 'little', 'big', 'old', 'new', 'people', 'town', 'really', 'want',
+    'like', 'make', 'it', 'feel', 'so', 'can', 'every', 'day', 'night', 'between', 'over'
+]
+
+NOISE_VOCABULARY = [
+    'scary!', 'cars,', '(racing)', 'space-ship', 'über', 'café', 'naïve', '🐉', '✨',
+    'lvl_2', '#epic', 'x2', '...', 'self-made', "player's", 'co-op', 'p2p', '—'
+]
+
+@dataclass
+class BenchmarkTarget:
+    """One analyzer entry point to benchmark"""
+    name: str
+    run: Callable[[str], Any]
+    reset: Optional[Callable[[], None]] = None   # clears per-prompt caches before each call (untimed)
+
+@dataclass
+class BenchmarkResult:
+    """Throughput, latency and allocation figures of one target on one slice of the corpus"""
+    target: str
+    bucket: str
+    prompts: int
+    prompts_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    alloc_kib_per_call: float
+    retained_blocks_per_call: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.target}/{self.bucket}"
+
+def build_corpus(size: int = 300, seed: int = 1234, min_chars: int = 10,
+                 max_chars: int = 5000) -> List[str]:
+    """
+    Deterministic synthetic prompts. Lengths are spread log-uniformly between
+    ``min_chars`` and ``max_chars`` and each prompt draws from a random mix of
+    game keywords, plain English filler and punctuation/unicode noise.
+    """
+    rng = random.Random(seed)
+    corpus = []
+
+    for _ in range(size):
+        target_length = int(min_chars * (max_chars / min_chars) ** rng.random())
+        keyword_share = rng.choice([0.1, 0.3, 0.6, 0.9])
+        noise_share = rng.choice([0.0, 0.0, 0.05, 0.15])
+
+        words = []
+        length = 0
+        while length < target_length:
+            roll = rng.random()
+            if roll < noise_share:
+                word = rng.choice(NOISE_VOCABULARY)
+            elif roll < noise_share + keyword_share:
+                word = rng.choice(GAME_VOCABULARY)
+            else:
+                word = rng.choice(PLAIN_VOCABULARY)
+            if rng.random() < 0.1:
+                word = word.capitalize()
+            words.append(word)
+            length += len(word) + 1
+
+        corpus.append(' '.join(words)[:max(target_length, min_chars)])
+
+    return corpus
+
+def length_bucket(prompt: str) -> str:
+    """Name of the length bucket a prompt falls into"""
+    for name, limit in LENGTH_BUCKETS:
+        if len(prompt) <= limit:
+            return name
+    return LENGTH_BUCKETS[-1][0]
+
+def default_targets() -> List[BenchmarkTarget]:
+    """The prompt analyzers of the game generation pipeline"""
+    from prompt_tokenizer import tokenize_prompt
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from advanced_prompt_analyzer import AdvancedPromptAnalyzer
+    from intelligent_text_assistant_enhanced import GameAnalyzer
+
+    interpreter = AdvancedPromptInterpreter()
+    analyzer = AdvancedPromptAnalyzer()
+    game_analyzer = GameAnalyzer()
+
+    # Every call must pay for tokenization, not reuse the previous round's result
+    reset_tokens = tokenize_prompt.cache_clear
+
+    return [
+        BenchmarkTarget('advanced_prompt_interpreter', interpreter.interpret_prompt, reset_tokens),
+        BenchmarkTarget('advanced_prompt_analyzer', analyzer.deep_analyze_prompt, reset_tokens),
+        BenchmarkTarget('game_analyzer', game_analyzer.analyze_game_concept)
+    ]
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _measure_latencies(target: BenchmarkTarget, prompts: List[str], rounds: int,
+                       min_seconds: float) -> List[List[float]]:
+    """
+    Wall time in seconds of every call, one list per round (garbage collection
+    is paused inside a round so it is not billed to random calls). Rounds are
+    repeated past ``rounds`` until ``min_seconds`` of calls have been timed.
+    """
+    run = target.run
+    reset = target.reset
+    rounds_latencies = []
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        elapsed = 0.0
+        while len(rounds_latencies) < rounds or elapsed < min_seconds:
+            latencies = []
+            for prompt in prompts:
+                if reset:
+                    reset()
+                start = time.perf_counter()
+                run(prompt)
+                latencies.append(time.perf_counter() - start)
+            rounds_latencies.append(latencies)
+            elapsed += sum(latencies)
+            gc.collect()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return rounds_latencies
+
+def _measure_allocations(target: BenchmarkTarget, prompts: List[str]) -> Tuple[float, float]:
+    """Mean peak traced KiB per call and mean memory blocks still allocated after each call"""
+    run = target.run
+    reset = target.reset
+    peak_bytes = 0
+    blocks = 0
+
+    tracemalloc.start()
+    try:
+        for prompt in prompts:
+            if reset:
+                reset()
+            gc.collect()
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+            blocks_before = sys.getallocatedblocks()
+            run(prompt)
+            blocks += max(0, sys.getallocatedblocks() - blocks_before)
+            peak_bytes += tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    calls = max(len(prompts), 1)
+    return peak_bytes / 1024 / calls, blocks / calls
+
+def benchmark_target(target: BenchmarkTarget, corpus: List[str], rounds: int = 5,
+                     alloc_sample: int = 50, min_seconds: float = 0.5) -> List[BenchmarkResult]:
+    """Benchmark one target on the whole corpus and on each length bucket"""
+    # Warm up lazily built tables and caches
+    for prompt in corpus[:20]:
+        target.run(prompt)
+
+    slices = {'all': corpus}
+    for name, _ in LENGTH_BUCKETS:
+        bucket_prompts = [prompt for prompt in corpus if length_bucket(prompt) == name]
+        if bucket_prompts:
+            slices[name] = bucket_prompts
+
+    results = []
+    for bucket, prompts in slices.items():
+        rounds_latencies = _measure_latencies(target, prompts, rounds, min_seconds)
+        ordered = sorted(latency for latencies in rounds_latencies for latency in latencies)
+        # Throughput of the fastest round, the least disturbed by other processes
+        best_round = min(sum(latencies) for latencies in rounds_latencies)
+        alloc_kib, retained_blocks = _measure_allocations(target, prompts[:alloc_sample])
+
+        results.append(BenchmarkResult(
+            target=target.name,
+            bucket=bucket,
+            prompts=len(prompts),
+            prompts_per_sec=round(len(prompts) / best_round, 1) if best_round else 0.0,
+            p50_ms=round(_percentile(ordered, 0.50) * 1000, 4),
+            p99_ms=round(_percentile(ordered, 0.99) * 1000, 4),
+            alloc_kib_per_call=round(alloc_kib, 2),
+            retained_blocks_per_call=round(retained_blocks, 1)
+        ))
+
+    return results
+
+def run_benchmarks(targets: Optional[List[BenchmarkTarget]] = None, corpus: Optional[List[str]] = None,
+                   rounds: int = 5, alloc_sample: int = 50, min_seconds: float = 0.5) -> List[BenchmarkResult]:
+    """Benchmark every target on the corpus"""
+    targets = targets if targets is not None else default_targets()
+    corpus = corpus if corpus is not None else build_corpus()
+
+    results = []
+    for target in targets:
+        results.extend(benchmark_target(target, corpus, rounds, alloc_sample, min_seconds))
+    return results
+
+def check_regressions(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]],
+                      max_regression: float) -> List[str]:
+    """
+    Compare results with a baseline. A result regresses when its best-round
+    throughput drops, or its allocation cost grows, by more than ``max_regression``
+    (a fraction, e.g. 0.25 for 25%). Latency percentiles are reported but not
+    gated: with a few hundred samples they mostly measure scheduler noise.
+    """
+    failures = []
+    for result in results:
+        reference = baseline.get(result.key)
+        if not reference:
+            continue
+
+        if reference['prompts_per_sec'] and \
+                result.prompts_per_sec < reference['prompts_per_sec'] * (1 - max_regression):
+            failures.append(f"{result.key}: {result.prompts_per_sec} prompts/sec "
+                            f"(baseline {reference['prompts_per_sec']})")
+
+        if reference['alloc_kib_per_call'] and \
+                result.alloc_kib_per_call > reference['alloc_kib_per_call'] * (1 + max_regression):
+            failures.append(f"{result.key}: {result.alloc_kib_per_call} KiB/call "
+                            f"(baseline {reference['alloc_kib_per_call']})")
+
+    return failures
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Results as a plain text table"""
+    lines = [f"{'target':<30} {'bucket':<7} {'prompts':>7} {'prompts/s':>10} "
+             f"{'p50 ms':>9} {'p99 ms':>9} {'KiB/call':>9} {'blocks':>8}"]
+    for result in results:
+        lines.append(f"{result.target:<30} {result.bucket:<7} {result.prompts:>7} "
+                     f"{result.prompts_per_sec:>10.1f} {result.p50_ms:>9.3f} {result.p99_ms:>9.3f} "
+                     f"{result.alloc_kib_per_call:>9.1f} {result.retained_blocks_per_call:>8.1f}")
+    return '\n'.join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the prompt analyzers")
+    parser.add_argument('--corpus-size', type=int, default=300, help="number of synthetic prompts")
+    parser.add_argument('--seed', type=int, default=1234, help="corpus random seed")
+    parser.add_argument('--rounds', type=int, default=5, help="minimum timed passes over the corpus")
+    parser.add_argument('--min-seconds', type=float, default=0.5,
+                        help="minimum timed seconds per target and bucket")
+    parser.add_argument('--alloc-sample', type=int, default=50, help="prompts traced for allocations")
+    parser.add_argument('--baseline', help="JSON baseline to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help="allowed fractional regression against the baseline (default 0.25)")
+    parser.add_argument('--save-baseline', help="write the results as a new baseline")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.corpus_size, args.seed)
+    print(f"Corpus: {len(corpus)} prompts, {min(map(len, corpus))}-{max(map(len, corpus))} chars\n")
+
+    results = run_benchmarks(corpus=corpus, rounds=args.rounds, alloc_sample=args.alloc_sample,
+                             min_seconds=args.min_seconds)
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({result.key: asdict(result) for result in results}, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.max_regression)
+        if failures:
+            print(f"\n❌ {len(failures)} regression(s) beyond {args.max_regression:.0%}:")
+            for failure in failures:
+                print(f"   - {failure}")
+            return 1
+        print(f"\n✅ No regression beyond {args.max_regression:.0%} against {args.baseline}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
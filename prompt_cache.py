@@ -0,0 +1,219 @@
+"""
+Prompt Cache - Memoized game configurations for repeated prompts
+Bounded LRU/TTL cache that skips interpretation and generation for prompts we've already seen
+
+This module provides:
+- Prompt fingerprints that fold case, whitespace and punctuation
+- LRU eviction bounded by entry count and by estimated memory in bytes
+- Time-to-live expiry for stale entries
+- Optional caching of the generated GameAssets (and their encoded page) alongside the GameConfig
+- Hit, miss, eviction and expiry counters
+"""
+
+import re
+import sys
+import copy
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Dict, Any, Optional, Tuple, Callable
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Fingerprint of a prompt with case, whitespace and punctuation folded"""
+    folded = PUNCTUATION_PATTERN.sub(' ', prompt.lower())
+    folded = WHITESPACE_PATTERN.sub(' ', folded).strip()
+    return hashlib.blake2b(folded.encode('utf-8'), digest_size=16).hexdigest()
+
+def estimate_size(obj: Any) -> int:
+    """Approximate memory footprint in bytes of a config, assets object or plain container"""
+    if is_dataclass(obj):
+        return sys.getsizeof(obj) + sum(estimate_size(getattr(obj, field.name)) for field in fields(obj))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(key) + estimate_size(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + estimate_size(vars(obj))
+    return sys.getsizeof(obj)
+
+@dataclass(frozen=True)
+class CachedGame:
+    """
+    A cached interpretation result; entries are shared and must be treated as read-only
+    (``get_or_create`` hands out copies of the assets)
+    """
+    config: Any
+    assets: Optional[Any]
+    page: Optional[Any]
+    size_bytes: int
+    expires_at: float
+
+class PromptCache:
+    """
+    LRU/TTL cache of GameConfig (and optionally GameAssets with their encoded page)
+    keyed by prompt fingerprint.
+    Entries are evicted least-recently-used first when either the entry limit or the
+    memory cap is exceeded, and dropped on access once their TTL has passed.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 ttl_seconds: float = 3600.0, cache_assets: bool = True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.cache_assets = cache_assets
+
+        self._entries: 'OrderedDict[str, CachedGame]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, prompt: str) -> Optional[CachedGame]:
+        """Look up a prompt, refreshing its LRU position on a hit"""
+        key = prompt_fingerprint(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, prompt: str, config: Any, assets: Any = None, page: Any = None) -> CachedGame:
+        """Store the interpretation (and generated assets and their page) for a prompt"""
+        if not self.cache_assets:
+            assets = page = None
+
+        entry = CachedGame(
+            config=config,
+            assets=assets,
+            page=page,
+            size_bytes=sum(estimate_size(part) for part in (config, assets, page) if part is not None),
+            expires_at=time.time() + self.ttl_seconds
+        )
+
+        # Entries larger than the whole budget are returned but never stored
+        if entry.size_bytes > self.max_bytes:
+            return entry
+
+        key = prompt_fingerprint(prompt)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.current_bytes += entry.size_bytes
+
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+        return entry
+
+    def get_or_create(self, prompt: str, interpret: Callable[[str], Any],
+                      generate: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, Optional[Any]]:
+        """
+        Return (config, assets) for a prompt, running the pipeline only on a miss.
+        Assets are generated from the cached config if they were not cached with it,
+        and stored alongside it when assets are cached. The assets returned are a
+        private copy of the cached ones.
+        """
+        config, assets, _ = self.get_or_create_page(prompt, interpret, generate)
+        return config, assets
+
+    def get_or_create_page(self, prompt: str, interpret: Callable[[str], Any],
+                           generate: Optional[Callable[[Any], Any]] = None,
+                           finish: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, Optional[Any], Optional[Any]]:
+        """
+        Return (config, assets, page) for a prompt like ``get_or_create``, with ``finish``
+        building the assets' page (e.g. an encoded GamePage) only when none was cached.
+        The config and page are immutable and shared; the assets are a private copy,
+        so a caller's edits never reach the cache or later hits.
+        """
+        entry = self.get(prompt)
+        if entry is None:
+            config, assets, page = interpret(prompt), None, None
+        else:
+            config, assets, page = entry.config, entry.assets, entry.page
+
+        created = entry is None
+        if assets is None and generate is not None:
+            assets = generate(config)
+            created = True
+        if page is None and finish is not None and assets is not None:
+            page = finish(assets)
+            created = True
+
+        if created and (entry is None or self.cache_assets):
+            self.put(prompt, config, assets, page)
+        return config, copy.deepcopy(assets), page
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Example usage and testing
+if __name__ == "__main__":
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from modular_game_generator import ModularGameGenerator
+
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator()
+    cache = PromptCache(max_entries=2)
+
+    prompts = [
+        "a platformer where a cat travels through dreams",
+        "A platformer where a cat travels through dreams!",
+        "  a PLATFORMER where a cat... travels through dreams ",
+        "a space shooter defending Earth from alien invaders",
+        "a sliding puzzle with mystical fantasy theme",
+        "a platformer where a cat travels through dreams"
+    ]
+
+    for prompt in prompts:
+        config, assets = cache.get_or_create(prompt, interpreter.interpret_prompt, generator.generate_game)
+        print(f"{prompt_fingerprint(prompt)[:12]}  {config.genre:<10} {assets.title}")
+
+    print(f"\nCache stats: {cache.get_stats()}")
@@ -0,0 +1,177 @@
+"""
+Prompt Pipeline - One staged analysis of a prompt shared by every consumer
+Lazily computes each prompt feature once and attributes the time spent to each stage
+
+This module provides:
+- Staged prompts whose features (tokens, entities, actions, genre, theme, complexity, ...) are computed on first use
+- Memoization so the interpreter, the analyzer and the mechanics mapper never repeat a stage
+- Namespaced stage names ("analyzer.theme", "interpreter.genre") checked against the function computing them
+- Exclusive per-stage timings for every prompt (nested stages are not double counted)
+- Aggregated per-stage call counts and timings for end-to-end profiling
+"""
+
+import time
+import threading
+from typing import Dict, List, Any, Callable, Union
+from prompt_tokenizer import TokenizedPrompt, tokenize_prompt
+from input_limits import MAX_PROMPT_CHARS, clamp_text
+
+def _tokenize(prompt: 'StagedPrompt') -> TokenizedPrompt:
+    return tokenize_prompt(prompt.text)
+
+class StagedPrompt:
+    """
+    One prompt flowing through the pipeline.
+    A stage runs at most once, the first time a consumer asks for it; later
+    requests (from the same or another consumer) read the memoized value.
+    Consumer-specific stages are named "<consumer>.<feature>". A stage name is
+    bound to the function that first computed it, so two different computations
+    can never silently share one name.
+    """
+
+    def __init__(self, pipeline: 'PromptPipeline', text: str):
+        self.pipeline = pipeline
+        self.text = text
+        self.timings: Dict[str, float] = {}   # stage -> seconds spent in the stage itself
+
+        self._values: Dict[str, Any] = {}
+        self._computed_by: Dict[str, Callable] = {}
+        self._nested: List[float] = []        # time spent in sub-stages, per running stage
+
+    @property
+    def tokens(self) -> TokenizedPrompt:
+        """The shared tokenization of the prompt"""
+        return self.stage('tokens', _tokenize)
+
+    def stage(self, name: str, compute: Callable[['StagedPrompt'], Any]) -> Any:
+        """Value of a stage, computing it with ``compute(self)`` if no consumer has yet"""
+        # Bound methods of different instances of one class compute the same stage
+        function = getattr(compute, '__func__', compute)
+        if name in self._values:
+            if self._computed_by[name] is not function:
+                raise ValueError(f"stage '{name}' was computed by {self._computed_by[name].__qualname__}, "
+                                 f"not {function.__qualname__}")
+            return self._values[name]
+
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            value = compute(self)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+        self._values[name] = value
+        self._computed_by[name] = function
+        self.timings[name] = own
+        self.pipeline._record(name, own)
+        return value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def __getitem__(self, name: str) -> Any:
+        """Value of a stage that has already been computed"""
+        return self._values[name]
+
+    @property
+    def stages(self) -> List[str]:
+        """Stages computed so far, in completion order"""
+        return list(self._values)
+
+    @property
+    def total_seconds(self) -> float:
+        """Time spent in every stage of this prompt"""
+        return sum(self.timings.values())
+
+class PromptPipeline:
+    """
+    Entry point shared by the prompt consumers. ``run`` wraps raw text in a
+    StagedPrompt (staged prompts pass through unchanged), so a caller can stage a
+    prompt once and hand the same object to the interpreter, the analyzer and
+    the mechanics mapper.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_calls: Dict[str, int] = {}
+        self.stage_seconds: Dict[str, float] = {}
+
+    def run(self, prompt: Union[str, StagedPrompt]) -> StagedPrompt:
+        """Stage a prompt (or return it unchanged if it already is staged)"""
+        if isinstance(prompt, StagedPrompt):
+            return prompt
+        return StagedPrompt(self, clamp_text(prompt, MAX_PROMPT_CHARS))
+
+    def _record(self, name: str, seconds: float):
+        with self._lock:
+            self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+    def reset_stats(self):
+        """Clear the aggregated stage timings"""
+        with self._lock:
+            self.stage_calls.clear()
+            self.stage_seconds.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Calls, total and mean milliseconds per stage, slowest stage first"""
+        with self._lock:
+            stats = {
+                name: {
+                    'calls': calls,
+                    'total_ms': round(self.stage_seconds[name] * 1000, 3),
+                    'mean_ms': round(self.stage_seconds[name] * 1000 / calls, 4)
+                }
+                for name, calls in self.stage_calls.items()
+            }
+        return dict(sorted(stats.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+# Pipeline shared by every consumer for easy importing
+prompt_pipeline = PromptPipeline()
+
+# Example usage and profiling
+if __name__ == "__main__":
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from advanced_prompt_analyzer import advanced_analyzer
+    from intelligent_mechanics_mapper import intelligent_mapper
+    # Use the module the consumers imported so the stats land in one pipeline
+    from prompt_pipeline import prompt_pipeline
+
+    interpreter = AdvancedPromptInterpreter()
+
+    prompts = [
+        "a cyberpunk racing game with neon lights and fast cars",
+        "an underwater puzzle adventure with a mermaid collecting pearls",
+        "a brave knight hero fights a dragon boss in a haunted castle to collect the golden crystal"
+    ]
+
+    for prompt in prompts:
+        staged = prompt_pipeline.run(prompt)
+        config = interpreter.interpret_prompt(staged)
+        analysis = advanced_analyzer.deep_analyze_prompt(staged)
+        spec = intelligent_mapper.map_prompt_to_mechanics(staged)
+
+        print(f"\nPrompt: '{prompt}'")
+        print(f"  Config: {config.genre}/{config.theme}  Analysis: {analysis['game_type']}/{analysis['theme']}"
+              f"  Mechanics: {spec['game_type']} (complexity {spec['complexity_level']})")
+        for name, seconds in sorted(staged.timings.items(), key=lambda item: item[1], reverse=True):
+            print(f"    {name:<22} {seconds * 1e6:8.1f} us")
+        print(f"    {'total':<22} {staged.total_seconds * 1e6:8.1f} us")
+
+        # The interpreter's genre and theme are stages any later consumer can read
+        assert staged['interpreter.genre'] == config.genre and staged['interpreter.theme'] == config.theme
+        assert interpreter.interpret_prompt(staged) is config
+    
+    # A stage name belongs to the function that first computed it
+    staged = prompt_pipeline.run(prompts[0])
+    staged.stage('analyzer.theme', advanced_analyzer._detect_theme)
+    try:
+        staged.stage('analyzer.theme', lambda prompt: 'modern')
+        raise AssertionError("a different computation reused a stage name")
+    except ValueError as e:
+        print(f"\nStage name collision rejected: {e}")
+    
+    print(f"\nPipeline stats: {prompt_pipeline.get_stats()}")
@@ -0,0 +1,211 @@
+"""
+Prompt Tokenizer - Shared word-boundary tokenization for all prompt analyzers
+Turns a prompt into normalized tokens, bigrams and spans once per request
+
+This module provides:
+- Word-boundary tokenization (no more "car" matching inside "scary")
+- Light normalization that folds plurals and -ing/-ed/-e inflections
+- A shared vocabulary mapping tokens to compact integer IDs
+- Cached tokenized prompts reused by every analyzer that sees the same text
+- Per-matcher hit tables memoized on the tokenized prompt
+"""
+
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Any, Iterable, Tuple
+from input_limits import MAX_PROMPT_CHARS, clamp_text
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+@lru_cache(maxsize=65536)
+def normalize_token(word: str) -> str:
+    """
+    Fold common English inflections so keyword and prompt forms meet.
+    The same function is applied to keywords and prompts, so the stem only
+    needs to be consistent, not a real dictionary word.
+    """
+    if len(word) <= 3:
+        return word
+
+    # Plurals
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith(('sses', 'shes', 'ches', 'xes', 'zes')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    # Verb inflections
+    for suffix in ('ing', 'ed'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith('eed'):
+            word = word[:-len(suffix)]
+            if word[-1] == word[-2] and word[-1] not in 'lsfz':
+                word = word[:-1]
+            break
+
+    # Silent trailing e (race / racing / raced)
+    if len(word) > 3 and word.endswith('e') and not word.endswith('ee'):
+        word = word[:-1]
+
+    return word
+
+class TokenVocabulary:
+    """Interns normalized tokens as compact integer IDs (0 is reserved for unknown tokens)"""
+
+    def __init__(self):
+        self.token_ids: Dict[str, int] = {}
+        self.tokens: List[str] = ['']
+
+    def add(self, token: str) -> int:
+        """Get the ID of a token, assigning a new one if needed"""
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            self.token_ids[token] = token_id
+            self.tokens.append(token)
+        return token_id
+
+    def get(self, token: str) -> int:
+        """Get the ID of a token, or 0 if it has never been registered"""
+        return self.token_ids.get(token, 0)
+
+    @property
+    def version(self) -> int:
+        """Grows whenever a new token is registered"""
+        return len(self.tokens)
+
+# Vocabulary shared by every analyzer; keyword tables register their tokens at startup
+vocabulary = TokenVocabulary()
+
+@lru_cache(maxsize=4096)
+def phrase_tokens(phrase: str) -> Tuple[str, ...]:
+    """Normalized tokens of a keyword or phrase"""
+    return tuple(normalize_token(word) for word in TOKEN_PATTERN.findall(phrase.lower()))
+
+def phrase_ids(phrase: str) -> Tuple[int, ...]:
+    """Register a keyword or phrase in the shared vocabulary and return its token IDs"""
+    return tuple(vocabulary.add(token) for token in phrase_tokens(phrase))
+
+class TokenizedPrompt:
+    """
+    A prompt tokenized once and shared by every analyzer.
+    Heavier views (IDs, bigrams, matcher hits) are computed on first use.
+    """
+
+    def __init__(self, text: str):
+        # Prompts beyond the cap are cut so every view below stays bounded
+        self.truncated = len(text) > MAX_PROMPT_CHARS
+        self.text = clamp_text(text, MAX_PROMPT_CHARS)
+        self.lowered = self.text.lower()
+
+        self.words: Tuple[str, ...] = tuple(TOKEN_PATTERN.findall(self.lowered))
+        self.tokens: Tuple[str, ...] = tuple(map(normalize_token, self.words))
+        self.token_set = frozenset(self.tokens)
+
+        self._spans = None
+        self._ids = None
+        self._ids_version = -1
+        self._bigrams = None
+        self._hits: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def spans(self) -> Tuple[Tuple[int, int], ...]:
+        """(start, end) character offsets of each token in the prompt"""
+        if self._spans is None:
+            self._spans = tuple(match.span() for match in TOKEN_PATTERN.finditer(self.lowered))
+        return self._spans
+
+    @property
+    def ids(self) -> array:
+        """Token IDs in the shared vocabulary (0 for tokens no keyword table uses)"""
+        if self._ids_version != vocabulary.version:
+            lookup = vocabulary.token_ids.get
+            self._ids = array('I', [lookup(token, 0) for token in self.tokens])
+            self._ids_version = vocabulary.version
+        return self._ids
+
+    @property
+    def bigrams(self) -> Tuple[Tuple[str, str], ...]:
+        """Adjacent token pairs"""
+        if self._bigrams is None:
+            self._bigrams = tuple(zip(self.tokens, self.tokens[1:]))
+        return self._bigrams
+
+    def has(self, phrase: str) -> bool:
+        """Whether the phrase occurs as whole words in the prompt"""
+        needle = phrase_tokens(phrase)
+        if len(needle) == 1:
+            return needle[0] in self.token_set
+        if len(needle) == 2:
+            return needle in self.bigrams
+        return self.count(phrase) > 0
+
+    def has_any(self, phrases: Iterable[str]) -> bool:
+        """Whether any of the phrases occurs as whole words in the prompt"""
+        return any(self.has(phrase) for phrase in phrases)
+
+    def count(self, phrase: str) -> int:
+        """Number of whole-word occurrences of the phrase"""
+        needle = phrase_tokens(phrase)
+        if not needle:
+            return 0
+        if len(needle) == 1:
+            return self.tokens.count(needle[0])
+        size = len(needle)
+        return sum(1 for i in range(len(self.tokens) - size + 1) if self.tokens[i:i + size] == needle)
+
+    def match(self, matcher) -> Any:
+        """Scan the token IDs with a keyword matcher, memoized per matcher"""
+        key = id(matcher)
+        hits = self._hits.get(key)
+        if hits is None or hits.matcher is not matcher:
+            hits = matcher.scan(self.ids)
+            self._hits[key] = hits
+        return hits
+
+@lru_cache(maxsize=1024)
+def tokenize_prompt(text: str) -> TokenizedPrompt:
+    """Tokenize a prompt; repeated calls with the same text share one result"""
+    return TokenizedPrompt(text)
+
+# Example usage and benchmark
+if __name__ == "__main__":
+    import time
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    # Use the module the interpreter imported so both share one vocabulary
+    from prompt_tokenizer import TokenizedPrompt
+
+    interpreter = AdvancedPromptInterpreter()
+    keywords = sorted(set(interpreter.matcher.keywords))
+
+    prompts = [
+        "a scary night escaping through city streets",
+        "a cyberpunk racing game with neon lights and fast cars",
+        "an epic multiplayer rpg where a wizard cat explores haunted castles, crafting potions and solving riddles " * 8
+    ]
+
+    for prompt in prompts:
+        tokenized = TokenizedPrompt(prompt)
+        substring_hits = sorted(keyword for keyword in keywords if keyword in prompt.lower())
+        token_hits = sorted(set(interpreter.matcher.scan(tokenized.ids).keywords))
+
+        runs = 2000
+        start = time.perf_counter()
+        for _ in range(runs):
+            lowered = prompt.lower()
+            [keyword for keyword in keywords if keyword in lowered]
+        substring_cost = (time.perf_counter() - start) / runs * 1e6
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            interpreter.matcher.scan(TokenizedPrompt(prompt).ids)
+        token_cost = (time.perf_counter() - start) / runs * 1e6
+
+        print(f"\nPrompt ({len(prompt)} chars): '{prompt[:60]}'")
+        print(f"  Substring scan: {substring_cost:8.1f} us/prompt, {len(substring_hits)} hits")
+        print(f"  Token scan:     {token_cost:8.1f} us/prompt, {len(token_hits)} hits")
+        print(f"  False substring hits removed: {sorted(set(substring_hits) - set(token_hits))[:10]}")
@@ -0,0 +1,268 @@
+"""
+Search Index - Incrementally maintained inverted index for showcase search
+Maps words to the documents containing them so searches never scan the whole catalogue
+
+This module provides:
+- Word -> posting sets (one per field weight) maintained as documents are added or removed
+- Prefix search over a sorted vocabulary (a query word matches every indexed word it starts)
+- AND semantics across query words
+- Ranked retrieval: field-weighted relevance, exact words above prefix matches, ties in a SortedIndex's order
+- Relevance tiers read from the top of the ranking when they are large and built by set
+  intersection when they are small, so no search touches every matching document
+"""
+
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Any, Callable, Iterator, Optional, Set, Tuple
+from prompt_tokenizer import TOKEN_PATTERN
+from sorted_index import SortedIndex
+
+# Relevance of a word by the field it appears in (the best field counts)
+DEFAULT_FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'description': 1.0}
+
+# Relevance multiplier for a query word that is only a prefix of the indexed word
+PREFIX_FACTOR = 0.5
+
+# A query is split into relevance tiers, one per combination of per-word relevance
+# levels; beyond this many combinations the matching documents are scored one by one
+MAX_COMBINATIONS = 64
+
+# A prefix level made of more posting sets than this is merged into one set up front
+# rather than tested set by set
+MAX_LEVEL_SETS = 8
+
+# A ranking scan for a tier stops after this many times its expected length (and at
+# least MIN_SCAN_BUDGET entries), and the tier is built by set intersection instead
+SCAN_BUDGET_FACTOR = 4
+MIN_SCAN_BUDGET = 1024
+
+# A level is any of its posting sets, a combination all of its levels, a tier any of its combinations
+Level = List[Set[str]]
+Combination = List[Level]
+Tier = List[Combination]
+
+def index_words(text: str) -> List[str]:
+    """Lowercase words of a text, split the way prompts are"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def level_size(level: Level) -> int:
+    """Upper bound on the documents in a level"""
+    return sum(len(docs) for docs in level)
+
+class InvertedIndex:
+    """
+    Inverted index over documents with named text fields.
+    Each word maps field weight -> set of document IDs, so relevance tiers are
+    built from set unions and intersections (or membership tests) rather than a
+    loop over matching documents; the sorted vocabulary only changes when a word
+    is seen for the first time or its last document is removed.
+    """
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None):
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self._postings: Dict[str, Dict[float, Set[str]]] = {}
+        self._vocabulary: List[str] = []
+        self._document_words: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: str, fields: Dict[str, Any]):
+        """Index a document (replacing any earlier version); list-valued fields are joined"""
+        weights: Dict[str, float] = {}
+        for field, value in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            text = ' '.join(value) if isinstance(value, (list, tuple)) else str(value or '')
+            for word in index_words(text):
+                if weight > weights.get(word, 0.0):
+                    weights[word] = weight
+
+        with self._lock:
+            self._remove(doc_id)
+            for word, weight in weights.items():
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = self._postings[word] = {}
+                    insort(self._vocabulary, word)
+                postings.setdefault(weight, set()).add(doc_id)
+            self._document_words[doc_id] = tuple(weights.items())
+
+    def remove(self, doc_id: str):
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        for word, weight in self._document_words.pop(doc_id, ()):
+            postings = self._postings[word]
+            docs = postings[weight]
+            docs.discard(doc_id)
+            if not docs:
+                del postings[weight]
+            if not postings:
+                del self._postings[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+
+    def expand(self, prefix: str) -> List[str]:
+        """Indexed words starting with ``prefix``, in sorted order"""
+        start = bisect_left(self._vocabulary, prefix)
+        # Every word with the prefix sorts before prefix + the highest code point
+        end = bisect_left(self._vocabulary, prefix + '\U0010ffff', start)
+        return self._vocabulary[start:end]
+
+    def _term_levels(self, term: str) -> List[Tuple[float, Level]]:
+        """
+        (relevance, level) for one query word, best first. A document may sit in
+        several levels (its best one counts); the sets may be the index's own and
+        must not be modified
+        """
+        by_score: Dict[float, Level] = {}
+        for word in self.expand(term):
+            factor = 1.0 if word == term else PREFIX_FACTOR
+            for weight, docs in self._postings[word].items():
+                by_score.setdefault(weight * factor, []).append(docs)
+        return [
+            (score, level if len(level) <= MAX_LEVEL_SETS else [set().union(*level)])
+            for score, level in sorted(by_score.items(), key=lambda item: item[0], reverse=True)
+        ]
+
+    def _tiers(self, per_term: List[List[Tuple[float, Level]]]) -> Iterator[Tuple[float, Tier]]:
+        """
+        (relevance, tier) for documents matching every query word, best first; a
+        document also matches lower tiers than its own, so the caller skips repeats
+        """
+        combinations = 1
+        for levels in per_term:
+            combinations *= len(levels)
+
+        if combinations > MAX_COMBINATIONS:
+            # Too many combinations to test one by one: score the matching documents directly
+            unions = sorted(
+                (set().union(*(docs for _, level in levels for docs in level)) for levels in per_term),
+                key=len
+            )
+            scored: Dict[float, Set[str]] = {}
+            for doc_id in unions[0].intersection(*unions[1:]):
+                score = sum(
+                    next(score for score, level in levels if any(doc_id in docs for docs in level))
+                    for levels in per_term
+                )
+                scored.setdefault(round(score, 6), set()).add(doc_id)
+            for score in sorted(scored, reverse=True):
+                yield score, [[[scored[score]]]]
+            return
+
+        by_score: Dict[float, Tier] = {}
+        for combination in itertools.product(*per_term):
+            score = round(sum(level_score for level_score, _ in combination), 6)
+            levels = sorted((level for _, level in combination), key=level_size)
+            by_score.setdefault(score, []).append(levels)
+        for score in sorted(by_score, reverse=True):
+            yield score, by_score[score]
+
+    @staticmethod
+    def _estimate(combination: Combination, total: int) -> float:
+        """Expected documents in a combination if words occurred independently among ``total``"""
+        size = float(min(level_size(combination[0]), total))
+        for level in combination[1:]:
+            size *= min(level_size(level), total) / total
+        return size
+
+    @staticmethod
+    def _materialize(tier: Tier) -> Set[str]:
+        """The documents of a tier as one set (possibly the index's own)"""
+        if len(tier) == 1 and len(tier[0]) == 1 and len(tier[0][0]) == 1:
+            return tier[0][0][0]
+        docs: Set[str] = set()
+        for combination in tier:
+            sets = sorted((level[0] if len(level) == 1 else set().union(*level) for level in combination), key=len)
+            docs |= sets[0].intersection(*sets[1:])
+        return docs
+
+    @staticmethod
+    def _member_test(tier: Tier, skip: Set[str]) -> Callable[[str], bool]:
+        """Predicate for documents in a tier (and not in ``skip``)"""
+        if len(tier) == 1 and len(tier[0]) == 1 and len(tier[0][0]) == 1:
+            docs = tier[0][0][0]
+            return lambda doc_id: doc_id in docs and doc_id not in skip
+
+        # Plain loops over bound membership tests: any()/all() generators cost more per document
+        tests = [[[docs.__contains__ for docs in level] for level in combination] for combination in tier]
+        def member(doc_id: str) -> bool:
+            if doc_id in skip:
+                return False
+            for combination in tests:
+                for level in combination:
+                    for test in level:
+                        if test(doc_id):
+                            break
+                    else:
+                        break   # no set of this level holds the document
+                else:
+                    return True
+            return False
+        return member
+
+    def _best(self, tier: Tier, count: int, ranking: Optional[SortedIndex], skip: Set[str]) -> List[str]:
+        """
+        The first ``count`` documents of a tier not in ``skip``, in ranking order
+        (document ID order without a ranking)
+        """
+        if ranking is not None:
+            # Scanning the ranking for members visits about count * len(ranking) / size
+            # entries, while building the tier costs about the size of its sets. The
+            # size is only an estimate, so a scan that finds too few members within
+            # its budget falls back to building the tier
+            total = len(ranking)
+            size = sum(self._estimate(combination, total) for combination in tier)
+            if size * size > count * total:
+                budget = max(int(SCAN_BUDGET_FACTOR * count * total / size), MIN_SCAN_BUDGET)
+                found = ranking.top(count, self._member_test(tier, skip), budget)
+                if len(found) == count or budget >= total:
+                    return found
+
+        docs = self._materialize(tier)
+        if skip:
+            docs = docs - skip
+        return heapq.nsmallest(count, docs, key=ranking.rank_key if ranking is not None else None)
+
+    def search(self, query: str, limit: int = 20,
+               ranking: Optional[SortedIndex] = None) -> List[Tuple[str, float]]:
+        """
+        (document ID, relevance) of the best ``limit`` documents containing every
+        query word (or a word it is a prefix of); documents of equal relevance
+        follow ``ranking``, which must hold every indexed document
+        """
+        terms = list(dict.fromkeys(index_words(query)))
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            per_term = [self._term_levels(term) for term in terms]
+            if not all(per_term):
+                return []
+
+            results: List[Tuple[str, float]] = []
+            found: Set[str] = set()
+            for score, tier in self._tiers(per_term):
+                for doc_id in self._best(tier, limit - len(results), ranking, found):
+                    results.append((doc_id, score))
+                    found.add(doc_id)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def __len__(self) -> int:
+        return len(self._document_words)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Documents, vocabulary size and the longest posting lists"""
+        with self._lock:
+            sizes = {word: sum(len(docs) for docs in postings.values()) for word, postings in self._postings.items()}
+            longest = heapq.nlargest(5, sizes.items(), key=lambda item: item[1])
+            return {
+                'documents': len(self._document_words),
+                'words': len(self._vocabulary),
+                'postings': sum(sizes.values()),
+                'longest_postings': dict(longest)
+            }
@@ -0,0 +1,235 @@
+"""
+Sorted Index - Documents kept in descending order of a changing numeric key
+Lets showcase listings and search rankings read the top of an ordering instead of sorting everything
+
+This module provides:
+- A blocked sorted list (blocks of a few hundred entries) with O(sqrt n) updates
+- Ties broken by first insertion, matching a stable sort over insertion order
+- Bounded scans from the top with a membership filter, taken under the index lock
+- Grouped indexes (one ordering per group value) with top-k merged across several groups
+"""
+
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+# Entries per block; a block is split when it grows past twice this
+BLOCK_SIZE = 256
+
+class SortedIndex:
+    """
+    Document IDs ordered by key, highest first.
+    Entries are (-key, insertion sequence, doc_id) tuples in a list of sorted blocks,
+    so an update moves one entry within a block of at most 2 * BLOCK_SIZE entries.
+    """
+
+    def __init__(self):
+        self._blocks: List[List[Tuple[float, int, str]]] = []
+        self._firsts: List[Tuple[float, int, str]] = []   # first entry of each block
+        self._entries: Dict[str, Tuple[float, int, str]] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def update(self, doc_id: str, key: float, sequence: Optional[int] = None):
+        """Insert a document or move it to its new key (``sequence`` orders ties on first insertion)"""
+        with self._lock:
+            old = self._entries.get(doc_id)
+            if old is not None:
+                if old[0] == -key:
+                    return
+                self._discard(old)
+                sequence = old[1]
+            elif sequence is None:
+                sequence = next(self._sequence)
+            entry = (-key, sequence, doc_id)
+            self._entries[doc_id] = entry
+            self._insert(entry)
+
+    def remove(self, doc_id: str):
+        """Drop a document (no-op if it is not indexed)"""
+        with self._lock:
+            entry = self._entries.pop(doc_id, None)
+            if entry is not None:
+                self._discard(entry)
+
+    def _insert(self, entry: Tuple[float, int, str]):
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._firsts.append(entry)
+            return
+        index = max(bisect_right(self._firsts, entry) - 1, 0)
+        block = self._blocks[index]
+        insort(block, entry)
+        self._firsts[index] = block[0]
+        if len(block) > 2 * BLOCK_SIZE:
+            tail = block[BLOCK_SIZE:]
+            del block[BLOCK_SIZE:]
+            self._blocks.insert(index + 1, tail)
+            self._firsts.insert(index + 1, tail[0])
+
+    def _discard(self, entry: Tuple[float, int, str]):
+        index = bisect_right(self._firsts, entry) - 1
+        block = self._blocks[index]
+        del block[bisect_left(block, entry)]
+        if block:
+            self._firsts[index] = block[0]
+        else:
+            del self._blocks[index]
+            del self._firsts[index]
+
+    def rescale(self, factor: float):
+        """
+        Multiply every key by a positive ``factor``. Order is kept, except that keys
+        rounding to the same float then tie, so the entries are re-sorted (O(n))
+        """
+        with self._lock:
+            entries = sorted((negated_key * factor, sequence, doc_id)
+                             for block in self._blocks for negated_key, sequence, doc_id in block)
+            self._blocks = [entries[start:start + BLOCK_SIZE] for start in range(0, len(entries), BLOCK_SIZE)]
+            self._firsts = [block[0] for block in self._blocks]
+            self._entries = {entry[2]: entry for entry in entries}
+
+    def key(self, doc_id: str) -> Optional[float]:
+        """Current key of a document"""
+        entry = self._entries.get(doc_id)
+        return -entry[0] if entry is not None else None
+
+    def rank_key(self, doc_id: str) -> Tuple[float, int]:
+        """Sort key (ascending) that reproduces the index order for a document"""
+        entry = self._entries.get(doc_id)
+        return entry[:2] if entry is not None else (float('inf'), 0)
+
+    def top(self, limit: int, accept: Optional[Callable[[str], bool]] = None,
+            max_scan: Optional[int] = None, offset: int = 0) -> List[str]:
+        """
+        The first ``limit`` documents in order (after skipping ``offset``), keeping only
+        those ``accept`` allows; scanning stops as soon as enough are found, or after
+        ``max_scan`` entries
+        """
+        found: List[str] = []
+        if limit <= 0:
+            return found
+        with self._lock:
+            entries = itertools.chain.from_iterable(self._blocks)
+            if max_scan is not None:
+                entries = itertools.islice(entries, max_scan)
+            for entry in entries:
+                doc_id = entry[2]
+                if accept is not None and not accept(doc_id):
+                    continue
+                if offset:
+                    offset -= 1
+                    continue
+                found.append(doc_id)
+                if len(found) == limit:
+                    break
+        return found
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterable[str]:
+        """Every document in order (a snapshot taken under the lock)"""
+        with self._lock:
+            return iter([entry[2] for block in self._blocks for entry in block])
+
+class GroupedSortedIndex:
+    """
+    One SortedIndex per group value, e.g. games by play count per genre.
+    A document is in one group at a time and keeps its tie-breaking sequence when
+    it moves, so listings merged across groups order ties like a single index.
+    """
+
+    def __init__(self):
+        self._groups: Dict[Any, SortedIndex] = {}
+        self._membership: Dict[str, Tuple[Any, int]] = {}   # document -> (group, sequence)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def update(self, doc_id: str, group: Any, key: float):
+        """Insert a document or move it to its new group and/or key"""
+        with self._lock:
+            member = self._membership.get(doc_id)
+            if member is None:
+                sequence = next(self._sequence)
+            else:
+                old_group, sequence = member
+                if old_group != group:
+                    self._leave(doc_id, old_group)
+            self._membership[doc_id] = (group, sequence)
+            index = self._groups.get(group)
+            if index is None:
+                index = self._groups[group] = SortedIndex()
+            index.update(doc_id, key, sequence)
+
+    def remove(self, doc_id: str):
+        """Drop a document (no-op if it is not indexed)"""
+        with self._lock:
+            member = self._membership.pop(doc_id, None)
+            if member is not None:
+                self._leave(doc_id, member[0])
+
+    def _leave(self, doc_id: str, group: Any):
+        index = self._groups[group]
+        index.remove(doc_id)
+        if not len(index):
+            del self._groups[group]
+
+    def groups(self) -> List[Any]:
+        """Group values that currently hold documents"""
+        with self._lock:
+            return list(self._groups)
+
+    def top(self, groups: Iterable[Any], limit: int) -> List[str]:
+        """The first ``limit`` documents across the given groups, in key order"""
+        with self._lock:
+            indexes = [self._groups[group] for group in groups if group in self._groups]
+        if len(indexes) == 1:
+            return indexes[0].top(limit)
+        candidates = [(index.rank_key(doc_id), doc_id) for index in indexes for doc_id in index.top(limit)]
+        return [doc_id for _, doc_id in heapq.nsmallest(limit, candidates)]
+
+    def __len__(self) -> int:
+        return len(self._membership)
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(3)
+    index = SortedIndex()
+    keys = {}
+    for number in range(100000):
+        keys[f"game_{number}"] = rng.randint(0, 1000)
+        index.update(f"game_{number}", keys[f"game_{number}"])
+
+    start = time.perf_counter()
+    for _ in range(20000):
+        doc_id = f"game_{rng.randrange(100000)}"
+        keys[doc_id] += 1
+        index.update(doc_id, keys[doc_id])
+    per_update = (time.perf_counter() - start) / 20000 * 1e6
+
+    expected = [doc_id for doc_id, _ in sorted(keys.items(), key=lambda item: -item[1])]
+    assert list(index) == expected
+    print(f"{len(index)} documents, {per_update:.2f} us per update, top 3: {index.top(3)}")
+
+    grouped = GroupedSortedIndex()
+    groups = {}
+    for doc_id, key in keys.items():
+        groups[doc_id] = rng.choice(['red', 'green', 'blue'])
+        grouped.update(doc_id, groups[doc_id], key)
+    for doc_id in rng.sample(sorted(keys), 1000):
+        groups[doc_id] = 'red'
+        grouped.update(doc_id, 'red', keys[doc_id])
+    for selected in (['red'], ['green', 'blue']):
+        expected = [doc_id for doc_id in sorted(keys, key=lambda doc_id: -keys[doc_id])
+                    if groups[doc_id] in selected][:10]
+        assert grouped.top(selected, 10) == expected
+    print(f"Grouped: {grouped.groups()}, top red: {grouped.top(['red'], 3)}")
@@ -0,0 +1,141 @@
+"""
+Template Benchmark - Generations/sec of every genre generator
+Measures how fast each generator module assembles its game documents
+
+The documents are built with inline f-strings, which CPython compiles into constant
+chunks plus a single string-building instruction; a precompiled chunk list joined
+per call measured slower, so these numbers are the baseline for any assembly change.
+
+This module provides:
+- One benchmark target per genre for every generator module that builds game documents
+- Generations/sec and document size of every target
+- JSON output for keeping results next to the prompt benchmark baselines
+
+Usage:
+    python template_benchmark.py
+    python template_benchmark.py --min-seconds 1.0 --json template_results.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Callable, Optional
+
+SAMPLE_COLORS = {'primary': '#4A148C', 'secondary': '#7B1FA2', 'accent': '#FFD700'}
+SAMPLE_FONTS = {'family': "'Segoe UI', sans-serif", 'body_size': '16px', 'title_size': '2.5em', 'weight': 'bold'}
+
+GENRE_PROMPTS = {
+    'platformer': "a platformer where a cat travels through dreams",
+    'shooter': "a space shooter defending Earth from alien invaders",
+    'puzzle': "a sliding puzzle with mystical fantasy theme",
+    'racing': "a cyberpunk racing game with neon lights"
+}
+
+@dataclass
+class GeneratorTarget:
+    """One genre of one generator module"""
+    module: str
+    genre: str
+    generate: Callable[[], str]
+
+@dataclass
+class GeneratorResult:
+    """Generations/sec of a target"""
+    module: str
+    genre: str
+    document_chars: int
+    generations_per_sec: float
+
+def measure(run: Callable[[], Any], min_seconds: float, rounds: int = 3) -> float:
+    """Best calls/sec over ``rounds`` rounds of at least ``min_seconds`` each"""
+    best = 0.0
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_seconds:
+            for _ in range(50):
+                run()
+            calls += 50
+            elapsed = time.perf_counter() - start
+        best = max(best, calls / elapsed)
+    return best
+
+def build_targets() -> List[GeneratorTarget]:
+    """Every generator module and genre that assembles documents from templates"""
+    targets: List[GeneratorTarget] = []
+
+    import genre_modules
+    for module_class in (genre_modules.PuzzleModule, genre_modules.ShooterModule, genre_modules.PlatformerModule,
+                         genre_modules.RacingModule, genre_modules.RPGModule, genre_modules.StrategyModule):
+        module = module_class()
+        module.minify = False   # template assembly only
+        targets.append(GeneratorTarget(
+            'genre_modules', module.genre,
+            lambda module=module: module.generate({}, SAMPLE_COLORS, SAMPLE_FONTS, {})
+        ))
+
+    import true_game_engines
+    racing = true_game_engines.RacingGameEngine()
+    puzzle = true_game_engines.PuzzleGameEngine()
+    targets.append(GeneratorTarget('true_game_engines', 'racing',
+                                   lambda: racing.generate_racing_game({'theme': 'cyberpunk'})))
+    targets.append(GeneratorTarget('true_game_engines', 'puzzle',
+                                   lambda: puzzle.generate_puzzle_game({'theme': 'fantasy'})))
+
+    from advanced_prompt_interpreter import AdvancedPromptInterpreter
+    from modular_game_generator import ModularGameGenerator
+    interpreter = AdvancedPromptInterpreter()
+    generator = ModularGameGenerator()
+    for genre, prompt in GENRE_PROMPTS.items():
+        config = interpreter.interpret_prompt(prompt)
+        targets.append(GeneratorTarget(
+            'modular_game_generator', genre,
+            lambda config=config: generator.assemble_game_html(generator.generate_game(config, seed=0))
+        ))
+
+    try:
+        import game_engine
+    except ImportError as e:
+        print(f"Skipping game_engine: {e}")
+    else:
+        fallback = game_engine.TrueAIGameGenerator()
+        targets.append(GeneratorTarget('game_engine', 'adventure',
+                                       lambda: fallback._create_adventure_game("a knight explores a haunted castle")))
+
+    return targets
+
+def run_benchmark(min_seconds: float = 0.2) -> Dict[str, Any]:
+    """Benchmark every generator target"""
+    targets = build_targets()
+
+    generators: List[GeneratorResult] = []
+    for target in targets:
+        document = target.generate()
+        generators.append(GeneratorResult(target.module, target.genre, len(document),
+                                          round(measure(target.generate, min_seconds), 1)))
+
+    return {'generators': [asdict(result) for result in generators]}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark game document generation per genre")
+    parser.add_argument('--min-seconds', type=float, default=0.2, help="minimum timed seconds per round")
+    parser.add_argument('--json', help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.min_seconds)
+
+    print(f"{'module':<24} {'genre':<11} {'chars':>7} {'games/s':>10}")
+    for result in results['generators']:
+        print(f"{result['module']:<24} {result['genre']:<11} {result['document_chars']:>7} "
+              f"{result['generations_per_sec']:>10.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
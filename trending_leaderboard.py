@@ -0,0 +1,175 @@
+"""
+Trending Leaderboard - Time-decayed activity scores with incrementally maintained top-K
+Ranks games by recent plays, likes and shares without rescanning the catalogue
+
+This module provides:
+- Exponentially decayed scores (configurable half-life): an event's weight halves every half-life
+- Lazy normalization: scores are stored relative to a fixed epoch, so decay never touches them
+- O(log N) comparisons per event and O(K) top-K reads from a SortedIndex
+- Tracked subsets (e.g. featured games) with their own top-K in the same order
+- A rare O(N) rebase of the epoch before stored scores could overflow
+"""
+
+import os
+import math
+import time
+import threading
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from sorted_index import SortedIndex
+
+TRENDING_HALF_LIFE_SECONDS = float(os.environ.get('TRENDING_HALF_LIFE_SECONDS', 24 * 3600))
+
+# Stored scores are inflated by e^(rate * (t - epoch)); the epoch is moved up to the
+# current time once the exponent passes this (about 369 half-lives), far below
+# where a float overflows (~709)
+REBASE_EXPONENT = 256.0
+
+class TrendingLeaderboard:
+    """
+    Documents ranked by exponentially decayed event weight.
+    An event of weight w at time t contributes w * 2^-((now - t) / half_life) to the
+    score at ``now``. Every score decays by the same factor, so the order only
+    changes on events: each event adds w * e^(rate * (t - epoch)) to a stored score
+    and the stored scores are kept in a SortedIndex. Current scores are the
+    stored ones times e^(-rate * (now - epoch)), computed on read.
+    """
+
+    def __init__(self, half_life_seconds: float = TRENDING_HALF_LIFE_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.half_life_seconds = half_life_seconds
+        self.decay_rate = math.log(2) / half_life_seconds
+        self.clock = clock
+        self._epoch = clock()
+        self._stored: Dict[str, float] = {}
+        self._ranking = SortedIndex()
+        self._subsets: Dict[str, SortedIndex] = {}
+        self._lock = threading.Lock()
+        self.events = 0
+        self.rebases = 0
+
+    def add(self, doc_id: str):
+        """Rank a document with no activity yet (no-op if it is already ranked)"""
+        with self._lock:
+            if doc_id not in self._stored:
+                self._stored[doc_id] = 0.0
+                self._ranking.update(doc_id, 0.0)
+
+    def record(self, doc_id: str, weight: float, timestamp: Optional[float] = None) -> float:
+        """Add an event of ``weight`` at ``timestamp`` (default: now); returns the document's score then"""
+        timestamp = self.clock() if timestamp is None else timestamp
+        with self._lock:
+            exponent = self.decay_rate * (timestamp - self._epoch)
+            if exponent > REBASE_EXPONENT:
+                self._rebase(timestamp)
+                exponent = 0.0
+            stored = self._stored.get(doc_id, 0.0) + weight * math.exp(exponent)
+            self._stored[doc_id] = stored
+            self._ranking.update(doc_id, stored)
+            sequence = self._ranking.rank_key(doc_id)[1]
+            for subset in self._subsets.values():
+                if doc_id in subset:
+                    subset.update(doc_id, stored, sequence)
+            self.events += 1
+            return stored * math.exp(-exponent)
+
+    def _rebase(self, timestamp: float):
+        """Move the epoch to ``timestamp``, rescaling every stored score (caller holds the lock)"""
+        factor = math.exp(-self.decay_rate * (timestamp - self._epoch))
+        for doc_id in self._stored:
+            self._stored[doc_id] *= factor
+        self._ranking.rescale(factor)
+        for subset in self._subsets.values():
+            subset.rescale(factor)
+        self._epoch = timestamp
+        self.rebases += 1
+
+    def set_member(self, doc_id: str, subset: str, member: bool = True):
+        """Add a ranked document to (or drop it from) a tracked subset such as 'featured'"""
+        with self._lock:
+            index = self._subsets.get(subset)
+            if index is None:
+                index = self._subsets[subset] = SortedIndex()
+            if member and doc_id in self._stored:
+                # Same tie-breaking sequence as the full ranking
+                index.update(doc_id, self._stored[doc_id], self._ranking.rank_key(doc_id)[1])
+            elif not member:
+                index.remove(doc_id)
+
+    def remove(self, doc_id: str):
+        """Drop a document from the leaderboard and every subset"""
+        with self._lock:
+            self._stored.pop(doc_id, None)
+            self._ranking.remove(doc_id)
+            for subset in self._subsets.values():
+                subset.remove(doc_id)
+
+    def _decay(self, now: Optional[float]) -> float:
+        now = self.clock() if now is None else now
+        return math.exp(-self.decay_rate * (now - self._epoch))
+
+    def score(self, doc_id: str, now: Optional[float] = None) -> float:
+        """A document's decayed score at ``now`` (default: the current time)"""
+        with self._lock:
+            return self._stored.get(doc_id, 0.0) * self._decay(now)
+
+    def top(self, limit: int, subset: Optional[str] = None,
+            now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """(document ID, decayed score) of the ``limit`` highest scores, optionally within a subset"""
+        with self._lock:
+            index = self._ranking if subset is None else self._subsets.get(subset)
+            if index is None:
+                return []
+            decay = self._decay(now)
+            return [(doc_id, self._stored[doc_id] * decay) for doc_id in index.top(limit)]
+
+    def __len__(self) -> int:
+        return len(self._stored)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuration and counters"""
+        with self._lock:
+            return {
+                'documents': len(self._stored),
+                'half_life_seconds': self.half_life_seconds,
+                'events': self.events,
+                'rebases': self.rebases,
+                'subsets': {name: len(index) for name, index in self._subsets.items()}
+            }
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+
+    hour = 3600.0
+    now = [0.0]
+    board = TrendingLeaderboard(half_life_seconds=hour, clock=lambda: now[0])
+    for game_id in ['old_hit', 'steady', 'new_release']:
+        board.add(game_id)
+    board.set_member('new_release', 'featured')
+
+    board.record('old_hit', 100.0)            # a burst long ago...
+    now[0] = 5 * hour
+    for _ in range(5):
+        board.record('steady', 1.0)
+    board.record('new_release', 6.0)          # ...is outweighed by recent activity
+    print(f"After 5 hours: {board.top(3)}")
+    assert [doc_id for doc_id, _ in board.top(3)] == ['new_release', 'steady', 'old_hit']
+    assert abs(board.score('old_hit') - 100.0 / 32) < 1e-9
+    print(f"Featured: {board.top(3, 'featured')}")
+
+    # Rebasing keeps scores and order across hundreds of half-lives
+    rng = random.Random(2)
+    reference: Dict[str, Tuple[float, float]] = {}   # game -> (score, time of last event)
+    for _ in range(20000):
+        now[0] += rng.expovariate(1.0) * 150
+        game_id = f"game_{rng.randrange(500)}"
+        board.record(game_id, 1.0)
+        value, last = reference.get(game_id, (0.0, now[0]))
+        reference[game_id] = (value * 2 ** -((now[0] - last) / hour) + 1.0, now[0])
+    expected = sorted(((game_id, value * 2 ** -((now[0] - last) / hour))
+                       for game_id, (value, last) in reference.items()), key=lambda item: -item[1])[:5]
+    assert board.rebases >= 1
+    for (game_id, value), (expected_id, expected_value) in zip(board.top(5), expected):
+        assert game_id == expected_id and math.isclose(value, expected_value, rel_tol=1e-9)
+    print(f"After {now[0] / hour:.0f} hours: top 5 {[(d, round(v, 3)) for d, v in board.top(5)]}")
+    print(f"Stats: {board.get_stats()}")
@@ -17,6 +17,8 @@ import json
 import random
 import time
 from datetime import datetime
+from generation_metrics import generation_metrics
+from asset_minifier import asset_minifier, MINIFY_BY_DEFAULT
 
 class RacingGameEngine:
     """Generates actual racing games with car mechanics, tracks, and speed"""
@@ -961,7 +963,9 @@ class AdventureGameEngine:
 class TrueGameEngineSelector:
     """Selects the appropriate game engine based on prompt analysis"""
     
-    def __init__(self):
+    def __init__(self, minify=None):
+        # Minify the inline CSS/JS of generated documents (MINIFY_GAME_ASSETS=0 turns the default off)
+        self.minify = MINIFY_BY_DEFAULT if minify is None else minify
         self.engines = {
             'racing': RacingGameEngine(),
             'puzzle': PuzzleGameEngine(),
@@ -988,7 +992,16 @@ class TrueGameEngineSelector:
             return None
         
         game_type = prompt_analysis.get('game_type', 'collection')
-        
+        with generation_metrics.measure('true_game_engines', game_type) as measurement:
+            html = self._generate_with_engine(engine, game_type, prompt_analysis)
+            if html is not None:
+                if self.minify:
+                    html = asset_minifier.minify('html', html, game_type)
+                measurement.record_document(html)
+        return html
+    
+    def _generate_with_engine(self, engine, game_type, prompt_analysis):
+        """Call the selected engine's generator for the game type"""
         if game_type == 'racing':
             return engine.generate_racing_game(prompt_analysis)
         elif game_type == 'puzzle':
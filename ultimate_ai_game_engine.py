@@ -7,10 +7,17 @@ Contains the exact functions that main.py expects
 
 import os
 import json
-import re
 import random
 import requests
 from datetime import datetime
+from input_limits import (
+    MAX_PROMPT_CHARS,
+    MAX_AI_RESPONSE_CHARS,
+    clamp_text,
+    extract_html_document,
+    extract_title,
+    StageTimer,
+)
 
 class TrueAIGameGenerator:
     def __init__(self):
@@ -20,6 +27,7 @@ class TrueAIGameGenerator:
     def generate_game(self, description):
         """Generate a completely unique game from user description"""
         try:
+            description = clamp_text(description, MAX_PROMPT_CHARS)
             print(f"🎮 Generating unique game from: {description[:100]}...")
             if self.groq_api_key:
                 return self._generate_with_ai(description)
@@ -92,25 +100,25 @@ Make sure the game is fully functional and matches the user's description exactl
     def _parse_ai_response(self, ai_response, description):
         """Parse AI response and extract game data"""
         try:
-            html_match = re.search(
-                r"<!DOCTYPE html>.*?</html>", ai_response, re.DOTALL | re.IGNORECASE
-            )
-            if html_match:
-                html_content = html_match.group(0)
-                title_match = re.search(
-                    r"<title>(.*?)</title>", html_content, re.IGNORECASE
-                )
-                title = (
-                    title_match.group(1)
-                    if title_match
-                    else self._generate_title_from_description(description)
-                )
-                genre = self._determine_genre(description)
+            if len(ai_response) > MAX_AI_RESPONSE_CHARS:
+                print(f"❌ AI response too large ({len(ai_response)} chars)")
+                return self._generate_fallback(description)
+            timer = StageTimer()
+            with timer.stage("extract_html"):
+                html_content = extract_html_document(ai_response)
+            if html_content:
+                with timer.stage("extract_title"):
+                    title = extract_title(
+                        html_content
+                    ) or self._generate_title_from_description(description)
+                with timer.stage("determine_genre"):
+                    genre = self._determine_genre(description)
                 return {
                     "title": title,
                     "description": f"A unique {genre} game: {description}",
                     "genre": genre,
                     "html_content": html_content,
+                    "parse_timings_ms": timer.as_ms(),
                 }
             else:
                 print("❌ No valid HTML found in AI response")
@@ -12,10 +12,11 @@ This engine creates truly unique games that perfectly match user prompts with:
 
 import json
 import random
-import re
 import time
 from datetime import datetime
 import os
+from keyword_matcher import KeywordMatcher
+from prompt_tokenizer import tokenize_prompt, phrase_ids
 
 class AdvancedPromptAnalyzer:
     """Advanced AI-powered prompt analysis for perfect game generation"""
@@ -42,27 +43,35 @@ class AdvancedPromptAnalyzer:
             'survival': ['survive', 'escape', 'avoid', 'danger', 'threat', 'safety', 'hide'],
             'cooking': ['cook', 'recipe', 'ingredient', 'kitchen', 'food', 'meal', 'chef', 'restaurant']
         }
+        
+        # Common game entities by theme (nouns that will become game elements)
+        self.entity_keywords = {
+            'collectibles': ['mushroom', 'pearl', 'gem', 'coin', 'star', 'crystal', 'flower', 'fruit', 'treasure', 'key'],
+            'characters': ['fairy', 'mermaid', 'knight', 'wizard', 'alien', 'robot', 'princess', 'hero', 'warrior'],
+            'enemies': ['spirit', 'monster', 'dragon', 'ghost', 'zombie', 'alien', 'robot', 'enemy', 'villain'],
+            'environments': ['forest', 'ocean', 'castle', 'space', 'planet', 'city', 'dungeon', 'cave', 'mountain']
+        }
+        
+        # Key verbs that define gameplay mechanics
+        self.action_keywords = ['collect', 'avoid', 'fight', 'jump', 'run', 'fly', 'swim', 'shoot', 'defend', 'escape', 'solve', 'build']
+        
+        self.matcher = KeywordMatcher({
+            'theme': self.theme_keywords,
+            'game_type': self.game_types,
+            'entities': self.entity_keywords,
+            'actions': {'actions': self.action_keywords}
+        }, encode=phrase_ids)
     
     def analyze_prompt(self, prompt):
         """Analyze prompt to extract themes, game type, and key elements"""
-        prompt_lower = prompt.lower()
+        hits = tokenize_prompt(prompt).match(self.matcher)
         
         # Extract primary theme
-        theme_scores = {}
-        for theme, keywords in self.theme_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in prompt_lower)
-            if score > 0:
-                theme_scores[theme] = score
-        
+        theme_scores = hits.scores('theme')
         primary_theme = max(theme_scores.keys(), key=lambda k: theme_scores[k]) if theme_scores else 'adventure'
         
         # Extract game type
-        type_scores = {}
-        for game_type, keywords in self.game_types.items():
-            score = sum(1 for keyword in keywords if keyword in prompt_lower)
-            if score > 0:
-                type_scores[game_type] = score
-        
+        type_scores = hits.scores('game_type')
         primary_type = max(type_scores.keys(), key=lambda k: type_scores[k]) if type_scores else 'collection'
         
         # Extract key entities (nouns that will become game elements)
@@ -83,27 +92,19 @@ class AdvancedPromptAnalyzer:
     
     def _extract_entities(self, prompt):
         """Extract key nouns that will become game elements"""
-        # Common game entities by theme
-        entity_patterns = {
-            'collectibles': r'\b(mushroom|pearl|gem|coin|star|crystal|flower|fruit|treasure|key)\w*\b',
-            'characters': r'\b(fairy|mermaid|knight|wizard|alien|robot|princess|hero|warrior)\w*\b',
-            'enemies': r'\b(spirit|monster|dragon|ghost|zombie|alien|robot|enemy|villain)\w*\b',
-            'environments': r'\b(forest|ocean|castle|space|planet|city|dungeon|cave|mountain)\w*\b'
-        }
+        hits = tokenize_prompt(prompt).match(self.matcher)
         
         entities = {}
-        for category, pattern in entity_patterns.items():
-            matches = re.findall(pattern, prompt.lower())
+        for category in self.entity_keywords:
+            matches = hits.matches('entities', category)
             if matches:
-                entities[category] = list(set(matches))
+                entities[category] = matches
         
         return entities
     
     def _extract_actions(self, prompt):
         """Extract key verbs that define gameplay mechanics"""
-        action_patterns = r'\b(collect|avoid|fight|jump|run|fly|swim|shoot|defend|escape|solve|build)\w*\b'
-        actions = re.findall(action_patterns, prompt.lower())
-        return list(set(actions))
+        return tokenize_prompt(prompt).match(self.matcher).matches('actions', 'actions')
 
 class EnhancedGameGenerator:
     """Enhanced game generator that creates truly unique games for every prompt"""